@@ -0,0 +1,229 @@
+import sys
+import math
+import time
+import argparse
+from database import get_db, init_db, KKM
+import perf
+
+# Analitik kelas untuk guru: sebaran nilai, persentase lulus (KKM), waktu
+# pengerjaan dan tingkat kesulitan soal per kelas (grade_class) dan mapel.
+# Semua agregasi dikerjakan SQLite (GROUP BY dalam satu statement per tabel),
+# hasilnya disimpan di class_stats/class_histogram/class_item_stats, plus
+# subject_item_stats (gabungan semua kelas) untuk laporan satu sekolah. Soal
+# dikunci qhash yang disimpan bersama tiap jawaban, bukan questions.id.
+# refresh() hanya memproses quiz_attempts dengan id di atas last_attempt_id,
+# jadi dashboard cukup membaca ringkasan kecil itu walaupun riwayat ujiannya
+# setahun penuh. Hasil ujian dihitung ke kelas siswa saat di-refresh; jika
+# siswa pindah kelas, hasil lamanya tetap di kelas lama (rebuild() untuk
+# menghitung ulang semuanya dengan kelas sekarang).
+SCORE_BIN = 10
+TIME_BIN_SECONDS = 300
+ALL_CLASSES = "semua"
+HISTOGRAMS = (
+    # Bucket 1 persen; ROUND membuang galat float (misal 56.99999999999999).
+    ("score", "CAST(ROUND(a.percentage, 6) AS INTEGER)"),
+    ("time", f"a.time_used / {TIME_BIN_SECONDS}"),
+)
+
+
+def refresh(db=None):
+    """Masukkan hasil ujian yang belum teragregasi ke ringkasan; mengembalikan jumlahnya."""
+    db = db or get_db()
+    last, = db.execute("SELECT last_attempt_id FROM analytics_state WHERE id = 1").fetchone()
+    newest, count = db.execute("SELECT MAX(id), COUNT(*) FROM quiz_attempts WHERE id > ?", (last,)).fetchone()
+    if not count:
+        return 0
+    with perf.span("analytics_refresh"), db.transaction() as c:
+        # UPDATE pertama sekaligus mengambil kunci tulis; jika proses lain
+        # sudah memajukan penanda, rentang ini jangan dihitung dua kali.
+        claimed = c.execute("UPDATE analytics_state SET last_attempt_id = ? WHERE id = 1 AND last_attempt_id = ?",
+                            (newest, last)).rowcount
+        if not claimed:
+            return 0
+        attempts = "quiz_attempts a JOIN users u ON u.username = a.username WHERE a.id > ? AND a.id <= ?"
+        c.execute(f"""
+            INSERT INTO class_stats (grade_class, subject, attempts, percentage_total, percentage_sq_total, time_total)
+            SELECT u.grade_class, a.subject, COUNT(*), SUM(a.percentage), SUM(a.percentage * a.percentage),
+                   SUM(a.time_used)
+            FROM {attempts}
+            GROUP BY u.grade_class, a.subject
+            ON CONFLICT (grade_class, subject) DO UPDATE SET
+                attempts = attempts + excluded.attempts,
+                percentage_total = percentage_total + excluded.percentage_total,
+                percentage_sq_total = percentage_sq_total + excluded.percentage_sq_total,
+                time_total = time_total + excluded.time_total""", (last, newest))
+        for kind, bucket in HISTOGRAMS:
+            c.execute(f"""
+                INSERT INTO class_histogram (grade_class, subject, kind, bucket, attempts)
+                SELECT u.grade_class, a.subject, ?, {bucket}, COUNT(*)
+                FROM {attempts}
+                GROUP BY 1, 2, 4
+                ON CONFLICT (grade_class, subject, kind, bucket) DO UPDATE SET
+                    attempts = attempts + excluded.attempts""", (kind, last, newest))
+        c.execute("""
+            INSERT INTO class_item_stats (grade_class, subject, qhash, attempts, correct, timed, time_total)
+            SELECT u.grade_class, a.subject, x.qhash, COUNT(*), SUM(x.correct), COUNT(x.time_spent),
+                   COALESCE(SUM(x.time_spent), 0)
+            FROM attempt_answers x
+            JOIN quiz_attempts a ON a.id = x.attempt_id
+            JOIN users u ON u.username = a.username
+            WHERE x.attempt_id > ? AND x.attempt_id <= ? AND x.qhash IS NOT NULL
+            GROUP BY u.grade_class, a.subject, x.qhash
+            ON CONFLICT (grade_class, subject, qhash) DO UPDATE SET
+                attempts = attempts + excluded.attempts,
+                correct = correct + excluded.correct,
+                timed = timed + excluded.timed,
+                time_total = time_total + excluded.time_total""", (last, newest))
+        c.execute("""
+            INSERT INTO subject_item_stats (subject, qhash, attempts, correct, timed, time_total)
+            SELECT a.subject, x.qhash, COUNT(*), SUM(x.correct), COUNT(x.time_spent), COALESCE(SUM(x.time_spent), 0)
+            FROM attempt_answers x
+            JOIN quiz_attempts a ON a.id = x.attempt_id
+            WHERE x.attempt_id > ? AND x.attempt_id <= ? AND x.qhash IS NOT NULL
+            GROUP BY a.subject, x.qhash
+            ON CONFLICT (subject, qhash) DO UPDATE SET
+                attempts = attempts + excluded.attempts,
+                correct = correct + excluded.correct,
+                timed = timed + excluded.timed,
+                time_total = time_total + excluded.time_total""", (last, newest))
+    return count
+
+
+def rebuild(db=None):
+    """Hapus ringkasan dan agregasi ulang seluruh riwayat ujian."""
+    db = db or get_db()
+    with db.transaction() as c:
+        c.execute("UPDATE analytics_state SET last_attempt_id = 0 WHERE id = 1")
+        for table in ("class_stats", "class_histogram", "class_item_stats", "subject_item_stats"):
+            c.execute(f"DELETE FROM {table}")
+    return refresh(db)
+
+
+def _scope(grade_class, subject, by_class):
+    conditions, params = [], []
+    if grade_class is not None:
+        conditions.append("grade_class = ?")
+        params.append(grade_class)
+    if subject is not None:
+        conditions.append("subject = ?")
+        params.append(subject)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    key = "grade_class" if by_class else f"'{ALL_CLASSES}'"
+    return key, where, params
+
+
+def _percentile(buckets, total, p):
+    target = total * p / 100
+    running = 0
+    for bucket in sorted(buckets):
+        running += buckets[bucket]
+        if running >= target:
+            return bucket
+    return None
+
+
+def class_report(grade_class=None, subject=None, by_class=True, kkm=KKM, db=None):
+    """Ringkasan per (kelas, mapel), atau per mapel untuk semua kelas jika by_class=False.
+
+    Tiap baris: attempts, mean, stdev, median (persen), pass_rate (0-1, nilai
+    >= kkm), score_histogram (jumlah per SCORE_BIN persen; 100 masuk bin
+    terakhir), mean_time (detik) dan time_histogram (per TIME_BIN_SECONDS).
+    """
+    db = db or get_db()
+    refresh(db)
+    key, where, params = _scope(grade_class, subject, by_class)
+    rows = db.execute(f"""
+        SELECT {key}, subject, SUM(attempts), SUM(percentage_total), SUM(percentage_sq_total), SUM(time_total)
+        FROM class_stats{where}
+        GROUP BY 1, 2 ORDER BY 1, 2""", params).fetchall()
+    histograms = {}
+    for group, subj, kind, bucket, count in db.execute(f"""
+            SELECT {key}, subject, kind, bucket, SUM(attempts) FROM class_histogram{where}
+            GROUP BY 1, 2, 3, 4""", params):
+        histograms.setdefault((group, subj, kind), {})[bucket] = count
+    report = []
+    for group, subj, attempts, total, sq_total, time_total in rows:
+        scores = histograms.get((group, subj, "score"), {})
+        times = histograms.get((group, subj, "time"), {})
+        mean = total / attempts
+        bins = [0] * (100 // SCORE_BIN)
+        for bucket, count in scores.items():
+            bins[min(bucket // SCORE_BIN, len(bins) - 1)] += count
+        report.append({
+            "grade_class": group,
+            "subject": subj,
+            "attempts": attempts,
+            "mean": mean,
+            "stdev": math.sqrt(max(0.0, sq_total / attempts - mean * mean)),
+            "median": _percentile(scores, attempts, 50),
+            "pass_rate": sum(count for bucket, count in scores.items() if bucket >= kkm) / attempts,
+            "score_histogram": bins,
+            "mean_time": time_total / attempts,
+            "time_histogram": [times.get(b, 0) for b in range(max(times, default=-1) + 1)],
+        })
+    return report
+
+
+def item_difficulty(grade_class=None, subject=None, limit=20, min_attempts=5, db=None):
+    """Soal tersulit (persentase benar terendah) dengan minimal `min_attempts` jawaban."""
+    db = db or get_db()
+    refresh(db)
+    _, where, params = _scope(grade_class, subject, True)
+    table = "class_item_stats" if grade_class is not None else "subject_item_stats"
+    rows = db.execute(f"""
+        SELECT qhash, SUM(attempts), SUM(correct), SUM(timed), SUM(time_total)
+        FROM {table}{where}
+        GROUP BY qhash HAVING SUM(attempts) >= ?
+        ORDER BY 1.0 * SUM(correct) / SUM(attempts), SUM(attempts) DESC LIMIT ?""",
+        params + [min_attempts, limit]).fetchall()
+    texts = dict(db.execute(f"""
+        SELECT qhash, question FROM questions WHERE qhash IN ({",".join("?" * len(rows))}) GROUP BY qhash""",
+        [row[0] for row in rows]).fetchall()) if rows else {}
+    return [{
+        "qhash": qhash,
+        "text": texts.get(qhash, ""),
+        "attempts": attempts,
+        "correct_rate": correct / attempts,
+        "mean_time": time_total / timed if timed else None,
+    } for qhash, attempts, correct, timed, time_total in rows]
+
+
+def _sparkline(counts):
+    peak = max(counts, default=0) or 1
+    return "".join(" ▁▂▃▄▅▆▇█"[round(8 * c / peak)] for c in counts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analitik hasil ujian per kelas dan mapel.")
+    parser.add_argument("--kelas", help="hanya kelas ini, misal 10.1")
+    parser.add_argument("--mapel", help="hanya mapel ini")
+    parser.add_argument("--gabung", action="store_true", help="gabungkan semua kelas per mapel")
+    parser.add_argument("--kkm", type=int, default=KKM)
+    parser.add_argument("--soal", type=int, default=10, help="jumlah soal tersulit yang ditampilkan")
+    parser.add_argument("--rebuild", action="store_true", help="hitung ulang ringkasan dari seluruh riwayat")
+    args = parser.parse_args(argv)
+    init_db()
+    started = time.perf_counter()
+    added = rebuild() if args.rebuild else refresh()
+    refreshed = time.perf_counter()
+    report = class_report(args.kelas, args.mapel, by_class=not args.gabung, kkm=args.kkm)
+    items = item_difficulty(args.kelas, args.mapel, limit=args.soal) if args.soal else []
+    finished = time.perf_counter()
+    print(f"{'kelas':<8}{'mapel':<18}{'ujian':>7}{'rata2':>8}{'sd':>7}{'median':>8}{'lulus':>7}"
+          f"{'waktu':>8}  sebaran nilai 0-100")
+    for r in report:
+        print(f"{r['grade_class']:<8}{r['subject'][:17]:<18}{r['attempts']:>7}{r['mean']:>8.1f}{r['stdev']:>7.1f}"
+              f"{r['median']:>8}{r['pass_rate']:>7.0%}{r['mean_time'] / 60:>6.1f} m  {_sparkline(r['score_histogram'])}")
+    if items:
+        print(f"\n{len(items)} soal tersulit:")
+        for item in items:
+            mean_time = f"{item['mean_time']:5.0f} s" if item["mean_time"] is not None else "    - "
+            print(f"   {item['correct_rate']:>4.0%} benar  {item['attempts']:>5} jawaban  {mean_time}  "
+                  f"{item['text'][:60]}")
+    print(f"\n{added} hasil ujian baru diagregasi dalam {(refreshed - started) * 1000:.0f} ms, "
+          f"laporan {(finished - refreshed) * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
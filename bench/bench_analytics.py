@@ -0,0 +1,146 @@
+import sys
+import time
+import random
+import argparse
+from common import make_workspace, summarize
+from synthetic import write_bank, seed_users
+
+# Dashboard analitik kelas atas riwayat ujian setahun: default 1000 siswa x 60
+# ujian x 20 jawaban, tiap siswa mengerjakan bank soal tingkat dan mapelnya.
+# Dibandingkan: agregasi di Python per baris, GROUP BY langsung atas
+# quiz_attempts/attempt_answers setiap kali dibuka, dan ringkasan analytics
+# yang di-refresh inkremental. Keluar dengan kode 1 jika
+# isi ringkasan berbeda dari hitung langsung atau dashboard melewati --budget-ms.
+QUIZ_SIZE = 20
+ROUNDS = 30
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--quizzes", type=int, default=60, help="ujian per siswa dalam setahun")
+    parser.add_argument("--bank-size", type=int, default=150, help="soal per bank (tingkat x mapel)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--budget-ms", type=float, default=1000,
+                        help="batas refresh + dashboard setelah satu kelas ujian")
+    args = parser.parse_args()
+    make_workspace()
+    from database import get_db, init_db, KKM
+    from question_bank import sync_bank
+    from quiz_engine import SUBJECT_FILES
+    import analytics
+
+    rng = random.Random(args.seed)
+    init_db()
+    db = get_db()
+    users = seed_users(db, args.students, args.seed, prefix="an_")
+    grades = dict(db.execute("SELECT username, grade_class FROM users").fetchall())
+    subjects = list(SUBJECT_FILES)
+    banks = {}
+    for grade in sorted({grades[u].split(".")[0] for u in users}):
+        for n, subject in enumerate(subjects):
+            path = write_bank(f"analitik_{n}.txt", args.bank_size, args.seed * 10000 + int(grade) * 100 + n)
+            sync_bank(db.connection(), f"an{grade}", path)
+            banks[grade, subject] = [(qid, qhash, rng.uniform(0.2, 0.95)) for qid, qhash in db.execute(
+                "SELECT id, qhash FROM questions WHERE grade = ? AND subject = ?", (f"an{grade}", f"analitik_{n}"))]
+    skills = {u: rng.uniform(0.3, 1.0) for u in users}
+    next_id = [db.execute("SELECT COALESCE(MAX(id), 0) FROM quiz_attempts").fetchone()[0] + 1]
+
+    def insert_attempts(usernames):
+        attempts, answers = [], []
+        for username in usernames:
+            attempt_id = next_id[0]
+            next_id[0] += 1
+            subject = rng.choice(subjects)
+            score = 0
+            questions = banks[grades[username].split(".")[0], subject]
+            for index, (qid, qhash, easiness) in enumerate(rng.sample(questions, QUIZ_SIZE)):
+                correct = rng.random() < (skills[username] + easiness) / 2
+                score += correct
+                answers.append((attempt_id, index, qid, rng.randrange(4), int(correct), rng.uniform(5, 240), qhash))
+            attempts.append((attempt_id, username, subject, score, QUIZ_SIZE,
+                             score / QUIZ_SIZE * 100, rng.randint(600, 5400)))
+        with db.transaction() as c:
+            c.executemany("INSERT INTO quiz_attempts (id, username, subject, score, total_questions, percentage, "
+                          "time_used) VALUES (?, ?, ?, ?, ?, ?, ?)", attempts)
+            c.executemany("INSERT INTO attempt_answers (attempt_id, question_index, question_id, selected, correct, "
+                          "time_spent, qhash) VALUES (?, ?, ?, ?, ?, ?, ?)", answers)
+
+    started = time.perf_counter()
+    for _ in range(args.quizzes):
+        insert_attempts(users)
+    total = args.students * args.quizzes
+    print(f"riwayat setahun: {total} ujian, {total * QUIZ_SIZE} jawaban "
+          f"({time.perf_counter() - started:.1f} detik membuat data)")
+
+    def timed(fn, rounds=ROUNDS):
+        samples = []
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - t0) * 1000)
+        return samples
+
+    def python_loop():
+        stats = {}
+        for grade_class, subject, percentage in db.execute(
+                "SELECT u.grade_class, a.subject, a.percentage FROM quiz_attempts a "
+                "JOIN users u ON u.username = a.username"):
+            s = stats.setdefault((grade_class, subject), [0, 0.0, 0])
+            s[0] += 1
+            s[1] += percentage
+            s[2] += percentage >= KKM
+        return stats
+
+    def direct_sql():
+        classes = db.execute("""
+            SELECT u.grade_class, a.subject, COUNT(*), AVG(a.percentage), AVG(a.percentage >= ?)
+            FROM quiz_attempts a JOIN users u ON u.username = a.username
+            GROUP BY 1, 2""", (KKM,)).fetchall()
+        items = db.execute("""
+            SELECT qhash, COUNT(*), AVG(correct) FROM attempt_answers
+            GROUP BY qhash ORDER BY 3 LIMIT 20""").fetchall()
+        return classes, items
+
+    def dashboard():
+        analytics.class_report()
+        analytics.class_report(by_class=False)
+        analytics.item_difficulty()
+
+    summarize("python loop per baris (nilai saja)", timed(python_loop, 3))
+    summarize("GROUP BY langsung tiap dibuka", timed(direct_sql, 3))
+    started = time.perf_counter()
+    analytics.rebuild()
+    print(f"{'refresh pertama (setahun penuh)':<32} {(time.perf_counter() - started) * 1000:7.0f} ms")
+    summarize("dashboard dari ringkasan", timed(dashboard))
+    class_size = 36
+
+    def after_class():
+        insert_attempts(rng.sample(users, class_size))
+        t0 = time.perf_counter()
+        dashboard()
+        return (time.perf_counter() - t0) * 1000
+
+    incremental = [after_class() for _ in range(ROUNDS)]
+    summarize(f"refresh + dashboard ({class_size} ujian baru)", incremental)
+
+    expected = {(g, s): (n, avg, passed) for g, s, n, avg, passed in direct_sql()[0]}
+    mismatched = [r for r in analytics.class_report()
+                  if abs(expected[(r["grade_class"], r["subject"])][1] - r["mean"]) > 1e-6
+                  or expected[(r["grade_class"], r["subject"])][0] != r["attempts"]
+                  or abs(expected[(r["grade_class"], r["subject"])][2] - r["pass_rate"]) > 1e-9]
+    failed = False
+    if mismatched or len(expected) != len(analytics.class_report()):
+        print(f"❌ Ringkasan berbeda dari hitung langsung: {len(mismatched)} kelas/mapel")
+        failed = True
+    else:
+        print(f"✅ Ringkasan sama dengan hitung langsung ({len(expected)} kelas/mapel)")
+    p50 = sorted(incremental)[len(incremental) // 2]
+    if p50 > args.budget_ms:
+        print(f"❌ Dashboard setelah satu kelas ujian butuh {p50:.0f} ms (batas {args.budget_ms:.0f} ms)")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
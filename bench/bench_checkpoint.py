@@ -0,0 +1,57 @@
+import os
+import time
+from common import make_workspace, summarize
+
+# Mengukur biaya checkpoint per jawaban: waktu yang ditanggung thread GUI
+# (QuizSession.select dengan dan tanpa checkpoint, dalam mikrodetik) dan
+# biaya tulis + fsync yang dikerjakan thread penulis. Sebagai pembanding,
+# tulis + fsync langsung di thread pemanggil. Jawaban diberi jeda seperti
+# siswa sungguhan, jadi tiap jawaban menjadi satu batch fsync.
+ROUNDS = 300
+PAUSE = 0.005
+
+
+def main():
+    make_workspace()
+    from quiz_engine import QuizSession
+    from checkpoint import CheckpointStore
+    from question_bank import load_questions_from_txt
+
+    user = {"username": "bench", "xp": 0}
+    questions = load_questions_from_txt("questions/11/matematika.txt")[:20]
+
+    def select_us(session):
+        samples = []
+        for i in range(ROUNDS):
+            start = time.perf_counter()
+            session.select(i % 4)
+            samples.append((time.perf_counter() - start) * 1e6)
+            time.sleep(PAUSE)
+        return samples
+
+    plain = select_us(QuizSession(user, "Matematika", questions))
+    store = CheckpointStore()
+    session = QuizSession(user, "Matematika", questions)
+    store.begin(session)
+    queued = select_us(session)
+    store.flush()
+    store.close()
+
+    inline = []
+    with open(os.path.join(store.directory, "inline.log"), "a", encoding="utf-8") as f:
+        for i in range(ROUNDS):
+            start = time.perf_counter()
+            f.write('{"e":"select","o":%d,"tl":5400}\n' % (i % 4))
+            f.flush()
+            os.fsync(f.fileno())
+            inline.append((time.perf_counter() - start) * 1e6)
+
+    summarize("select tanpa checkpoint", plain, "us")
+    summarize("select + checkpoint (antrean)", queued, "us")
+    summarize("tulis + fsync langsung", inline, "us")
+    print(f"thread penulis: {store.records} record dalam {store.batches} batch, "
+          f"{store.write_seconds * 1000 / max(store.batches, 1):.2f} ms per batch")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import time
+import random
+import argparse
+from common import load_app_module, summarize
+
+# Confetti di layar hasil: ConfettiOverlay (satu widget, satu timer, satu
+# paintEvent) dibandingkan cara lama, yaitu satu QLabel + QGraphicsOpacityEffect
+# + dua QPropertyAnimation per partikel. Yang diukur adalah waktu CPU proses
+# selama satu ledakan confetti berjalan di event loop, dan lama satu paint.
+
+
+def legacy_burst(parent, count):
+    from PyQt5.QtWidgets import QLabel, QGraphicsOpacityEffect
+    from PyQt5.QtCore import Qt, QTimer, QPoint, QPropertyAnimation, QEasingCurve
+    from PyQt5.QtGui import QFont
+    colors = ["#ef4444", "#f97316", "#eab308", "#22c55e", "#3b82f6", "#8b5cf6", "#ec4899"]
+    for _ in range(count):
+        x, y = random.randint(0, parent.width()), random.randint(-100, -20)
+        label = QLabel("✦", parent)
+        label.setFont(QFont("Arial", random.randint(18, 32)))
+        label.setStyleSheet(f"color: {random.choice(colors)}; background: transparent;")
+        label.setAttribute(Qt.WA_TranslucentBackground)
+        label.move(x, y)
+        label.show()
+        label.anim = QPropertyAnimation(label, b"pos")
+        label.anim.setDuration(2500 + random.randint(0, 1500))
+        label.anim.setStartValue(QPoint(x, y))
+        label.anim.setEndValue(QPoint(x + random.randint(-120, 120), parent.height() + 100))
+        label.anim.setEasingCurve(QEasingCurve.OutQuad)
+        effect = QGraphicsOpacityEffect(label)
+        label.setGraphicsEffect(effect)
+        label.fade_anim = QPropertyAnimation(effect, b"opacity")
+        label.fade_anim.setDuration(2000)
+        label.fade_anim.setStartValue(1.0)
+        label.fade_anim.setEndValue(0.0)
+        label.anim.start()
+        label.fade_anim.start()
+        QTimer.singleShot(4000, label.deleteLater)
+
+
+def run_loop(app, seconds):
+    cpu = time.process_time()
+    until = time.monotonic() + seconds
+    while time.monotonic() < until:
+        app.processEvents()
+        time.sleep(0.001)
+    return (time.process_time() - cpu) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=2.2)
+    parser.add_argument("--particles", type=int, nargs="+", default=[40, 160, 1000])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    module = load_app_module()
+    from PyQt5.QtWidgets import QApplication, QWidget
+    app = QApplication([])
+    window = QWidget()
+    window.resize(1280, 800)
+    window.show()
+    app.processEvents()
+    idle = run_loop(app, args.seconds)
+    print(f"event loop kosong: {idle:.0f} ms CPU dalam {args.seconds:.1f} detik")
+
+    legacy_burst(window, 40)
+    print(f"cara lama, 40 partikel: {run_loop(app, args.seconds):.0f} ms CPU")
+    run_loop(app, 2.0)
+
+    module.ConfettiOverlay.low_power = False
+    for count in args.particles:
+        overlay = module.ConfettiOverlay(window, particles=count)
+        overlay.PARTICLES = count
+        overlay.SLOW_FRAME_MS = float("inf")
+        overlay.burst()
+        cpu = run_loop(app, args.seconds)
+        paints = []
+        overlay.burst()
+        for step in range(60):
+            overlay.elapsed = step * overlay.FADE_MS / 60
+            started = time.perf_counter()
+            overlay.repaint()
+            paints.append((time.perf_counter() - started) * 1000)
+        overlay.timer.stop()
+        overlay.hide()
+        print(f"ConfettiOverlay, {count} partikel: {cpu:.0f} ms CPU")
+        summarize(f"   satu paint ({count} partikel)", paints)
+        overlay.deleteLater()
+        app.processEvents()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import time
+import random
+import argparse
+from common import make_workspace, summarize
+
+# Leaderboard untuk ribuan siswa: membaca tabel leaderboard yang dijaga
+# trigger dibandingkan menghitung ulang dari users/quiz_attempts setiap kali.
+# Di akhir dicek bahwa isi tabel sama dengan hasil hitung ulang.
+ROUNDS = 200
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--attempts", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    make_workspace()
+    from database import get_db, init_db, update_user_xp, leaderboard, leaderboard_rank, AttemptRecorder
+    from quiz_engine import SUBJECT_FILES, calculate_level
+
+    rng = random.Random(args.seed)
+    init_db()
+    db = get_db()
+    classes = [f"{g}.{k}" for g in (10, 11, 12) for k in range(1, 10)]
+    users = [(f"lb_{i}", rng.choice(classes)) for i in range(args.students)]
+    with db.transaction() as c:
+        c.executemany("INSERT OR IGNORE INTO users (username, password, xp, grade_class, religion) "
+                      "VALUES (?, 'x', 0, ?, 'Islam')", users)
+    recorder = AttemptRecorder(db, batch_size=1000)
+    started = time.perf_counter()
+    for _ in range(args.attempts):
+        username, _ = rng.choice(users)
+        recorder.record(username, rng.choice(list(SUBJECT_FILES)), rng.randint(0, 20), 20, 600, [])
+    recorder.close()
+    for username, _ in users:
+        update_user_xp(username, rng.randint(0, 20000))
+    print(f"{args.attempts} hasil ujian + {args.students} update XP (dengan trigger): "
+          f"{time.perf_counter() - started:.2f} detik")
+
+    def timed(fn):
+        samples = []
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000)
+        return samples
+
+    def recompute_class(grade_class):
+        return [dict(username=u, xp=xp, level=calculate_level(xp)) for u, xp in db.execute(
+            "SELECT username, xp FROM users WHERE grade_class = ? ORDER BY xp DESC LIMIT 10", (grade_class,))]
+
+    def recompute_subject(subject):
+        return db.execute("""
+            SELECT username, SUM(score) * 100 AS xp FROM quiz_attempts WHERE subject = ?
+            GROUP BY username ORDER BY xp DESC LIMIT 10""", (subject,)).fetchall()
+
+    username, grade_class = users[0]
+    summarize("hitung ulang top 10 kelas", timed(lambda: recompute_class(rng.choice(classes))))
+    summarize("hitung ulang top 10 mapel", timed(lambda: recompute_subject("Matematika")))
+    summarize("leaderboard top 10 kelas", timed(lambda: leaderboard(rng.choice(classes))))
+    summarize("leaderboard top 10 kelas+mapel", timed(lambda: leaderboard(rng.choice(classes), "Matematika")))
+    summarize("leaderboard top 10 semua siswa", timed(lambda: leaderboard(limit=10)))
+    summarize("peringkat satu siswa di kelas", timed(lambda: leaderboard_rank(username, grade_class)))
+    summarize("peringkat satu siswa (semua)", timed(lambda: leaderboard_rank(username)))
+
+    stale = db.execute("""
+        SELECT COUNT(*) FROM users u JOIN leaderboard l ON l.username = u.username AND l.subject = ''
+        WHERE l.xp != u.xp OR l.grade_class IS NOT u.grade_class""").fetchone()[0]
+    stale += db.execute("""
+        SELECT COUNT(*) FROM (SELECT username, subject, SUM(score) * 100 AS xp FROM quiz_attempts
+                              GROUP BY username, subject) a
+        LEFT JOIN leaderboard l ON l.username = a.username AND l.subject = a.subject
+        WHERE l.xp IS NOT a.xp""").fetchone()[0]
+    print(f"baris leaderboard yang tidak cocok: {stale}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import sys
+import time
+import asyncio
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from common import make_workspace, summarize
+
+# Throughput login dengan password ber-hash: jumlah login per detik untuk
+# 1..n thread, dibagi jumlah core yang benar-benar terpakai. Lalu simulasi
+# "satu kelas login bersamaan" lewat ExamServer: berapa lama siswa terakhir
+# menunggu, dan apakah event loop server tetap responsif (jeda heartbeat)
+# selama KDF berjalan di executor auth.
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=40, help="login per ukuran thread")
+    parser.add_argument("--students", type=int, default=36, help="jumlah siswa pada simulasi satu kelas")
+    parser.add_argument("--target-ms", type=float, help="target kalibrasi KDF (default DEGICHI_PASSWORD_MS)")
+    args = parser.parse_args()
+    make_workspace()
+    import passwords
+    from database import get_db, init_db, find_user
+
+    if args.target_ms:
+        passwords.TARGET_MS = args.target_ms
+    started = time.perf_counter()
+    cost = passwords.current_cost()
+    print(f"kalibrasi {passwords.SCHEME}: biaya {cost} dalam {(time.perf_counter() - started) * 1000:.0f} ms, "
+          f"target {passwords.TARGET_MS:.0f} ms, {passwords.WORKERS} core")
+    init_db()
+    db = get_db()
+    hashed = passwords.hash_password("rahasia")
+    count = max(args.logins, args.students)
+    with db.transaction() as c:
+        c.executemany("INSERT OR IGNORE INTO users (username, password, xp, grade_class, religion) "
+                      "VALUES (?, ?, 0, '10.1', 'Islam')", [(f"login_{i}", hashed) for i in range(count)])
+        c.executemany("INSERT OR IGNORE INTO users (username, password, xp, grade_class, religion) "
+                      "VALUES (?, 'rahasia', 0, '10.1', 'Islam')", [(f"lama_{i}",) for i in range(args.logins)])
+
+    def timed_login(username, password="rahasia"):
+        t0 = time.perf_counter()
+        user = find_user(username, password, db)
+        return (time.perf_counter() - t0) * 1000, user
+
+    single = [timed_login(f"login_{i}")[0] for i in range(10)]
+    summarize("login (1 thread)", single)
+    summarize("password salah", [timed_login("login_0", "salah")[0] for _ in range(5)])
+    summarize("username tidak ada", [timed_login("tidak_ada")[0] for _ in range(5)])
+    migrated = [timed_login(f"lama_{i}")[0] for i in range(10)]
+    summarize("login pertama baris teks biasa", migrated)
+    plain_left = sum(1 for (stored,) in db.execute("SELECT password FROM users WHERE username LIKE 'lama_%'")
+                     if not passwords.is_hashed(stored))
+    print(f"   sisa password teks biasa: {plain_left} (10 sudah dimigrasi saat login)")
+
+    print(f"\n{'thread':>6} {'login/detik':>12} {'per core':>10} {'p50':>10}")
+    threads = 1
+    while threads <= max(2, passwords.WORKERS * 2):
+        with ThreadPoolExecutor(threads) as pool:
+            t0 = time.perf_counter()
+            latencies = [ms for ms, _ in pool.map(timed_login, (f"login_{i % count}" for i in range(args.logins)))]
+            elapsed = time.perf_counter() - t0
+        rate = args.logins / elapsed
+        print(f"{threads:>6} {rate:>12.1f} {rate / min(threads, passwords.WORKERS):>10.1f} "
+              f"{sorted(latencies)[len(latencies) // 2]:>7.0f} ms")
+        threads *= 2
+
+    from exam_server import ExamServer, LoopbackClient, RemoteBackend
+    server = ExamServer().start_in_thread("127.0.0.1", None)
+    barrier = threading.Barrier(args.students + 1)
+    waits = []
+    lock = threading.Lock()
+
+    def student(n):
+        backend = RemoteBackend(LoopbackClient(server))
+        barrier.wait()
+        t0 = time.perf_counter()
+        user = backend.login(f"login_{n}", "rahasia")
+        with lock:
+            waits.append((time.perf_counter() - t0) * 1000)
+        return user
+
+    lags = []
+    with ThreadPoolExecutor(args.students) as pool:
+        futures = [pool.submit(student, n) for n in range(args.students)]
+        barrier.wait()
+        while not all(f.done() for f in futures):
+            t0 = time.perf_counter()
+            asyncio.run_coroutine_threadsafe(asyncio.sleep(0), server._loop).result()
+            lags.append((time.perf_counter() - t0) * 1000)
+            time.sleep(0.005)
+        failed = sum(1 for f in futures if f.result() is None)
+    server.stop_thread()
+    print(f"\n{args.students} siswa login bersamaan ke server ujian:")
+    summarize("   waktu tunggu login", waits)
+    print(f"   siswa terakhir masuk setelah {max(waits):.0f} ms")
+    summarize("   jeda heartbeat event loop", lags)
+    if failed:
+        print(f"❌ {failed} login gagal")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+import sys
+import time
+from common import make_workspace, load_app_module, summarize
+
+# Mengukur waktu per frame saat berpindah soal: tampilan kuis persisten
+# (hanya refresh) dibandingkan membangun ulang seluruh widget seperti dulu.
+ROUNDS = 60
+
+
+def main():
+    make_workspace()
+    app_module = load_app_module()
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    win = app_module.QuizApp()
+    win.resize(1366, 768)
+    win.show()
+    win.current_user = win.backend.login("victus", "password123")
+    win.on_quiz_started("Matematika", *win.backend.start_quiz(win.current_user, "Matematika"))
+    app.processEvents()
+
+    def frame(action):
+        start = time.perf_counter()
+        action()
+        app.processEvents()
+        return (time.perf_counter() - start) * 1000
+
+    def rebuild(index):
+        win.session.go_to(index)
+        win.quiz_view = None
+        win.show_quiz_screen()
+
+    rebuild_ms = [frame(lambda i=i: rebuild(i % 20)) for i in range(ROUNDS)]
+    incremental_ms = [frame(lambda i=i: win.go_to_question(i % 20)) for i in range(ROUNDS)]
+    win.timer.stop()
+    summarize("rebuild seluruh widget", rebuild_ms)
+    summarize("refresh tampilan persisten", incremental_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from common import ROOT, make_workspace, summarize
+
+# Waktu start aplikasi sampai layar login tergambar. Tiap putaran menjalankan
+# proses Python baru dengan -X importtime di folder kerja yang sama, jadi
+# putaran pertama ikut menjalankan migrasi skema dan putaran berikutnya
+# mengukur start biasa. Keluar dengan kode 1 jika modul yang seharusnya
+# dimuat belakangan (ReportLab, server ujian) ikut terimpor atau login
+# melewati --budget-ms.
+LAZY_MODULES = ("reportlab", "exam_server", "asyncio")
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CHILD = f"""
+import time
+started = time.perf_counter()
+import os, sys, json
+sys.path[:0] = [{ROOT!r}, {BENCH_DIR!r}]
+from common import load_app_module
+module = load_app_module()
+imported = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv[:1])
+window = module.QuizApp()
+window.show()
+window.repaint()
+app.processEvents()
+shown = time.perf_counter()
+window.backend.close()
+print(json.dumps({{"import_ms": (imported - started) * 1000, "login_ms": (shown - started) * 1000,
+                  "window_ms": (shown - imported) * 1000}}))
+"""
+
+
+def parse_importtime(stderr):
+    """Kembalikan {modul: kumulatif µs} dan total µs modul tingkat atas."""
+    modules = {}
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative)
+        if not name[1:].startswith(" "):
+            total += int(cumulative)
+    return modules, total
+
+
+def run_once(workdir):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD], cwd=workdir, env=env,
+                          capture_output=True, text=True, timeout=120)
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["wall_ms"] = wall_ms
+    result["modules"], result["importtime_ms"] = parse_importtime(proc.stderr)
+    result["importtime_ms"] /= 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=8)
+    parser.add_argument("--top", type=int, default=10, help="jumlah modul terlama yang ditampilkan")
+    parser.add_argument("--budget-ms", type=float, default=1500, help="batas p50 sampai login tergambar")
+    args = parser.parse_args()
+    workdir = make_workspace()
+    first = run_once(workdir)
+    runs = [run_once(workdir) for _ in range(args.runs)]
+    print(f"putaran pertama (migrasi skema): login {first['login_ms']:.0f} ms, "
+          f"jendela {first['window_ms']:.0f} ms")
+    summarize("impor modul (-X importtime)", [r["importtime_ms"] for r in runs])
+    summarize("impor skrip aplikasi", [r["import_ms"] for r in runs])
+    summarize("QuizApp() sampai login", [r["window_ms"] for r in runs])
+    summarize("start sampai login tergambar", [r["login_ms"] for r in runs])
+    summarize("proses (termasuk interpreter)", [r["wall_ms"] for r in runs])
+    modules = runs[-1]["modules"]
+    print(f"\n{args.top} modul terlama (kumulatif):")
+    for name, us in sorted(modules.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"   {us / 1000:8.1f} ms  {name}")
+    failed = False
+    eager = sorted({name.split(".")[0] for name in modules} & set(LAZY_MODULES))
+    if eager:
+        print(f"❌ Dimuat saat start padahal seharusnya lazy: {', '.join(eager)}")
+        failed = True
+    login_p50 = sorted(r["login_ms"] for r in runs)[len(runs) // 2]
+    if login_p50 > args.budget_ms:
+        print(f"❌ Login tergambar setelah {login_p50:.0f} ms (batas {args.budget_ms:.0f} ms)")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import argparse
+from common import make_workspace, summarize
+
+# TaskRunner: waktu dari submit sampai callback di thread GUI untuk query
+# kecil, dan jumlah koneksi SQLite yang dibuka. Thread pekerja harus tetap
+# hidup antar tugas, jadi N tugas paling banyak membuka max_threads koneksi.
+# Keluar dengan kode 1 jika lebih.
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    make_workspace()
+    from PyQt5.QtWidgets import QApplication
+    from database import get_db, init_db
+    from workers import TaskRunner
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    db = get_db()
+    init_db(db)
+    before = len(db._connections)
+    runner = TaskRunner(max_threads=args.threads)
+    latencies = []
+
+    def query(started):
+        db.execute("SELECT COUNT(*) FROM users").fetchone()
+        return started
+
+    for _ in range(args.tasks):
+        runner.submit(query, time.perf_counter(),
+                      on_done=lambda started: latencies.append((time.perf_counter() - started) * 1000))
+    runner.wait()
+    while len(latencies) < args.tasks:
+        app.processEvents()
+    summarize(f"submit sampai callback ({args.tasks} tugas)", latencies)
+    opened = len(db._connections) - before
+    print(f"koneksi dibuka thread pekerja: {opened} (maksimal {args.threads})")
+    if opened > args.threads:
+        print(f"❌ {args.tasks} tugas membuka {opened} koneksi; koneksi per thread tidak dipakai ulang")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
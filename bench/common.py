@@ -0,0 +1,50 @@
+import os
+import sys
+import shutil
+import tempfile
+import importlib.util
+
+# Utilitas bersama untuk skrip benchmark: menyalin data aplikasi ke folder
+# sementara (quizquest.db asli tidak ikut berubah) dan memuat skrip utama.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_SCRIPT = os.path.join(ROOT, "projekdegichi (2).py")
+WORKSPACE_ITEMS = ("questions", "asset", "quizquest.db")
+
+
+def make_workspace():
+    workdir = tempfile.mkdtemp(prefix="degichi_bench_")
+    for name in WORKSPACE_ITEMS:
+        src = os.path.join(ROOT, name)
+        if os.path.isdir(src):
+            shutil.copytree(src, os.path.join(workdir, name))
+        elif os.path.exists(src):
+            shutil.copy(src, os.path.join(workdir, name))
+    os.chdir(workdir)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    return workdir
+
+
+def load_app_module():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    spec = importlib.util.spec_from_file_location("degichi_app", APP_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(name, samples, unit="ms"):
+    print(f"{name:<32} mean {sum(samples) / len(samples):7.2f} {unit}  "
+          f"p50 {percentile(samples, 50):7.2f} {unit}  p95 {percentile(samples, 95):7.2f} {unit}")
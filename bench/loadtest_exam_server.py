@@ -0,0 +1,83 @@
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from common import make_workspace, summarize
+
+# Uji beban mode server ujian: satu ExamServer melayani banyak siswa yang
+# login, mengerjakan 20 soal dan menyelesaikan kuis bersamaan. Default lewat
+# TCP di localhost; --loopback memanggil server tanpa socket.
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=1, help="kuis per siswa")
+    parser.add_argument("--loopback", action="store_true")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    make_workspace()
+    from database import get_db, init_db
+    from quiz_engine import SUBJECT_FILES, POWERUP_COSTS
+    from exam_server import ExamServer, ExamClient, LoopbackClient, RemoteBackend
+
+    init_db()
+    db = get_db()
+    with db.transaction() as c:
+        for i in range(args.students):
+            c.execute("INSERT OR IGNORE INTO users (username, password, xp, grade_class, religion) "
+                      "VALUES (?, 'rahasia', 0, ?, 'Islam')", (f"lab_{i}", f"{10 + i % 3}.{1 + i % 9}"))
+    server = ExamServer().start_in_thread("127.0.0.1", None if args.loopback else 0)
+    subjects = [s for s in SUBJECT_FILES if s != "Olahraga"] + ["Agama"]
+    timings = {"login": [], "start": [], "request": [], "finish": []}
+    lock = threading.Lock()
+    barrier = threading.Barrier(args.students)
+
+    def run_student(n):
+        rng = random.Random(args.seed + n)
+        client = LoopbackClient(server) if args.loopback else ExamClient("127.0.0.1", server.port)
+        backend = RemoteBackend(client)
+        barrier.wait()
+        local = {"login": [], "start": [], "request": [], "finish": []}
+        t0 = time.perf_counter()
+        user = backend.login(f"lab_{n}", "rahasia")
+        local["login"].append((time.perf_counter() - t0) * 1000)
+        for _ in range(args.rounds):
+            t0 = time.perf_counter()
+            status, _, session = backend.start_quiz(user, rng.choice(subjects))
+            local["start"].append((time.perf_counter() - t0) * 1000)
+            if status != "ok":
+                continue
+            while not session.finished:
+                t0 = time.perf_counter()
+                if rng.random() < 0.05:
+                    session.use_powerup(rng.choice(list(POWERUP_COSTS)))
+                session.select(rng.randrange(4))
+                session.next()
+                local["request"].append((time.perf_counter() - t0) * 1000 / 2)
+            t0 = time.perf_counter()
+            backend.finish_quiz(session)
+            local["finish"].append((time.perf_counter() - t0) * 1000)
+        backend.close()
+        with lock:
+            for name, values in local.items():
+                timings[name].extend(values)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.students) as pool:
+        list(pool.map(run_student, range(args.students)))
+    elapsed = time.perf_counter() - started
+    server.stop_thread()
+    stored = db.execute("SELECT COUNT(*) FROM quiz_attempts WHERE username LIKE 'lab_%'").fetchone()[0]
+    mode = "loopback" if args.loopback else "TCP"
+    print(f"{args.students} siswa x {args.rounds} kuis lewat {mode}, {elapsed:.2f} detik, "
+          f"{stored} hasil tersimpan")
+    summarize("login", timings["login"])
+    summarize("mulai kuis", timings["start"])
+    summarize("jawab/pindah soal (per request)", timings["request"])
+    summarize("selesai", timings["finish"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from common import make_workspace, summarize
+
+# Uji beban mesin kuis tanpa layar: ribuan QuizSession berjalan bersamaan
+# terhadap bank soal asli dan salinan quizquest.db, termasuk penyimpanan
+# hasil ujian dan update XP. Dipakai untuk memperkirakan kebutuhan hardware.
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    make_workspace()
+    from database import get_db, init_db, add_user_xp, AttemptRecorder
+    from question_bank import BankCache
+    from quiz_engine import QuizSession, SUBJECT_FILES, POWERUP_COSTS, bank_for, draw_questions
+
+    init_db()
+    db = get_db()
+    users = []
+    with db.transaction() as c:
+        for i in range(args.concurrency):
+            grade_class = f"{10 + i % 3}.{1 + i % 9}"
+            username = f"loadtest_{i}"
+            c.execute("INSERT OR IGNORE INTO users (username, password, xp, grade_class, religion) "
+                      "VALUES (?, 'x', 0, ?, 'Islam')", (username, grade_class))
+            users.append({"username": username, "xp": 0, "grade_class": grade_class, "religion": "Islam"})
+    subjects = [s for s in SUBJECT_FILES if s != "Olahraga"] + ["Agama"]
+    bank_cache = BankCache()
+    recorder = AttemptRecorder(flush_interval=0.5)
+    timings = {"start": [], "answer": [], "finish": []}
+    lock = threading.Lock()
+
+    def run_session(n):
+        rng = random.Random(args.seed + n)
+        user = dict(users[n % len(users)])
+        subject = rng.choice(subjects)
+        t0 = time.perf_counter()
+        grade_part, filename, filepath = bank_for(user, subject)
+        total, questions = draw_questions(grade_part, filename, filepath, bank_cache)
+        if total < 20:
+            return
+        # Jam simulasi: tiap soal dijawab dalam 30-240 detik.
+        now = [0.0]
+        session = QuizSession(user, subject, questions, rng=rng, clock=lambda: now[0])
+        t1 = time.perf_counter()
+        while not session.finished:
+            if rng.random() < 0.05:
+                session.use_powerup(rng.choice(list(POWERUP_COSTS)))
+            session.select(rng.randrange(4))
+            session.next()
+            now[0] += rng.randint(30, 240)
+        t2 = time.perf_counter()
+        add_user_xp(user["username"], session.xp_earned)
+        recorder.record(user["username"], subject, session.score, len(session.questions),
+                        session.time_used, session.answer_log())
+        t3 = time.perf_counter()
+        with lock:
+            timings["start"].append((t1 - t0) * 1000)
+            timings["answer"].append((t2 - t1) * 1000 / len(session.questions))
+            timings["finish"].append((t3 - t2) * 1000)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(run_session, range(args.sessions)))
+    recorder.close()
+    elapsed = time.perf_counter() - started
+    stored = db.execute("SELECT COUNT(*) FROM quiz_attempts WHERE username LIKE 'loadtest_%'").fetchone()[0]
+    print(f"{len(timings['start'])} sesi, {args.concurrency} bersamaan, {elapsed:.2f} detik "
+          f"({len(timings['start']) / elapsed:.0f} sesi/detik), {stored} hasil tersimpan")
+    summarize("mulai kuis (ambil 20 soal)", timings["start"])
+    summarize("jawab satu soal", timings["answer"])
+    summarize("selesai (XP + hasil ujian)", timings["finish"])
+
+
+if __name__ == "__main__":
+    main()
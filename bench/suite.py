@@ -0,0 +1,268 @@
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import platform
+from common import make_workspace, percentile
+from synthetic import write_bank, seed_users
+
+# Suite benchmark headless yang bisa diulang persis (seed tetap): parsing bank
+# soal sintetis 1k/10k/100k, impor ke database, pengambilan soal, penulisan
+# XP dan hasil ujian untuk ribuan siswa, login, serta render PDF laporan.
+#
+# Supaya angka dari PC lab yang berbeda bisa dibandingkan, tiap benchmark
+# diberi skor = median sampel / waktu kalibrasi (beban CPU tetap yang diukur
+# ulang tepat sebelum benchmark itu, jadi perubahan clock CPU di tengah jalan
+# ikut ternormalisasi). Median dipakai, bukan sampel tercepat: pada operasi
+# sepersekian milidetik sampel tercepat bergeser puluhan persen hanya karena
+# tata letak memori. Skor dibandingkan dengan BASELINE_PATH; benchmark yang
+# melambat lebih dari --tolerance diukur ulang sampai --confirm kali dan hanya
+# ditandai (kode keluar 1) jika lambatnya muncul lagi di setiap pengukuran
+# ulang. Selisih median yang tidak melebihi NOISE_FLOOR_MS per panggilan,
+# atau sebaran p50-p95 baseline-nya, tidak dihitung melambat.
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+SIZES = (1000, 10000, 100000)
+BENCH_GRADE = "99"
+QUIZ_SIZE = 20
+NOISE_FLOOR_MS = 0.05
+
+
+def calibrate(rounds=7):
+    """Waktu terbaik (ms) satu beban CPU campuran yang tetap: loop Python, sort, dict, sha1."""
+    data = bytes(range(256)) * 256
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        acc = 0
+        for i in range(100000):
+            acc = (acc * 31 + i) & 0xFFFFFFFF
+        values = sorted(random.Random(1).random() for _ in range(50000))
+        {str(v): i for i, v in enumerate(values[:20000])}
+        for _ in range(20):
+            hashlib.sha1(data).digest()
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best
+
+
+def repeat_for(size):
+    return max(3, min(20, 100000 // size))
+
+
+def measure(fn, repeat, warmup=1, inner=1):
+    """Sampel waktu (ms per panggilan); operasi singkat diulang `inner` kali per sampel."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(inner):
+            fn()
+        samples.append((time.perf_counter() - started) * 1000 / inner)
+    return samples
+
+
+class Suite:
+    def __init__(self, sizes, users, seed):
+        from database import get_db, init_db
+        self.sizes = sizes
+        self.seed = seed
+        init_db()
+        self.db = get_db()
+        self.conn = self.db.connection()
+        self.users = seed_users(self.db, users, seed)
+        os.makedirs(os.path.join("questions", BENCH_GRADE), exist_ok=True)
+        self.banks = {n: write_bank(os.path.join("questions", BENCH_GRADE, f"sintetis_{n}.txt"), n, seed)
+                      for n in sizes}
+        self.counts = {}
+
+    def benchmarks(self):
+        for n in self.sizes:
+            yield f"parse_{n}", lambda n=n: self.parse(n)
+            yield f"import_{n}", lambda n=n: self.import_bank(n)
+            yield f"sample_legacy_{n}", lambda n=n: self.sample_legacy(n)
+            yield f"sample_random_{n}", lambda n=n: self.sample(n, None, None)
+            yield f"sample_balanced_{n}", lambda n=n: self.sample(n, "balanced", None)
+            yield f"sample_seen_half_{n}", lambda n=n: self.sample(n, None, 0.5)
+        yield "xp_update", self.xp_update
+        yield "attempt_batch_500", self.attempt_batch
+        yield "leaderboard_rank", self.leaderboard_rank
+        yield "login", self.login
+        yield "report_pdf", self.report_pdf
+
+    def parse(self, n):
+        from question_bank import load_questions_from_txt, ValidationReport
+        return measure(lambda: load_questions_from_txt(self.banks[n], ValidationReport()), repeat_for(n))
+
+    def import_bank(self, n):
+        from question_bank import sync_bank
+
+        def run():
+            self.conn.execute("DELETE FROM question_sources WHERE grade = ? AND subject = ?",
+                              (BENCH_GRADE, f"sintetis_{n}"))
+            self.counts[n] = sync_bank(self.conn, BENCH_GRADE, self.banks[n])
+        return measure(run, 1 if n >= 100000 else 3, warmup=0)
+
+    def _count(self, n):
+        if n not in self.counts:
+            from question_bank import sync_bank
+            self.counts[n] = sync_bank(self.conn, BENCH_GRADE, self.banks[n])
+        return self.counts[n]
+
+    def sample_legacy(self, n):
+        from question_bank import load_questions_from_txt
+        questions = load_questions_from_txt(self.banks[n])
+        return measure(lambda: random.sample(questions, QUIZ_SIZE), 50, inner=100)
+
+    def sample(self, n, mode, seen_fraction):
+        from question_bank import sample_questions, difficulty_plan
+        from database import SeenSet
+        count = self._count(n)
+        plan = difficulty_plan(QUIZ_SIZE, count, mode) if mode else None
+        seen = None
+        if seen_fraction is not None:
+            seen = SeenSet()
+            for seq in random.sample(range(count), int(count * seen_fraction)):
+                seen.add(seq)
+        return measure(lambda: sample_questions(self.conn, BENCH_GRADE, f"sintetis_{n}", QUIZ_SIZE, count,
+                                                plan, seen), 50, inner=10)
+
+    def xp_update(self):
+        from database import update_user_xp
+        return measure(lambda: update_user_xp(random.choice(self.users), random.randint(0, 20000), self.db), 50, inner=20)
+
+    def attempt_batch(self):
+        from database import AttemptRecorder
+        n = min(self.sizes)
+        self._count(n)
+        ids = [row[0] for row in self.conn.execute(
+            "SELECT id FROM questions WHERE grade = ? AND subject = ?", (BENCH_GRADE, f"sintetis_{n}"))]
+        recorder = AttemptRecorder(self.db, batch_size=10 ** 9, flush_interval=3600, pending_path="bench_pending.jsonl")
+
+        def run():
+            for _ in range(500):
+                answers = [(qid, random.randrange(4), random.random() < 0.6, random.uniform(5, 90))
+                           for qid in random.sample(ids, QUIZ_SIZE)]
+                recorder.record(random.choice(self.users), "Matematika", sum(a[2] for a in answers),
+                                QUIZ_SIZE, 900, answers)
+            recorder.flush()
+        try:
+            return measure(run, 5)
+        finally:
+            recorder.close()
+
+    def leaderboard_rank(self):
+        from database import leaderboard_rank
+        return measure(lambda: leaderboard_rank(random.choice(self.users), random.choice(("10.1", "11.2")),
+                                                db=self.db), 50, inner=20)
+
+    def login(self):
+        from database import find_user
+        return measure(lambda: find_user(random.choice(self.users), "x", self.db), 10)
+
+    def report_pdf(self):
+        from reports import write_result_pdf
+        data = {"username": "bench_0", "grade_class": "10.1", "religion": "Islam", "subject": "Matematika",
+                "score": 17, "total_questions": QUIZ_SIZE, "time_used": 1234}
+        return measure(lambda: write_result_pdf("bench_report.pdf", data), 30)
+
+
+def run_benchmark(name, fn, seed):
+    random.seed(f"{seed}:{name}")
+    calibration = calibrate(3)
+    samples = fn()
+    return {"best_ms": min(samples), "p50_ms": percentile(samples, 50), "p95_ms": percentile(samples, 95),
+            "runs": len(samples), "calibration_ms": calibration, "score": percentile(samples, 50) / calibration}
+
+
+def is_slower(result, base, tolerance):
+    scale = result["calibration_ms"] / base["calibration_ms"]
+    grown_ms = result["p50_ms"] - base["p50_ms"] * scale
+    spread_ms = (base["p95_ms"] - base["p50_ms"]) * scale
+    return result["score"] / base["score"] - 1 > tolerance and grown_ms > max(NOISE_FLOOR_MS, spread_ms)
+
+
+def slower_than(results, baseline, tolerance):
+    base = baseline.get("results", {}) if baseline else {}
+    return [name for name, r in results.items() if name in base and is_slower(r, base[name], tolerance)]
+
+
+def compare(results, baseline, tolerance):
+    """Cetak tabel hasil; mengembalikan nama benchmark yang melambat."""
+    slower = []
+    base = baseline.get("results", {}) if baseline else {}
+    print(f"\n{'benchmark':<26}{'p50':>13}{'p95':>13}{'skor':>10}{'baseline':>10}{'ubah':>8}")
+    for name, r in results.items():
+        line = f"{name:<26}{r['p50_ms']:>10.3f} ms{r['p95_ms']:>10.3f} ms{r['score']:>10.3g}"
+        if name in base:
+            change = r["score"] / base[name]["score"] - 1
+            line += f"{base[name]['score']:>10.3g}{change:>+8.0%}"
+            if is_slower(r, base[name], tolerance):
+                line += "  ❌ melambat"
+                slower.append(name)
+        print(line)
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite benchmark DEGICHI (headless).")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="jumlah soal bank sintetis")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", help="hanya benchmark yang namanya mengandung teks ini")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="simpan hasil sebagai baseline baru")
+    parser.add_argument("--output", help="simpan hasil lengkap (JSON) ke file ini")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="batas melambat relatif terhadap baseline")
+    parser.add_argument("--confirm", type=int, default=3, help="ukur ulang benchmark yang melambat sampai n kali")
+    args = parser.parse_args()
+    baseline_path = os.path.abspath(args.baseline)
+    output_path = os.path.abspath(args.output) if args.output else None
+    calibration = calibrate()
+    print(f"kalibrasi: {calibration:.1f} ms ({platform.python_implementation()} {platform.python_version()}, "
+          f"{platform.machine()})")
+    make_workspace()
+    suite = Suite(args.sizes, args.users, args.seed)
+    benchmarks = {name: fn for name, fn in suite.benchmarks() if not args.only or args.only in name}
+    results = {}
+    for name, fn in benchmarks.items():
+        results[name] = run_benchmark(name, fn, args.seed)
+        print(f"   {name:<26} p50 {results[name]['p50_ms']:9.2f} ms", flush=True)
+    report = {
+        "calibration_ms": calibration,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "sizes": args.sizes,
+        "users": args.users,
+        "seed": args.seed,
+        "results": results,
+    }
+    baseline = None
+    if os.path.exists(baseline_path) and not args.save_baseline:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    for _ in range(args.confirm):
+        suspects = slower_than(results, baseline, args.tolerance)
+        if not suspects:
+            break
+        print(f"   mengukur ulang: {', '.join(suspects)}", flush=True)
+        for name in suspects:
+            again = run_benchmark(name, benchmarks[name], args.seed)
+            if again["score"] < results[name]["score"]:
+                results[name] = again
+    slower = compare(results, baseline, args.tolerance)
+    for path in filter(None, (output_path, baseline_path if args.save_baseline else None)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Hasil disimpan ke {path}")
+    if slower:
+        print(f"❌ {len(slower)} benchmark melambat lebih dari {args.tolerance:.0%}: {', '.join(slower)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import random
+
+# Data sintetis yang bisa dibuat ulang persis (seed tetap) untuk benchmark:
+# bank soal berformat [SOAL] dan siswa di tabel users.
+WORDS = (
+    "energi gaya massa sel atom ion reaksi larutan fungsi turunan integral peluang data kalimat paragraf teks "
+    "puisi tokoh latar sejarah kerajaan kolonial proklamasi pancasila hukum negara warga pasar harga modal "
+    "pajak bank iklim peta gempa sungai laut hutan tanah batuan ekosistem genetika virus bakteri organ darah "
+    "otot tulang cahaya bunyi listrik magnet suhu kalor gelombang lensa cermin vektor matriks barisan deret "
+    "grafik tabel rumus nilai jumlah selisih hasil bagi kali akar pangkat sudut segitiga lingkaran kubus "
+    "tabung kerucut bola olahraga lari lompat renang voli bola basket kebugaran agama doa ibadah akhlak"
+).split()
+GRADES = ("10", "11", "12")
+CLASSES = tuple(f"{g}.{k}" for g in GRADES for k in range(1, 10))
+
+
+def make_question(rng, n):
+    stem = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 14)))
+    options = [f"{rng.choice(WORDS)} {rng.randint(1, 999)}" for _ in range(3)]
+    options.append(f"{rng.choice(WORDS)} {1000 + n}")
+    q = {"text": f"{stem.capitalize()} nomor {n}...", "options": options, "answer": rng.randrange(4)}
+    if rng.random() < 0.5:
+        q["clue"] = " ".join(rng.choice(WORDS) for _ in range(5))
+    return q
+
+
+def write_bank(path, count, seed=1):
+    """Tulis `count` soal sintetis ke `path` dalam format [SOAL]."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for n in range(count):
+            q = make_question(rng, n)
+            f.write("[SOAL]\n")
+            f.write(f"text: {q['text']}\n")
+            for letter, option in zip("ABCD", q["options"]):
+                f.write(f"option_{letter}: {option}\n")
+            f.write(f"answer: {'ABCD'[q['answer']]}\n")
+            if "clue" in q:
+                f.write(f"clue: {q['clue']}\n")
+            f.write("\n")
+    return path
+
+
+def seed_users(db, count, seed=1, prefix="bench_"):
+    """Tambahkan `count` siswa (password 'x'); mengembalikan list username.
+
+    Semua siswa memakai satu hash yang sama dengan biaya KDF minimum, supaya
+    seeding cepat dan waktu login tidak bergantung pada kalibrasi mesin.
+    """
+    from passwords import hash_password, MINIMUM_COST
+    rng = random.Random(seed)
+    hashed = hash_password("x", MINIMUM_COST)
+    users = [(f"{prefix}{i}", hashed, rng.randint(0, 20000), rng.choice(CLASSES)) for i in range(count)]
+    with db.transaction() as c:
+        c.executemany("INSERT OR IGNORE INTO users (username, password, xp, grade_class, religion) "
+                      "VALUES (?, ?, ?, ?, 'Islam')", users)
+    return [u[0] for u in users]
@@ -0,0 +1,209 @@
+import os
+import re
+import json
+import time
+import queue
+import atexit
+import threading
+
+# Checkpoint kuis yang sedang berjalan, supaya siswa bisa melanjutkan ujian
+# setelah aplikasi crash atau PC restart. Tiap user punya satu log JSON per
+# baris di CHECKPOINT_DIR: baris pertama berisi soal-soal kuis, baris
+# berikutnya tiap aksi (pilih jawaban, pindah soal, lanjut, power-up) beserta
+# sisa waktu dan jam dinding saat ditulis. Penulisan dilakukan thread
+# terpisah dan di-fsync per batch, jadi QuizSession hanya memasukkan record ke
+# antrean.
+#
+# Saat dilanjutkan, waktu selama aplikasi mati tetap dihitung (seperti ujian
+# di kertas, menutup aplikasi tidak menghentikan jam). DEGICHI_PAUSE_OFFLINE=1
+# menghentikan jam selama aplikasi mati, misal untuk latihan di rumah.
+CHECKPOINT_DIR = "checkpoints"
+PAUSE_OFFLINE = os.environ.get("DEGICHI_PAUSE_OFFLINE") == "1"
+_STOP = object()
+
+
+def _safe_name(username):
+    return re.sub(r"[^\w.-]", "_", username)
+
+
+class CheckpointStore:
+    def __init__(self, directory=CHECKPOINT_DIR, fsync=True):
+        self.directory = directory
+        self.fsync = fsync
+        self.records = 0
+        self.batches = 0
+        self.write_seconds = 0.0
+        os.makedirs(directory, exist_ok=True)
+        self._queue = queue.Queue()
+        self._files = {}
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def path_for(self, username):
+        return os.path.join(self.directory, _safe_name(username) + ".log")
+
+    def begin(self, session):
+        """Mulai log baru untuk `session` dan sambungkan session ke log itu."""
+        username = session.user["username"]
+        self._put(("begin", username, {
+            "e": "start",
+            "subject": session.subject,
+            "duration": session.duration,
+            "questions": session.questions,
+            "tl": session.time_left,
+            "at": time.time(),
+        }))
+        self.attach(session)
+
+    def attach(self, session):
+        username = session.user["username"]
+        session.checkpoint = lambda record: self._put(("append", username, dict(record, at=time.time())))
+
+    def discard(self, username):
+        self._put(("discard", username, None))
+
+    def _put(self, item):
+        if not self._closed:
+            self._queue.put(item)
+
+    def load(self, username):
+        """Baca semua record log `username`; baris yang rusak atau terpotong dilewati."""
+        self.flush()
+        path = self.path_for(username)
+        if not os.path.exists(path):
+            return []
+        records = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        return records
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            started = time.perf_counter()
+            stop = False
+            touched = set()
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                    continue
+                action, username, record = item
+                try:
+                    self._write(action, username, record, touched)
+                except OSError as e:
+                    print(f"❌ Checkpoint {username} gagal ditulis: {e}")
+            for username in touched:
+                f = self._files.get(username)
+                if f is None:
+                    continue
+                try:
+                    f.flush()
+                    if self.fsync:
+                        os.fsync(f.fileno())
+                except OSError as e:
+                    print(f"❌ Checkpoint {username} gagal ditulis: {e}")
+            self.write_seconds += time.perf_counter() - started
+            self.batches += 1
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                break
+
+    def _write(self, action, username, record, touched):
+        f = self._files.pop(username, None) if action != "append" else self._files.get(username)
+        if action == "discard":
+            if f is not None:
+                f.close()
+            path = self.path_for(username)
+            if os.path.exists(path):
+                os.remove(path)
+            touched.discard(username)
+            return
+        if f is None or action == "begin":
+            if f is not None:
+                f.close()
+            path = self.path_for(username)
+            if action != "begin":
+                _trim_partial_line(path)
+            f = open(path, "w" if action == "begin" else "a", encoding="utf-8")
+            self._files[username] = f
+        f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.records += 1
+        touched.add(username)
+
+    def flush(self):
+        if not self._closed:
+            self._queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout=5)
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+
+def _trim_partial_line(path):
+    """Buang baris terakhir yang terpotong (crash saat menulis) sebelum log disambung."""
+    try:
+        with open(path, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                f.truncate(end)
+    except FileNotFoundError:
+        pass
+
+
+def progress(session):
+    """Ringkasan kuis yang bisa dilanjutkan, untuk ditampilkan saat login."""
+    return {
+        "subject": session.subject,
+        "answered": sum(1 for a in session.answers if a != -1),
+        "total": len(session.questions),
+        "time_left": session.time_left,
+    }
+
+
+def restore_session(user, records, session_factory, pause_offline=PAUSE_OFFLINE):
+    """Bangun ulang QuizSession dari record checkpoint; None jika log kosong/rusak.
+
+    Sisa waktu diambil dari record terakhir dikurangi waktu sejak record itu
+    ditulis, kecuali `pause_offline` atau semua soal sudah dijawab.
+    """
+    if not records or records[0].get("e") != "start":
+        return None
+    start = records[0]
+    session = session_factory(user, start["subject"], start["questions"], start["duration"])
+    for r in records[1:]:
+        event = r.get("e")
+        if event == "select":
+            session.select(r["o"])
+        elif event == "go_to":
+            session.go_to(r["i"])
+        elif event == "next":
+            session.next()
+        elif event == "powerup":
+            session.use_powerup(r["name"])
+    last = records[-1]
+    time_left = last["tl"]
+    if not pause_offline and session.stopped_at is None and "at" in last:
+        time_left -= max(0.0, time.time() - last["at"])
+    session.deadline = session.clock() + time_left
+    if session.stopped_at is not None:
+        session.stopped_at = session.clock()
+    return session
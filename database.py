@@ -0,0 +1,683 @@
+import os
+import json
+import atexit
+import sqlite3
+import datetime
+import threading
+from contextlib import contextmanager
+import perf
+import passwords
+
+# Semua akses ke quizquest.db lewat modul ini. Tiap thread memakai satu koneksi
+# yang tetap terbuka (pool per thread), sehingga tidak ada connect/close untuk
+# setiap query. Mode WAL membuat pembaca tidak memblokir penulis; jika database
+# berada di folder jaringan yang tidak mendukung shared memory, set
+# DEGICHI_DB_JOURNAL=DELETE.
+DB_PATH = "quizquest.db"
+STATEMENT_CACHE_SIZE = 128
+XP_PER_CORRECT = 100
+# Kriteria ketuntasan minimal (persen), dipakai laporan PDF dan analitik kelas.
+KKM = 75
+# Baris leaderboard dengan subject kosong berisi XP total (users.xp).
+ALL_SUBJECTS = ""
+# Versi skema disimpan di PRAGMA user_version. init_db hanya menjalankan
+# CREATE/ALTER/seed jika versinya lebih lama, jadi start aplikasi biasa cukup
+# satu PRAGMA. Naikkan angka ini setiap kali skema di init_db berubah.
+SCHEMA_VERSION = 5
+PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",
+)
+
+
+class Database:
+    def __init__(self, path=DB_PATH, journal_mode=None):
+        self.path = path
+        self.journal_mode = journal_mode or os.environ.get("DEGICHI_DB_JOURNAL", "WAL")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def _connect(self):
+        # sqlite3 menyimpan prepared statement per koneksi (LRU berdasarkan
+        # teks SQL), jadi query yang sama tidak di-parse ulang. Tiap koneksi
+        # tetap hanya dipakai thread pemiliknya; check_same_thread=False hanya
+        # agar close() dari thread utama saat keluar bisa menutup semuanya.
+        conn = sqlite3.connect(self.path, timeout=5.0, cached_statements=STATEMENT_CACHE_SIZE,
+                               check_same_thread=False)
+        try:
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        except sqlite3.OperationalError as e:
+            print(f"❌ Journal mode {self.journal_mode} tidak bisa dipakai: {e}")
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def execute(self, sql, params=()):
+        return self.connection().execute(sql, params)
+
+    def executemany(self, sql, rows):
+        return self.connection().executemany(sql, rows)
+
+    @contextmanager
+    def transaction(self):
+        conn = self.connection()
+        with conn:
+            yield conn
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"❌ Koneksi database gagal ditutup: {e}")
+        self._local = threading.local()
+
+
+_default_db = None
+
+
+def get_db():
+    global _default_db
+    if _default_db is None:
+        _default_db = Database()
+    return _default_db
+
+
+def init_db(db=None):
+    """Buat/migrasikan skema; tidak melakukan apa-apa jika skema sudah terbaru."""
+    db = db or get_db()
+    version = db.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+    with db.transaction() as c:
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password TEXT NOT NULL,
+                xp INTEGER DEFAULT 0,
+                grade_class TEXT DEFAULT '10.1',
+                religion TEXT DEFAULT 'Islam',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
+        # Biaya minimum: init_db berjalan di thread GUI, kalibrasi KDF jangan
+        # ikut di sini. Hash akun contoh tetap sah dan tidak perlu di-hash ulang.
+        try:
+            c.execute("INSERT INTO users (username, password, xp, grade_class, religion) VALUES (?, ?, ?, ?, ?)",
+                      ("victus", passwords.hash_password("password123", passwords.MINIMUM_COST), 250, "11.5",
+                       "Islam"))
+        except sqlite3.IntegrityError:
+            pass
+        try:
+            c.execute("ALTER TABLE users ADD COLUMN grade_class TEXT DEFAULT '10.1'")
+        except:
+            pass
+        try:
+            c.execute("ALTER TABLE users ADD COLUMN religion TEXT DEFAULT 'Islam'")
+        except:
+            pass
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS questions(
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                subject TEXT,
+                grade TEXT,
+                question TEXT,
+                option_a TEXT,
+                option_b TEXT,
+                option_c TEXT,
+                option_d TEXT,
+                answer INTEGER)""")
+        try:
+            c.execute("ALTER TABLE questions ADD COLUMN clue TEXT")
+        except:
+            pass
+        try:
+            c.execute("ALTER TABLE questions ADD COLUMN seq INTEGER")
+        except:
+            pass
+        c.execute("CREATE INDEX IF NOT EXISTS idx_questions_grade_subject ON questions (grade, subject, seq)")
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS question_sources (
+                grade TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                question_count INTEGER NOT NULL,
+                PRIMARY KEY (grade, subject))""")
+        # qhash/dup_group dari dedup.py; bank lama diimpor ulang agar terisi.
+        try:
+            c.execute("ALTER TABLE questions ADD COLUMN qhash TEXT")
+            c.execute("ALTER TABLE questions ADD COLUMN dup_group TEXT")
+            c.execute("DELETE FROM question_sources")
+        except:
+            pass
+        # difficulty_rank: urutan soal dari yang paling mudah per kelas + mapel,
+        # dihitung ulang oleh question_bank.rank_difficulty.
+        try:
+            c.execute("ALTER TABLE questions ADD COLUMN difficulty_rank INTEGER")
+            c.execute("DELETE FROM question_sources")
+        except:
+            pass
+        try:
+            c.execute("ALTER TABLE question_sources ADD COLUMN answers_since_rank INTEGER NOT NULL DEFAULT 0")
+        except:
+            pass
+        # sha1 isi file bank: bank yang hanya berubah mtime-nya tidak diimpor ulang.
+        try:
+            c.execute("ALTER TABLE question_sources ADD COLUMN sha1 TEXT")
+        except:
+            pass
+        c.execute("""
+            CREATE INDEX IF NOT EXISTS idx_questions_difficulty
+            ON questions (grade, subject, difficulty_rank, seq)""")
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS quiz_attempts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                score INTEGER NOT NULL,
+                total_questions INTEGER NOT NULL,
+                percentage REAL NOT NULL,
+                time_used INTEGER NOT NULL,
+                attempt_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (username) REFERENCES users(username))""")
+        c.execute("""
+            CREATE INDEX IF NOT EXISTS idx_quiz_attempts_user_subject_date
+            ON quiz_attempts (username, subject, attempt_date)""")
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS attempt_answers (
+                attempt_id INTEGER NOT NULL,
+                question_index INTEGER NOT NULL,
+                question_id INTEGER,
+                selected INTEGER NOT NULL,
+                correct INTEGER NOT NULL,
+                PRIMARY KEY (attempt_id, question_index),
+                FOREIGN KEY (attempt_id) REFERENCES quiz_attempts(id))""")
+        try:
+            c.execute("ALTER TABLE attempt_answers ADD COLUMN time_spent REAL")
+        except:
+            pass
+        # qhash soal saat dijawab: analitik per soal tidak bergantung pada
+        # questions.id, jadi soal yang sudah dihapus dari bank tetap terhitung.
+        try:
+            c.execute("ALTER TABLE attempt_answers ADD COLUMN qhash TEXT")
+            c.execute("""
+                UPDATE attempt_answers SET qhash = (SELECT qhash FROM questions WHERE id = attempt_answers.question_id)
+                WHERE question_id IS NOT NULL""")
+        except:
+            pass
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS attempts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                attempt_count INTEGER DEFAULT 1,
+                last_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(username, subject))""")
+        _init_leaderboard(c)
+        _init_question_stats(c)
+        _init_analytics(c)
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS seen_questions (
+                username TEXT NOT NULL,
+                grade TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                bank_version INTEGER NOT NULL,
+                bits BLOB NOT NULL,
+                PRIMARY KEY (username, grade, subject)) WITHOUT ROWID""")
+        c.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_seen_user_delete AFTER DELETE ON users
+            BEGIN
+                DELETE FROM seen_questions WHERE username = OLD.username;
+            END""")
+        if 0 < version < 3:
+            # Versi 3: parser bank soal baru melewati blok yang rusak, jadi isi
+            # dan urutan (seq) soal bisa berbeda dari hasil impor parser lama.
+            c.execute("DELETE FROM question_sources")
+            c.execute("DELETE FROM seen_questions")
+        c.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def _init_leaderboard(c):
+    # Leaderboard per kelas dan per mapel disimpan sebagai tabel biasa yang
+    # diperbarui trigger setiap kali users.xp berubah atau hasil ujian masuk,
+    # sehingga peringkat cukup dibaca dari index (grade_class, subject, xp).
+    # XP per mapel = jumlah jawaban benar di mapel itu x XP_PER_CORRECT.
+    exists = c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'leaderboard'").fetchone()
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS leaderboard (
+            username TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            grade_class TEXT,
+            xp INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (username, subject)) WITHOUT ROWID""")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_leaderboard_class ON leaderboard (grade_class, subject, xp DESC)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_leaderboard_subject ON leaderboard (subject, xp DESC)")
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_leaderboard_user_insert AFTER INSERT ON users
+        BEGIN
+            INSERT OR REPLACE INTO leaderboard (username, subject, grade_class, xp)
+            VALUES (NEW.username, '{ALL_SUBJECTS}', NEW.grade_class, NEW.xp);
+        END""")
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_leaderboard_user_xp AFTER UPDATE OF xp ON users
+        BEGIN
+            UPDATE leaderboard SET xp = NEW.xp
+            WHERE username = NEW.username AND subject = '{ALL_SUBJECTS}';
+        END""")
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_leaderboard_user_class AFTER UPDATE OF grade_class ON users
+        BEGIN
+            UPDATE leaderboard SET grade_class = NEW.grade_class WHERE username = NEW.username;
+        END""")
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_leaderboard_user_delete AFTER DELETE ON users
+        BEGIN
+            DELETE FROM leaderboard WHERE username = OLD.username;
+        END""")
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_leaderboard_attempt AFTER INSERT ON quiz_attempts
+        BEGIN
+            INSERT INTO leaderboard (username, subject, grade_class, xp)
+            SELECT NEW.username, NEW.subject, grade_class, NEW.score * {XP_PER_CORRECT}
+            FROM users WHERE username = NEW.username
+            ON CONFLICT (username, subject) DO UPDATE SET xp = xp + excluded.xp;
+        END""")
+    if not exists:
+        c.execute(f"""
+            INSERT INTO leaderboard (username, subject, grade_class, xp)
+            SELECT username, '{ALL_SUBJECTS}', grade_class, xp FROM users""")
+        c.execute(f"""
+            INSERT INTO leaderboard (username, subject, grade_class, xp)
+            SELECT a.username, a.subject, u.grade_class, SUM(a.score) * {XP_PER_CORRECT}
+            FROM quiz_attempts a JOIN users u ON u.username = a.username
+            GROUP BY a.username, a.subject""")
+
+
+def _init_question_stats(c):
+    # Statistik per soal (dikunci qhash, jadi tetap berlaku setelah bank
+    # diimpor ulang atau soal yang sama muncul di kelas lain) diperbarui trigger
+    # tiap jawaban masuk. Trigger yang sama menghitung jawaban baru per bank
+    # agar peringkat kesulitan tahu kapan perlu dihitung ulang.
+    exists = c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'question_stats'").fetchone()
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS question_stats (
+            qhash TEXT PRIMARY KEY,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            correct INTEGER NOT NULL DEFAULT 0,
+            timed INTEGER NOT NULL DEFAULT 0,
+            time_total REAL NOT NULL DEFAULT 0) WITHOUT ROWID""")
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_question_stats AFTER INSERT ON attempt_answers
+        WHEN NEW.question_id IS NOT NULL
+        BEGIN
+            INSERT INTO question_stats (qhash, attempts, correct, timed, time_total)
+            SELECT qhash, 1, NEW.correct, NEW.time_spent IS NOT NULL, COALESCE(NEW.time_spent, 0)
+            FROM questions WHERE id = NEW.question_id AND qhash IS NOT NULL
+            ON CONFLICT (qhash) DO UPDATE SET
+                attempts = attempts + 1,
+                correct = correct + excluded.correct,
+                timed = timed + excluded.timed,
+                time_total = time_total + excluded.time_total;
+            UPDATE question_sources SET answers_since_rank = answers_since_rank + 1
+            WHERE (grade, subject) = (SELECT grade, subject FROM questions WHERE id = NEW.question_id);
+        END""")
+    if not exists:
+        c.execute("""
+            INSERT INTO question_stats (qhash, attempts, correct, timed, time_total)
+            SELECT q.qhash, COUNT(*), SUM(a.correct), COUNT(a.time_spent), COALESCE(SUM(a.time_spent), 0)
+            FROM attempt_answers a JOIN questions q ON q.id = a.question_id
+            WHERE q.qhash IS NOT NULL
+            GROUP BY q.qhash""")
+
+
+def _init_analytics(c):
+    # Ringkasan analitik per (kelas, mapel), diisi analytics.refresh dari
+    # quiz_attempts dengan id > last_attempt_id, jadi tiap refresh hanya
+    # mengagregasi hasil ujian yang baru masuk. Histogram nilai memakai bucket
+    # 1 persen (0-100) sehingga persentase lulus bisa dihitung untuk KKM berapa pun.
+    # subject_item_stats adalah class_item_stats yang sudah digabung semua kelas.
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS analytics_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            last_attempt_id INTEGER NOT NULL DEFAULT 0)""")
+    c.execute("INSERT OR IGNORE INTO analytics_state (id, last_attempt_id) VALUES (1, 0)")
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS class_stats (
+            grade_class TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            percentage_total REAL NOT NULL DEFAULT 0,
+            percentage_sq_total REAL NOT NULL DEFAULT 0,
+            time_total INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (grade_class, subject)) WITHOUT ROWID""")
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS class_histogram (
+            grade_class TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (grade_class, subject, kind, bucket)) WITHOUT ROWID""")
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS class_item_stats (
+            grade_class TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            qhash TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            correct INTEGER NOT NULL DEFAULT 0,
+            timed INTEGER NOT NULL DEFAULT 0,
+            time_total REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (grade_class, subject, qhash)) WITHOUT ROWID""")
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS subject_item_stats (
+            subject TEXT NOT NULL,
+            qhash TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            correct INTEGER NOT NULL DEFAULT 0,
+            timed INTEGER NOT NULL DEFAULT 0,
+            time_total REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (subject, qhash)) WITHOUT ROWID""")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_questions_qhash ON questions (qhash)")
+
+
+def create_user(username, password, grade_class, religion, db=None):
+    db = db or get_db()
+    # Hash dihitung sebelum transaksi dibuka supaya KDF tidak menahan kunci tulis.
+    hashed = passwords.hash_password(password)
+    with db.transaction() as c:
+        c.execute("""
+            INSERT INTO users (username, password, xp, grade_class, religion)
+            VALUES (?, ?, 0, ?, ?)
+        """, (username, hashed, grade_class, religion))
+
+
+def find_user(username, password, db=None):
+    """Cek login; password teks biasa (baris lama) langsung diganti hash saat cocok."""
+    db = db or get_db()
+    user = db.execute(
+        "SELECT id, username, xp, grade_class, religion, password FROM users WHERE username = ?",
+        (username,)).fetchone()
+    if not user:
+        passwords.dummy_verify(password)
+        return None
+    matched, stale = passwords.verify_password(password, user[5])
+    if not matched:
+        return None
+    if stale:
+        hashed = passwords.hash_password(password)
+        with db.transaction() as c:
+            c.execute("UPDATE users SET password = ? WHERE id = ? AND password = ?", (hashed, user[0], user[5]))
+    return {
+        "id": user[0],
+        "username": user[1],
+        "xp": user[2],
+        "grade_class": user[3],
+        "religion": user[4]}
+
+
+def update_user_xp(username, xp, db=None):
+    db = db or get_db()
+    with db.transaction() as c:
+        c.execute("UPDATE users SET xp = ? WHERE username = ?", (xp, username))
+
+
+def add_user_xp(username, xp_earned, db=None):
+    """Tambahkan XP hasil satu kuis dan kembalikan XP total di database.
+
+    Relatif terhadap nilai di database, jadi dua kuis yang selesai tidak
+    berurutan (misal kuis lama yang kedaluwarsa di server) tidak saling timpa.
+    """
+    db = db or get_db()
+    with db.transaction() as c:
+        c.execute("UPDATE users SET xp = xp + ? WHERE username = ?", (xp_earned, username))
+        row = c.execute("SELECT xp FROM users WHERE username = ?", (username,)).fetchone()
+    return row[0] if row else None
+
+
+def leaderboard(grade_class=None, subject=ALL_SUBJECTS, limit=10, db=None):
+    """Peringkat teratas per kelas (atau semua kelas jika `grade_class` None)."""
+    db = db or get_db()
+    if grade_class is None:
+        rows = db.execute(
+            "SELECT username, grade_class, xp FROM leaderboard WHERE subject = ? ORDER BY xp DESC LIMIT ?",
+            (subject, limit))
+    else:
+        rows = db.execute(
+            "SELECT username, grade_class, xp FROM leaderboard "
+            "WHERE grade_class = ? AND subject = ? ORDER BY xp DESC LIMIT ?",
+            (grade_class, subject, limit))
+    return [{"rank": i, "username": u, "grade_class": g, "xp": xp} for i, (u, g, xp) in enumerate(rows, 1)]
+
+
+def leaderboard_rank(username, grade_class=None, subject=ALL_SUBJECTS, db=None):
+    """Kembalikan {"rank", "total", "xp"} untuk `username`, atau None."""
+    db = db or get_db()
+    scope, params = ("grade_class = ? AND subject = ?", (grade_class, subject)) if grade_class is not None \
+        else ("subject = ?", (subject,))
+    row = db.execute("SELECT xp FROM leaderboard WHERE username = ? AND subject = ?",
+                     (username, subject)).fetchone()
+    if row is None:
+        return None
+    above = db.execute(f"SELECT COUNT(*) FROM leaderboard WHERE {scope} AND xp > ?", params + (row[0],)).fetchone()[0]
+    total = db.execute(f"SELECT COUNT(*) FROM leaderboard WHERE {scope}", params).fetchone()[0]
+    return {"rank": above + 1, "total": total, "xp": row[0]}
+
+
+# Soal yang sudah pernah muncul untuk seorang siswa disimpan sebagai bitmap
+# (bit ke-seq) per kelas + mapel, jadi 1000 soal cukup 125 byte per siswa.
+# bank_version adalah mtime_ns file sumber saat diimpor; jika bank berubah,
+# seq ikut bergeser dan bitmap lama diabaikan.
+class SeenSet:
+    def __init__(self, data=b""):
+        self.bits = bytearray(data)
+
+    def __contains__(self, seq):
+        i = seq >> 3
+        return i < len(self.bits) and bool(self.bits[i] >> (seq & 7) & 1)
+
+    def add(self, seq):
+        i = seq >> 3
+        if i >= len(self.bits):
+            self.bits.extend(bytes(i + 1 - len(self.bits)))
+        self.bits[i] |= 1 << (seq & 7)
+
+    def count(self, lo=0, hi=None):
+        """Jumlah seq dalam [lo, hi) yang sudah pernah muncul."""
+        value = int.from_bytes(self.bits, "little") >> lo
+        if hi is not None:
+            value &= (1 << max(0, hi - lo)) - 1
+        return bin(value).count("1")
+
+
+def load_seen(username, grade, subject, db=None):
+    db = db or get_db()
+    row = db.execute("""
+        SELECT s.bits FROM seen_questions s
+        JOIN question_sources q ON q.grade = s.grade AND q.subject = s.subject
+        WHERE s.username = ? AND s.grade = ? AND s.subject = ? AND s.bank_version = q.mtime_ns""",
+        (username, str(grade), subject)).fetchone()
+    return SeenSet(row[0] if row else b"")
+
+
+def _mark_seen(c, username, question_ids):
+    if not question_ids:
+        return
+    banks = {}
+    for grade, subject, seq in c.execute(f"""
+            SELECT grade, subject, seq FROM questions WHERE id IN ({",".join("?" * len(question_ids))})""",
+            question_ids):
+        banks.setdefault((grade, subject), []).append(seq)
+    for (grade, subject), seqs in banks.items():
+        row = c.execute("""
+            SELECT q.mtime_ns, q.question_count, s.bits, s.bank_version FROM question_sources q
+            LEFT JOIN seen_questions s ON s.username = ? AND s.grade = q.grade AND s.subject = q.subject
+            WHERE q.grade = ? AND q.subject = ?""", (username, grade, subject)).fetchone()
+        if row is None:
+            continue
+        version, count, bits, seen_version = row
+        seen = SeenSet(bits if seen_version == version else b"")
+        for seq in seqs:
+            seen.add(seq)
+        if seen.count(0, count) >= count:
+            # Semua soal sudah pernah muncul: mulai putaran baru dari kuis ini.
+            seen = SeenSet()
+            for seq in seqs:
+                seen.add(seq)
+        c.execute("""
+            INSERT OR REPLACE INTO seen_questions (username, grade, subject, bank_version, bits)
+            VALUES (?, ?, ?, ?, ?)""", (username, grade, subject, version, bytes(seen.bits)))
+
+
+def recent_accuracy(username, subject, last=5, db=None):
+    """Rata-rata persentase benar (0-1) `last` ujian terakhir, atau None."""
+    db = db or get_db()
+    row = db.execute("""
+        SELECT AVG(percentage), COUNT(*) FROM (
+            SELECT percentage FROM quiz_attempts WHERE username = ? AND subject = ?
+            ORDER BY attempt_date DESC LIMIT ?)""", (username, subject, last)).fetchone()
+    return row[0] / 100 if row[1] else None
+
+
+# Hasil ujian tidak langsung ditulis saat kuis selesai, tetapi ditampung dulu
+# lalu di-commit per batch dalam satu transaksi (write-behind). Saat aplikasi
+# ditutup buffer di-flush; jika database sedang tidak bisa ditulis, sisa buffer
+# disimpan ke PENDING_ATTEMPTS_PATH dan dimuat ulang pada start berikutnya.
+PENDING_ATTEMPTS_PATH = "attempts_pending.jsonl"
+
+
+def _utc_timestamp():
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class AttemptRecorder:
+    def __init__(self, db=None, batch_size=50, flush_interval=2.0, pending_path=PENDING_ATTEMPTS_PATH):
+        self.db = db or get_db()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending_path = pending_path
+        self.flushed = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._load_pending()
+        self._thread = threading.Thread(target=self._run, name="attempt-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, username, subject, score, total_questions, time_used, answers):
+        """Tampung satu hasil ujian.
+
+        `answers` berisi tuple (question_id, selected, correct, detik) per nomor soal.
+        """
+        attempt = {
+            "username": username,
+            "subject": subject,
+            "score": score,
+            "total_questions": total_questions,
+            "percentage": (score / total_questions) * 100 if total_questions else 0.0,
+            "time_used": time_used,
+            "attempt_date": _utc_timestamp(),
+            "answers": [list(a) for a in answers],
+        }
+        with self._lock:
+            self._buffer.append(attempt)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def pending(self):
+        with self._lock:
+            return len(self._buffer)
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopped:
+                break
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"❌ Gagal menyimpan hasil ujian, dicoba lagi nanti: {e}")
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                return 0
+            try:
+                with perf.span("db_write_attempts"), self.db.transaction() as c:
+                    for a in batch:
+                        self._insert(c, a)
+            except sqlite3.Error:
+                with self._lock:
+                    self._buffer[:0] = batch
+                raise
+            self.flushed += len(batch)
+            return len(batch)
+
+    def _insert(self, c, a):
+        cur = c.execute("""
+            INSERT INTO quiz_attempts (username, subject, score, total_questions,
+                                       percentage, time_used, attempt_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (a["username"], a["subject"], a["score"], a["total_questions"],
+             a["percentage"], a["time_used"], a["attempt_date"]))
+        attempt_id = cur.lastrowid
+        rows = []
+        for i, answer in enumerate(a["answers"]):
+            # Hasil lama di attempts_pending.jsonl belum mencatat waktu per soal.
+            time_spent = answer[3] if len(answer) > 3 else None
+            rows.append((attempt_id, i, answer[0], answer[1], int(answer[2]), time_spent))
+        c.executemany("""
+            INSERT INTO attempt_answers (attempt_id, question_index, question_id, selected, correct, time_spent, qhash)
+            VALUES (?, ?, ?, ?, ?, ?, (SELECT qhash FROM questions WHERE id = ?3))""", rows)
+        _mark_seen(c, a["username"], [row[2] for row in rows if row[2] is not None])
+        c.execute("""
+            INSERT INTO attempts (username, subject, attempt_count, last_attempt_at)
+            VALUES (?, ?, 1, ?)
+            ON CONFLICT(username, subject) DO UPDATE SET
+                attempt_count = attempt_count + 1,
+                last_attempt_at = excluded.last_attempt_at""",
+            (a["username"], a["subject"], a["attempt_date"]))
+
+    def _load_pending(self):
+        if not os.path.exists(self.pending_path):
+            return
+        with open(self.pending_path, "r", encoding="utf-8") as f:
+            self._buffer.extend(json.loads(line) for line in f if line.strip())
+        os.remove(self.pending_path)
+
+    def close(self):
+        if self._stopped:
+            return
+        self._stopped = True
+        self._wakeup.set()
+        self._thread.join(timeout=5)
+        try:
+            self.flush()
+        except sqlite3.Error as e:
+            print(f"❌ Hasil ujian disimpan sementara ke {self.pending_path}: {e}")
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if batch:
+            with open(self.pending_path, "a", encoding="utf-8") as f:
+                for a in batch:
+                    f.write(json.dumps(a) + "\n")
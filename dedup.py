@@ -0,0 +1,168 @@
+import re
+import sys
+import time
+import struct
+import hashlib
+import argparse
+import functools
+import unicodedata
+from collections import defaultdict
+
+# Deteksi soal kembar di bank soal. Tiap soal diberi qhash (hash teks soal +
+# pilihan yang sudah dinormalisasi) untuk kembar persis, dan signature MinHash
+# dari shingle karakter teks soal untuk kembar "hampir sama" (beda tanda baca,
+# spasi, satu-dua huruf). Kandidat dicari lewat LSH (banding) lalu dicek dengan
+# Jaccard sebenarnya, jadi satu pass cukup untuk seluruh korpus. Teks soal
+# yang mirip baru dianggap kembar jika jawaban benarnya sama atau pilihannya
+# banyak yang sama; "... secara spontan disebut" dan "... secara lambat
+# disebut" dengan pilihan yang sama tetap dua soal berbeda.
+SHINGLE_SIZE = 5
+NUM_PERM = 16
+BANDS = 4
+ROWS = NUM_PERM // BANDS
+THRESHOLD = 0.8
+OPTION_OVERLAP = 0.5
+_SIGNATURE = struct.Struct(f"<{NUM_PERM}I")
+_PUNCT = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _PUNCT.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def question_key(q):
+    """Teks kanonik soal: stem + pilihan terurut (urutan pilihan tidak berpengaruh)."""
+    return " | ".join([normalize_text(q["text"])] + sorted(normalize_text(o) for o in q["options"]))
+
+
+def question_hash(q):
+    return hashlib.sha1(question_key(q).encode("utf-8")).hexdigest()[:16]
+
+
+def shingles(key):
+    if len(key) <= SHINGLE_SIZE:
+        return {key}
+    return {key[i:i + SHINGLE_SIZE] for i in range(len(key) - SHINGLE_SIZE + 1)}
+
+
+@functools.lru_cache(maxsize=1 << 17)
+def _shingle_hashes(shingle):
+    # Satu digest blake2b 64 byte per shingle memberi NUM_PERM nilai hash
+    # sekaligus. Shingle yang sama muncul di banyak soal, jadi hasilnya di-cache.
+    return _SIGNATURE.unpack(hashlib.blake2b(shingle.encode("utf-8"), digest_size=64).digest())
+
+
+def minhash(shingle_set):
+    # Minimum per kolom dihitung dengan zip (di C).
+    return tuple(min(col) for col in zip(*map(_shingle_hashes, shingle_set)))
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def _same_question(a, b, threshold):
+    stems_a, options_a, answer_a = a
+    stems_b, options_b, answer_b = b
+    if jaccard(stems_a, stems_b) < threshold:
+        return False
+    return answer_a == answer_b or jaccard(options_a, options_b) >= OPTION_OVERLAP
+
+
+def _features(q):
+    options = [normalize_text(o) for o in q["options"]]
+    answer = options[q["answer"]] if 0 <= q.get("answer", -1) < len(options) else None
+    return shingles(normalize_text(q["text"])), set(options), answer
+
+
+def find_groups(questions, threshold=THRESHOLD):
+    """Kelompokkan soal kembar/hampir kembar.
+
+    Mengembalikan (qhashes, groups): dua list sejajar dengan `questions`.
+    groups[i] adalah qhash anggota pertama kelompok soal ke-i, jadi soal
+    tanpa kembaran punya group sama dengan qhash-nya sendiri.
+    """
+    keys = [question_key(q) for q in questions]
+    qhashes = [hashlib.sha1(k.encode("utf-8")).hexdigest()[:16] for k in keys]
+    uf = _UnionFind(len(questions))
+    first_by_hash = {}
+    features = {}
+    buckets = defaultdict(list)
+    for i, h in enumerate(qhashes):
+        if h in first_by_hash:
+            uf.union(first_by_hash[h], i)
+            continue
+        first_by_hash[h] = i
+        features[i] = _features(questions[i])
+        signature = minhash(features[i][0])
+        for band in range(BANDS):
+            buckets[(band, signature[band * ROWS:(band + 1) * ROWS])].append(i)
+    checked = set()
+    for members in buckets.values():
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                pair = (members[x], members[y])
+                if pair in checked:
+                    continue
+                checked.add(pair)
+                if uf.find(pair[0]) != uf.find(pair[1]) and \
+                        _same_question(features[pair[0]], features[pair[1]], threshold):
+                    uf.union(*pair)
+    groups = [qhashes[uf.find(i)] for i in range(len(questions))]
+    return qhashes, groups
+
+
+def main(argv=None):
+    from question_bank import iter_bank_files, iter_questions, subject_key
+    parser = argparse.ArgumentParser(description="Cari soal kembar di seluruh bank soal.")
+    parser.add_argument("root", nargs="?", default="questions")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="batas kemiripan Jaccard (0-1)")
+    parser.add_argument("--semua", action="store_true", help="tampilkan semua anggota tiap kelompok")
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+    questions, origins = [], []
+    for grade, filepath in iter_bank_files(args.root):
+        for n, q in enumerate(iter_questions(filepath), 1):
+            questions.append(q)
+            origins.append(f"{grade}/{subject_key(filepath)}#{n}")
+    qhashes, groups = find_groups(questions, args.threshold)
+    clusters = defaultdict(list)
+    for i, group in enumerate(groups):
+        clusters[group].append(i)
+    clusters = [members for members in clusters.values() if len(members) > 1]
+    clusters.sort(key=len, reverse=True)
+    exact = len(qhashes) - len(set(qhashes))
+    for members in clusters:
+        shown = members if args.semua else members[:5]
+        print(f"\n{len(members)} soal: {questions[members[0]]['text'][:70]}")
+        for i in shown:
+            print(f"   {origins[i]:<32} {qhashes[i]}")
+        if len(shown) < len(members):
+            print(f"   ... {len(members) - len(shown)} lagi")
+    duplicates = sum(len(m) - 1 for m in clusters)
+    print(f"\n{len(questions)} soal, {len(clusters)} kelompok kembar, {duplicates} soal kembar "
+          f"({exact} persis sama), {time.perf_counter() - started:.2f} detik")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
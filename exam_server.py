@@ -0,0 +1,646 @@
+import os
+import sys
+import math
+import time
+import json
+import socket
+import asyncio
+import secrets
+import argparse
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from database import init_db, AttemptRecorder
+from question_bank import BankCache
+from quiz_engine import LocalBackend, UsernameTaken
+from checkpoint import CheckpointStore, progress
+import perf
+import passwords
+
+# Mode server ujian: satu komputer menyimpan bank soal, sesi kuis, waktu dan
+# hasil ujian untuk satu lab. Klien QuizApp hanya menampilkan state sesi.
+# Protokolnya JSON per baris lewat TCP: klien mengirim
+#   {"id": 1, "op": "login", "username": ..., "password": ...}
+# dan server membalas {"id": 1, "ok": true, "result": ...} atau
+# {"id": 1, "ok": false, "error": "...", "message": "..."}.
+# Event loop hanya mengurus jaringan dan state sesi di memori; query SQLite
+# dan pembacaan bank soal dijalankan di thread pool.
+DEFAULT_PORT = 8765
+SERVER_ENV = "DEGICHI_SERVER"
+# Hasil kuis yang tidak diambil kliennya (PC mati saat waktu habis) dibuang
+# setelah sekian detik; nilainya sudah tercatat di database.
+RESULT_TTL = 600
+
+
+class ExamServerError(Exception):
+    def __init__(self, code, message=""):
+        super().__init__(message or code)
+        self.code = code
+
+
+def public_question(q):
+    # Kunci jawaban dan petunjuk tidak pernah dikirim ke klien.
+    return {"id": q.get("id"), "text": q["text"], "options": list(q["options"])}
+
+
+def session_state(session):
+    return {
+        "current_index": session.current_index,
+        "selected_answer": session.selected_answer,
+        "answers": list(session.answers),
+        "score": session.score,
+        "xp_earned": session.xp_earned,
+        "used_powerups": list(session.used_powerups),
+        "time_left": session.time_left,
+        "finished": session.finished,
+    }
+
+
+class ExamServer:
+    def __init__(self, backend=None, max_workers=8):
+        if backend is None:
+            init_db()
+            cache_bytes = int(os.environ.get("DEGICHI_BANK_CACHE_MB", 64)) * 1024 * 1024
+            backend = LocalBackend(BankCache(cache_bytes), AttemptRecorder(), CheckpointStore())
+        self.backend = backend
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="exam-io")
+        # Login/daftar (hash password) punya pool sendiri seukuran jumlah core,
+        # supaya saat satu kelas login bersamaan jawaban siswa lain tetap tersimpan.
+        self.auth_executor = ThreadPoolExecutor(passwords.WORKERS, thread_name_prefix="exam-auth")
+        self.users = {}
+        self.tokens = {}
+        self.sessions = {}
+        self.owners = {}
+        self.active = {}
+        self.results = {}
+        self._finishing = {}
+        self._clients = set()
+        self.port = None
+        self._server = None
+        self._ticker = None
+        self._loop = None
+        self._thread = None
+
+    async def _io(self, fn, *args, executor=None):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor or self.executor, functools.partial(fn, *args))
+
+    async def dispatch(self, request):
+        """Proses satu request dan kembalikan response-nya (dict)."""
+        response = {"id": request.get("id")}
+        handler = getattr(self, "op_" + str(request.get("op")), None)
+        try:
+            if handler is None:
+                raise ExamServerError("unknown_op", f"Operasi tidak dikenal: {request.get('op')}")
+            response["result"] = await handler(request)
+            response["ok"] = True
+        except ExamServerError as e:
+            response.update(ok=False, error=e.code, message=str(e))
+        except UsernameTaken as e:
+            response.update(ok=False, error="username_taken", message=str(e))
+        except (KeyError, TypeError, ValueError, IndexError) as e:
+            response.update(ok=False, error="bad_request", message=repr(e))
+        except Exception as e:
+            print(f"❌ Request {request.get('op')} gagal: {e!r}")
+            response.update(ok=False, error="server_error", message=str(e))
+        return response
+
+    def _user(self, request):
+        user = self.users.get(request["token"])
+        if user is None:
+            raise ExamServerError("unauthorized", "Sesi login tidak valid, silakan masuk ulang.")
+        return user
+
+    def _session(self, request):
+        quiz_id = request["quiz_id"]
+        if self.owners.get(quiz_id) != request["token"]:
+            raise ExamServerError("unknown_quiz", "Kuis tidak ditemukan.")
+        session = self.sessions.get(quiz_id)
+        if session is None:
+            raise ExamServerError("quiz_finished", "Kuis sudah selesai.")
+        if session.tick():
+            # Jangan menunggu ticker: jawaban setelah deadline tidak diterima.
+            if quiz_id not in self._finishing:
+                asyncio.ensure_future(self._finish(quiz_id))
+            raise ExamServerError("quiz_expired", "Waktu ujian sudah habis.")
+        if session.finished:
+            raise ExamServerError("quiz_finished", "Kuis sudah selesai.")
+        return session
+
+    async def op_login(self, request):
+        user = await self._io(self.backend.login, request["username"], request["password"],
+                              executor=self.auth_executor)
+        if user is None:
+            return None
+        token = secrets.token_hex(16)
+        # Satu token per siswa: login ulang (misal setelah klien crash)
+        # membatalkan token lama.
+        self.users.pop(self.tokens.get(user["username"]), None)
+        self.tokens[user["username"]] = token
+        self.users[token] = user
+        quiz_id = self.active.get(user["username"])
+        if quiz_id in self.sessions:
+            resumable = progress(self.sessions[quiz_id])
+        else:
+            resumable = await self._io(self.backend.resumable, user)
+        return {"token": token, "user": user, "resumable": resumable}
+
+    async def op_logout(self, request):
+        user = self.users.pop(request["token"], None)
+        if user is not None and self.tokens.get(user["username"]) == request["token"]:
+            del self.tokens[user["username"]]
+        return True
+
+    async def op_register(self, request):
+        await self._io(self.backend.register, request["username"], request["password"],
+                       request["grade_class"], request["religion"], executor=self.auth_executor)
+        return True
+
+    async def op_rank(self, request):
+        return await self._io(self.backend.rank, self._user(request))
+
+    async def op_start_quiz(self, request):
+        user = self._user(request)
+        # Kuis lama yang ditinggal (keluar ke dashboard, klien crash) dibuang
+        # seperti di mode lokal; jika dibiarkan, ticker akan mencatatnya 0
+        # saat deadline-nya lewat.
+        self._drop(self.active.pop(user["username"], None))
+        status, info, session = await self._io(self.backend.start_quiz, user, request["subject"])
+        if status != "ok":
+            return {"status": status, "info": info}
+        quiz_id = self._register(session, request["token"])
+        return dict(self._quiz_payload(quiz_id, session), status=status, info=info)
+
+    async def op_resume(self, request):
+        # Klien yang crash login ulang dengan token baru; kuisnya diambil dari
+        # memori server, atau dari checkpoint jika server sempat restart.
+        user = self._user(request)
+        quiz_id = self.active.get(user["username"])
+        session = self.sessions.get(quiz_id)
+        if session is None:
+            session = await self._io(self.backend.resume_quiz, user)
+            if session is None:
+                raise ExamServerError("no_quiz", "Tidak ada kuis yang bisa dilanjutkan.")
+            quiz_id = self._register(session, request["token"])
+        self.owners[quiz_id] = request["token"]
+        return self._quiz_payload(quiz_id, session)
+
+    async def op_discard_quiz(self, request):
+        user = self._user(request)
+        self._drop(self.active.pop(user["username"], None))
+        await self._io(self.backend.discard_quiz, user)
+        return True
+
+    def _drop(self, quiz_id):
+        if quiz_id in self.sessions and quiz_id not in self._finishing:
+            del self.sessions[quiz_id]
+            self.owners.pop(quiz_id, None)
+
+    def _register(self, session, token):
+        quiz_id = secrets.token_hex(8)
+        self.sessions[quiz_id] = session
+        self.owners[quiz_id] = token
+        self.active[session.user["username"]] = quiz_id
+        return quiz_id
+
+    def _quiz_payload(self, quiz_id, session):
+        return {
+            "quiz_id": quiz_id,
+            "subject": session.subject,
+            "duration": session.duration,
+            "questions": [public_question(q) for q in session.questions],
+            "state": session_state(session),
+        }
+
+    async def op_state(self, request):
+        return session_state(self._session(request))
+
+    async def op_select(self, request):
+        session = self._session(request)
+        option = int(request["option"])
+        if not 0 <= option < len(session.question["options"]):
+            raise ValueError(option)
+        session.select(option)
+        return session_state(session)
+
+    async def op_go_to(self, request):
+        session = self._session(request)
+        index = int(request["index"])
+        if not 0 <= index < len(session.questions):
+            raise IndexError(index)
+        session.go_to(index)
+        return session_state(session)
+
+    async def op_next(self, request):
+        session = self._session(request)
+        moved = session.next()
+        return {"moved": moved, "state": session_state(session)}
+
+    async def op_powerup(self, request):
+        session = self._session(request)
+        result = session.use_powerup(request["name"])
+        return {"powerup": result, "state": session_state(session)}
+
+    async def op_finish(self, request):
+        quiz_id = request["quiz_id"]
+        if self.owners.get(quiz_id) != request["token"]:
+            raise ExamServerError("unknown_quiz", "Kuis tidak ditemukan.")
+        result = await self._finish(quiz_id)
+        # Hasil sudah diterima klien; QuizApp menyimpannya sendiri.
+        self.results.pop(quiz_id, None)
+        self.owners.pop(quiz_id, None)
+        return result
+
+    async def _finish(self, quiz_id):
+        # Selesai karena klien (tombol Selesai) dan karena waktu habis bisa
+        # terjadi bersamaan; hasil hanya dicatat sekali.
+        if quiz_id in self.results:
+            return self.results[quiz_id][1]
+        task = self._finishing.get(quiz_id)
+        if task is None:
+            task = asyncio.ensure_future(self._record(quiz_id))
+            self._finishing[quiz_id] = task
+        return await asyncio.shield(task)
+
+    async def _record(self, quiz_id):
+        session = self.sessions[quiz_id]
+        try:
+            result = await self._io(self.backend.finish_quiz, session)
+        finally:
+            del self._finishing[quiz_id]
+        session.user["xp"] = result["total_xp"]
+        self.results[quiz_id] = (time.monotonic() + RESULT_TTL, result)
+        del self.sessions[quiz_id]
+        if self.active.get(session.user["username"]) == quiz_id:
+            del self.active[session.user["username"]]
+        return result
+
+    async def _expire_sessions(self):
+        # Waktu ujian hanya berlaku menurut jam server. Sesi yang melewati
+        # deadline diselesaikan dan dicatat walaupun kliennya tidak mengirim
+        # apa-apa lagi (PC mati, jaringan putus).
+        while True:
+            await asyncio.sleep(1)
+            for quiz_id, session in list(self.sessions.items()):
+                if session.tick() and quiz_id not in self._finishing:
+                    asyncio.ensure_future(self._finish(quiz_id))
+            now = time.monotonic()
+            for quiz_id, (expires, _) in list(self.results.items()):
+                if expires <= now:
+                    del self.results[quiz_id]
+                    self.owners.pop(quiz_id, None)
+
+    async def _handle_client(self, reader, writer):
+        self._clients.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {"id": None, "ok": False, "error": "bad_request", "message": "JSON tidak valid"}
+                else:
+                    response = await self.dispatch(request)
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    async def start(self, host="0.0.0.0", port=DEFAULT_PORT):
+        self._ticker = asyncio.ensure_future(self._expire_sessions())
+        if port is not None:
+            self._server = await asyncio.start_server(self._handle_client, host, port)
+            self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        # Kuis yang belum selesai tidak dicatat; checkpoint-nya dipakai untuk
+        # melanjutkan setelah server dijalankan lagi.
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._clients):
+                writer.close()
+            await self._server.wait_closed()
+        if self._ticker is not None:
+            self._ticker.cancel()
+        if self._finishing:
+            await asyncio.gather(*self._finishing.values(), return_exceptions=True)
+        self.executor.shutdown(wait=True)
+        self.auth_executor.shutdown(wait=True)
+        self.backend.close()
+
+    def start_in_thread(self, host="127.0.0.1", port=None):
+        """Jalankan server di thread sendiri (untuk loopback dan benchmark).
+
+        Dengan `port=None` tidak ada socket yang dibuka; klien memakai
+        LoopbackClient yang memanggil dispatch() langsung.
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="exam-server", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.start(host, port), self._loop).result()
+        return self
+
+    def stop_thread(self):
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+class _Client:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def call(self, op, **params):
+        with self._lock:
+            self._next_id += 1
+            request = dict(params, id=self._next_id, op=op)
+            response = self._roundtrip(request)
+        if response.get("ok"):
+            return response.get("result")
+        if response.get("error") == "username_taken":
+            raise UsernameTaken(params.get("username"))
+        raise ExamServerError(response.get("error", "server_error"), response.get("message", ""))
+
+    def close(self):
+        pass
+
+
+class ExamClient(_Client):
+    """Klien TCP; satu koneksi per QuizApp, tersambung ulang otomatis."""
+
+    def __init__(self, host, port=DEFAULT_PORT, timeout=10.0):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._sock = None
+        self._file = None
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile("rb")
+
+    def _roundtrip(self, request):
+        payload = json.dumps(request).encode("utf-8") + b"\n"
+        for attempt in (1, 2):
+            try:
+                if self._sock is None:
+                    self._connect()
+                self._sock.sendall(payload)
+                line = self._file.readline()
+                if not line:
+                    raise ConnectionError("koneksi ditutup server")
+                return json.loads(line)
+            except OSError:
+                self.close()
+                if attempt == 2:
+                    raise
+
+    def close(self):
+        if self._sock is not None:
+            self._file.close()
+            self._sock.close()
+            self._sock = self._file = None
+
+
+class LoopbackClient(_Client):
+    """Pengganti ExamClient tanpa jaringan, untuk pengujian dan benchmark.
+
+    Request tetap diserialisasi ke JSON agar perilakunya sama dengan TCP.
+    """
+
+    def __init__(self, server):
+        super().__init__()
+        self.server = server
+
+    def _roundtrip(self, request):
+        request = json.loads(json.dumps(request))
+        future = asyncio.run_coroutine_threadsafe(self.server.dispatch(request), self.server._loop)
+        return json.loads(json.dumps(future.result()))
+
+
+class RemoteQuizSession:
+    """Cermin QuizSession milik server; dipakai QuizApp seperti QuizSession biasa.
+
+    Sisa waktu dihitung dari deadline lokal (jam monotonic) yang disetel
+    ulang dari sisa waktu server pada setiap balasan, jadi jam PC siswa
+    tidak pernah menentukan lamanya ujian.
+    """
+
+    # QuizApp menjalankan aksi sesi ini di TaskRunner (round trip jaringan).
+    remote = True
+
+    def __init__(self, client, token, user, subject, quiz, clock=time.monotonic):
+        self.client = client
+        self.clock = clock
+        self.token = token
+        self.user = user
+        self.start_xp = user["xp"]
+        self.subject = subject
+        self.quiz_id = quiz["quiz_id"]
+        self.duration = quiz["duration"]
+        self.questions = quiz["questions"]
+        self._result = None
+        self._apply(quiz["state"])
+
+    def _apply(self, state):
+        self.current_index = state["current_index"]
+        self.selected_answer = state["selected_answer"]
+        self.answers = state["answers"]
+        self.score = state["score"]
+        self.xp_earned = state["xp_earned"]
+        self.used_powerups = state["used_powerups"]
+        now = self.clock()
+        self.deadline = now + state["time_left"]
+        self.stopped_at = now if state["finished"] else None
+
+    def _call(self, op, **params):
+        try:
+            return self.client.call(op, token=self.token, quiz_id=self.quiz_id, **params)
+        except ExamServerError as e:
+            if e.code not in ("quiz_finished", "quiz_expired"):
+                raise
+            # Server sudah menutup kuis karena waktunya habis.
+            self.deadline = self.stopped_at = self.clock()
+            return None
+
+    @property
+    def time_left(self):
+        now = self.clock() if self.stopped_at is None else self.stopped_at
+        return max(0, math.ceil(self.deadline - now))
+
+    @property
+    def question(self):
+        return self.questions[self.current_index]
+
+    @property
+    def finished(self):
+        return self.current_index >= len(self.questions) or self.time_left <= 0
+
+    @property
+    def is_last(self):
+        return self.current_index == len(self.questions) - 1
+
+    @property
+    def time_used(self):
+        return self.duration - self.time_left
+
+    @property
+    def total_xp(self):
+        return self.start_xp + self.xp_earned
+
+    def select(self, option):
+        state = self._call("select", option=option)
+        if state:
+            self._apply(state)
+
+    def go_to(self, index):
+        state = self._call("go_to", index=index)
+        if state:
+            self._apply(state)
+
+    def next(self):
+        reply = self._call("next")
+        if reply is None:
+            return True
+        self._apply(reply["state"])
+        return reply["moved"]
+
+    def tick(self):
+        return self.time_left <= 0
+
+    def use_powerup(self, name):
+        reply = self._call("powerup", name=name)
+        if reply is None:
+            return None
+        self._apply(reply["state"])
+        return reply["powerup"]
+
+    def finish(self):
+        if self._result is None:
+            self._result = self._call("finish")
+            self.score = self._result["score"]
+            self.xp_earned = self._result["xp_earned"]
+            self.start_xp = self._result["total_xp"] - self.xp_earned
+        return self._result
+
+    def result(self):
+        if self._result is not None:
+            return self._result
+        total = len(self.questions)
+        return {
+            "username": self.user["username"],
+            "subject": self.subject,
+            "score": self.score,
+            "total_questions": total,
+            "percentage": (self.score / total) * 100 if total else 0.0,
+            "time_left": self.time_left,
+            "time_used": self.time_used,
+            "xp_earned": self.xp_earned,
+            "total_xp": self.total_xp,
+            "used_powerups": list(self.used_powerups),
+        }
+
+
+class RemoteBackend:
+    """Backend QuizApp yang meneruskan semua operasi ke ExamServer."""
+
+    def __init__(self, client):
+        self.client = client
+        self.token = None
+        self._resumable = None
+
+    def login(self, username, password):
+        reply = self.client.call("login", username=username, password=password)
+        if reply is None:
+            return None
+        self.token = reply["token"]
+        self._resumable = reply["resumable"]
+        return reply["user"]
+
+    def register(self, username, password, grade_class, religion):
+        self.client.call("register", username=username, password=password,
+                         grade_class=grade_class, religion=religion)
+
+    def start_quiz(self, user, subject):
+        reply = self.client.call("start_quiz", token=self.token, subject=subject)
+        if reply["status"] != "ok":
+            return reply["status"], reply["info"], None
+        return "ok", reply["info"], RemoteQuizSession(self.client, self.token, user, subject, reply)
+
+    def rank(self, user):
+        return self.client.call("rank", token=self.token)
+
+    def resumable(self, user):
+        return self._resumable
+
+    def resume_quiz(self, user):
+        self._resumable = None
+        reply = self.client.call("resume", token=self.token)
+        return RemoteQuizSession(self.client, self.token, user, reply["subject"], reply)
+
+    def discard_quiz(self, user):
+        self._resumable = None
+        self.client.call("discard_quiz", token=self.token)
+
+    def logout(self, user):
+        token, self.token = self.token, None
+        if token is not None:
+            self.client.call("logout", token=token)
+
+    def finish_quiz(self, session):
+        return session.finish()
+
+    def close(self):
+        self.client.close()
+
+
+def server_address(argv=None):
+    """Alamat server dari argumen `--server host[:port]` atau DEGICHI_SERVER."""
+    argv = sys.argv if argv is None else argv
+    value = os.environ.get(SERVER_ENV)
+    for i, arg in enumerate(argv):
+        if arg == "--server" and i + 1 < len(argv):
+            value = argv[i + 1]
+        elif arg.startswith("--server="):
+            value = arg.split("=", 1)[1]
+    if not value:
+        return None
+    host, _, port = value.partition(":")
+    return host or "127.0.0.1", int(port or DEFAULT_PORT)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Server ujian DEGICHI untuk satu lab komputer.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--io-threads", type=int, default=8, help="thread untuk database dan bank soal")
+    args = parser.parse_args(argv)
+    perf.install()
+
+    async def serve():
+        server = await ExamServer(max_workers=args.io_threads).start(args.host, args.port)
+        print(f"✅ Server ujian berjalan di {args.host}:{args.port}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
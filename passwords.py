@@ -0,0 +1,155 @@
+import os
+import sys
+import hmac
+import time
+import hashlib
+import secrets
+import argparse
+import threading
+import perf
+
+# Password siswa disimpan sebagai hash KDF, bukan teks biasa:
+#   scrypt$<log2 n>$<r>$<p>$<salt hex>$<hash hex>
+#   pbkdf2_sha256$<iterasi>$<salt hex>$<hash hex>  (jika hashlib tanpa scrypt)
+# Biaya hash baru dikalibrasi sekali per proses supaya satu hash memakan kira-
+# kira TARGET_MS di mesin ini, tetapi tidak pernah di bawah batas minimum.
+# Baris lama yang masih teks biasa tetap bisa login dan langsung di-hash ulang
+# (lihat database.find_user); hash yang biayanya di bawah minimum juga. Hash
+# dari PC lain yang dikalibrasi lebih tinggi tidak diturunkan, jadi login
+# bergantian di PC lab tidak membuat hash ditulis ulang terus.
+#
+# KDF melepas GIL, tetapi tetap memakan satu core penuh. Pemanggil menjalankannya
+# di thread pekerja (TaskRunner di GUI, executor auth di server ujian) dan
+# jumlah hash yang berjalan bersamaan dibatasi WORKERS, sehingga saat satu
+# kelas login bersamaan yang lain tinggal antre, bukan berebut CPU.
+TARGET_MS = float(os.environ.get("DEGICHI_PASSWORD_MS", 100))
+SCRYPT_R = 8
+SCRYPT_P = 1
+MIN_SCRYPT_LOG_N = 14
+MAX_SCRYPT_LOG_N = 20
+MIN_PBKDF2_ITERATIONS = 100000
+SALT_BYTES = 16
+HASH_BYTES = 32
+WORKERS = os.cpu_count() or 1
+SCHEME = "scrypt" if hasattr(hashlib, "scrypt") else "pbkdf2_sha256"
+MINIMUM_COST = MIN_SCRYPT_LOG_N if SCHEME == "scrypt" else MIN_PBKDF2_ITERATIONS
+
+_slots = threading.BoundedSemaphore(WORKERS)
+_cost_lock = threading.Lock()
+_cost = None
+_dummy = None
+
+
+def _derive(scheme, cost, password, salt, r=SCRYPT_R, p=SCRYPT_P, dklen=HASH_BYTES):
+    with _slots, perf.span("password_kdf"):
+        if scheme == "scrypt":
+            n = 1 << cost
+            return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                                  maxmem=256 * r * n + (1 << 20), dklen=dklen)
+        return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, cost, dklen)
+
+
+def _time_ms(cost):
+    started = time.perf_counter()
+    _derive(SCHEME, cost, "kalibrasi", b"\0" * SALT_BYTES)
+    return (time.perf_counter() - started) * 1000
+
+
+def calibrate(target_ms=TARGET_MS):
+    """Biaya KDF terbesar yang satu hash-nya tidak melebihi target_ms (minimal MINIMUM_COST)."""
+    if SCHEME == "scrypt":
+        log_n = MIN_SCRYPT_LOG_N
+        elapsed = _time_ms(log_n)
+        while log_n < MAX_SCRYPT_LOG_N and elapsed * 2 <= target_ms:
+            log_n += 1
+            elapsed = _time_ms(log_n)
+        return log_n
+    probe = 20000
+    return max(MIN_PBKDF2_ITERATIONS, int(probe * target_ms / _time_ms(probe)))
+
+
+def current_cost():
+    global _cost
+    with _cost_lock:
+        if _cost is None:
+            _cost = calibrate()
+        return _cost
+
+
+def hash_password(password, cost=None):
+    cost = cost or current_cost()
+    salt = secrets.token_bytes(SALT_BYTES)
+    digest = _derive(SCHEME, cost, password, salt)
+    if SCHEME == "scrypt":
+        return f"scrypt${cost}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${digest.hex()}"
+    return f"pbkdf2_sha256${cost}${salt.hex()}${digest.hex()}"
+
+
+def is_hashed(stored):
+    return stored.startswith(("scrypt$", "pbkdf2_sha256$"))
+
+
+def verify_password(password, stored):
+    """Mengembalikan (cocok, perlu_hash_ulang)."""
+    if not is_hashed(stored):
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8")), True
+    parts = stored.split("$")
+    scheme, cost = parts[0], int(parts[1])
+    salt, expected = bytes.fromhex(parts[-2]), bytes.fromhex(parts[-1])
+    r, p = (int(parts[2]), int(parts[3])) if scheme == "scrypt" else (SCRYPT_R, SCRYPT_P)
+    if scheme == "scrypt" and SCHEME != "scrypt":
+        print("❌ Hash password scrypt tidak bisa dicek: Python ini tidak punya hashlib.scrypt")
+        return False, False
+    digest = _derive(scheme, cost, password, salt, r, p, len(expected))
+    return hmac.compare_digest(digest, expected), scheme != SCHEME or cost < MINIMUM_COST
+
+
+def dummy_verify(password):
+    """Hitung satu hash tanpa hasil, agar username yang tidak ada sama lambatnya dengan password salah."""
+    global _dummy
+    if _dummy is None:
+        _dummy = hash_password("")
+    verify_password(password, _dummy)
+
+
+def migrate(db):
+    """Hash semua password yang masih teks biasa; mengembalikan jumlah baris yang diubah."""
+    from concurrent.futures import ThreadPoolExecutor
+    rows = db.execute("SELECT id, password FROM users").fetchall()
+    plain = [(user_id, stored) for user_id, stored in rows if not is_hashed(stored)]
+    if not plain:
+        return 0
+    current_cost()
+    with ThreadPoolExecutor(WORKERS) as pool:
+        hashed = list(pool.map(lambda row: hash_password(row[1]), plain))
+    updated = 0
+    with db.transaction() as c:
+        for (user_id, stored), new in zip(plain, hashed):
+            updated += c.execute("UPDATE users SET password = ? WHERE id = ? AND password = ?",
+                                 (new, user_id, stored)).rowcount
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kalibrasi dan migrasi hash password.")
+    parser.add_argument("--target-ms", type=float, default=TARGET_MS)
+    parser.add_argument("--migrate", action="store_true", help="hash semua password teks biasa di database")
+    parser.add_argument("--db", help="path database (default quizquest.db)")
+    args = parser.parse_args()
+    cost = calibrate(args.target_ms)
+    print(f"{SCHEME}: biaya {cost}, {_time_ms(cost):.0f} ms per hash (target {args.target_ms:.0f} ms), "
+          f"{WORKERS} core")
+    if args.migrate:
+        global _cost
+        _cost = cost
+        from database import Database, get_db, init_db
+        db = Database(args.db) if args.db else get_db()
+        init_db(db)
+        started = time.perf_counter()
+        count = migrate(db)
+        print(f"✅ {count} password di-hash dalam {time.perf_counter() - started:.1f} detik")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import os
+import time
+import atexit
+import datetime
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+# Instrumentasi ringan untuk melihat ke mana waktu pergi. Jalur penting
+# dibungkus span("nama"), baik sebagai context manager maupun decorator;
+# durasinya (ms) disimpan di ring buffer per nama. Saat aplikasi ditutup
+# ringkasan p50/p95 ditambahkan ke LOG_DIR/perf.log. PROFILE_ENV=1 (atau
+# path file) merekam cProfile seluruh sesi ke LOG_DIR.
+LOG_DIR = "logs"
+PROFILE_ENV = "DEGICHI_PROFILE"
+MAX_SAMPLES = 1000
+
+_samples = {}
+_totals = {}
+_lock = threading.Lock()
+_profiler = None
+
+
+def record(name, ms):
+    with _lock:
+        samples = _samples.get(name)
+        if samples is None:
+            samples = _samples[name] = deque(maxlen=MAX_SAMPLES)
+            _totals[name] = 0
+        samples.append(ms)
+        _totals[name] += 1
+
+
+@contextmanager
+def span(name):
+    """Ukur blok `with span(name):` atau fungsi yang didekorasi `@span(name)`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (time.perf_counter() - started) * 1000)
+
+
+def _percentile(ordered, p):
+    k = (len(ordered) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def stats():
+    """{nama: {"count", "last", "p50", "p95", "max"}} dari sampel terakhir tiap span."""
+    with _lock:
+        snapshot = {name: (list(samples), _totals[name]) for name, samples in _samples.items()}
+    result = {}
+    for name, (samples, count) in snapshot.items():
+        ordered = sorted(samples)
+        result[name] = {
+            "count": count,
+            "last": samples[-1],
+            "p50": _percentile(ordered, 50),
+            "p95": _percentile(ordered, 95),
+            "max": ordered[-1],
+        }
+    return result
+
+
+def format_stats(stats_by_name=None):
+    rows = stats_by_name if stats_by_name is not None else stats()
+    return [f"{name:<24} n={s['count']:<5} p50 {s['p50']:7.1f} ms  p95 {s['p95']:7.1f} ms  max {s['max']:7.1f} ms"
+            for name, s in sorted(rows.items())]
+
+
+def write_log(log_dir=LOG_DIR):
+    """Tambahkan ringkasan span sesi ini ke log_dir/perf.log."""
+    lines = format_stats()
+    if not lines:
+        return None
+    os.makedirs(log_dir, exist_ok=True)
+    path = os.path.join(log_dir, "perf.log")
+    stamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(f"== {stamp} pid {os.getpid()}\n")
+        for line in lines:
+            f.write(line + "\n")
+    return path
+
+
+def start_profile():
+    global _profiler
+    if _profiler is None:
+        import cProfile
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+
+def stop_profile(path=None):
+    """Hentikan cProfile dan simpan hasilnya (buka dengan pstats/snakeviz)."""
+    global _profiler
+    if _profiler is None:
+        return None
+    _profiler.disable()
+    if not path:
+        os.makedirs(LOG_DIR, exist_ok=True)
+        path = os.path.join(LOG_DIR, datetime.datetime.now().strftime("profile_%Y%m%d_%H%M%S.prof"))
+    _profiler.dump_stats(path)
+    _profiler = None
+    return path
+
+
+def install():
+    """Dipanggil sekali saat aplikasi start: log ringkasan saat keluar, cProfile jika diminta."""
+    value = os.environ.get(PROFILE_ENV)
+    if value:
+        start_profile()
+        atexit.register(stop_profile, None if value == "1" else value)
+    atexit.register(write_log)
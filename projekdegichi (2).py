@@ -1,15 +1,23 @@
 import sys
 import os
-import sqlite3
+import time
 import random
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QLineEdit, QRadioButton, QButtonGroup,QScrollArea, QMessageBox, QGraphicsOpacityEffect, QGridLayout, QCheckBox, QComboBox)
-from PyQt5.QtCore import (Qt, QTimer, QPropertyAnimation, QEasingCurve, QPoint)
-from PyQt5.QtGui import (QFont, QColor, QPalette)
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-from reportlab.lib import colors
-import datetime
+from collections import OrderedDict
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QLineEdit, QRadioButton, QButtonGroup,QScrollArea, QMessageBox, QGridLayout, QCheckBox, QComboBox)
+from PyQt5.QtCore import (Qt, QTimer)
+from PyQt5.QtGui import (QFont, QColor, QPalette, QImage, QPixmap, QPainter)
+from database import get_db, init_db, AttemptRecorder
+from workers import TaskRunner
+from question_bank import BankCache
+from quiz_engine import LocalBackend, UsernameTaken, QUESTIONS_PER_QUIZ, calculate_level, level_progress
+from checkpoint import CheckpointStore
+import perf
+
+# Sisa waktu ujian dihitung QuizSession dari jam monotonic; QTimer hanya
+# menggambar ulang label. DEGICHI_LOW_POWER=1 menjarangkan wakeup timer
+# untuk laptop yang berjalan dengan baterai.
+LOW_POWER = os.environ.get("DEGICHI_LOW_POWER") == "1"
+TIMER_INTERVAL_MS = 5000 if LOW_POWER else 1000
 
 THEMES = {
     "Matematika": {"bg": "#0f172a", "accent": "#38bdf8", "text": "#e2e8f0", "progress": "#38bdf8"},
@@ -28,57 +36,83 @@ THEMES = {
     "Agama": {"bg": "#1e3a1e", "accent": "#a3e635", "text": "#ecfccb", "progress": "#a3e635"},
 }
 
-def calculate_level(xp):
-    level = 1
-    while xp >= 100 * level:
-        xp -= 100 * level
-        level += 1
-    return level
-
-def init_db():
-    conn = sqlite3.connect("quizquest.db")
-    c = conn.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            xp INTEGER DEFAULT 0,
-            grade_class TEXT DEFAULT '10.1',  
-            religion TEXT DEFAULT 'Islam',    
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
-    try:
-        c.execute("INSERT INTO users (username, password, xp, grade_class, religion) VALUES (?, ?, ?, ?, ?)",
-                  ("victus", "password123", 250, "11.5", "Islam"))
-    except sqlite3.IntegrityError:
-        pass
-    try:
-        c.execute("ALTER TABLE users ADD COLUMN grade_class TEXT DEFAULT '10.1'")
-    except:
-        pass
-    try:
-        c.execute("ALTER TABLE users ADD COLUMN religion TEXT DEFAULT 'Islam'")
-    except:
-        pass
-    conn.commit()
-    conn.close()
+def compile_stylesheet(themes):
+    """Susun satu stylesheet untuk seluruh aplikasi dari THEMES.
+
+    Widget memilih gaya lewat dynamic property (role, subject, theme,
+    selected, state, ...), jadi mengganti tampilan cukup dengan mengubah
+    property lalu mem-polish ulang widget itu saja.
+    """
+    rules = ["""
+        QPushButton[role="primary"] {
+            background: #3b82f6; color: white; border: none;
+            border-radius: 12px; padding: 12px 24px;
+            font-size: 15px; font-weight: 600;
+        }
+        QPushButton[role="primary"]:hover { background: #2563eb; }
+        QPushButton[role="primary"]:pressed { background: #1d4ed8; }
+        QPushButton[role="subject"] {
+            color: #0f172a;
+            border-radius: 20px;
+            font-size: 22px; font-weight: bold;
+        }
+        QPushButton[role="powerup"] {
+            background: #1e293b; color: #94a3b8;
+            border-radius: 45px; border: none;
+            font-size: 11px; font-weight: bold;
+        }
+        QPushButton[role="powerup"]:hover { background: #334155; }
+        QPushButton[role="powerup"]:disabled { color: #475569; }
+        QPushButton[role="nav"] { border-radius: 18px; font-size: 12px; }
+        QPushButton[role="nav"][state="empty"] { background: #475569; color: #94a3b8; }
+        QPushButton[role="nav"][state="empty"]:hover { background: #64748b; }
+        QPushButton[role="nav"][state="answered"] { background: #3b82f6; color: white; }
+        QPushButton[role="nav"][state="current"] { background: #60a5fa; color: white; font-weight: bold; }
+        QRadioButton[role="option"] {
+            background: #334155;
+            border-radius: 10px; padding: 14px;
+            font-size: 16px;
+        }
+        QRadioButton[role="option"]::indicator { width: 0; height: 0; }
+        QRadioButton[role="option"]:hover { background: #475569; }
+        QLabel[role="perf"] {
+            background: rgba(2, 6, 23, 210); color: #a3e635;
+            font-family: monospace; font-size: 11px; padding: 6px;
+        }
+    """]
+    for name, theme in themes.items():
+        hover = QColor(theme['accent']).lighter(120).name()
+        rules.append(f"""
+        QPushButton[role="subject"][subject="{name}"] {{ background: {theme['accent']}; }}
+        QPushButton[role="subject"][subject="{name}"]:hover {{ background: {hover}; }}
+        QRadioButton[role="option"][theme="{name}"] {{ color: {theme['text']}; }}
+        """)
+    rules.append("""
+        QRadioButton[role="option"][selected="true"] {
+            background: #3b82f6; color: white; font-weight: bold;
+        }
+        QRadioButton[role="option"][revealed="true"] {
+            background: #10b981; color: white; font-weight: bold;
+        }
+        QRadioButton[role="option"][removed="true"] {
+            background: transparent; color: #94a3b8;
+        }
+    """)
+    return "".join(rules)
+
+APP_STYLESHEET = compile_stylesheet(THEMES)
+
+def set_style_property(widget, name, value):
+    if widget.property(name) == value:
+        return
+    widget.setProperty(name, value)
+    widget.style().unpolish(widget)
+    widget.style().polish(widget)
 
 class AnimatedButton(QPushButton):
     def __init__(self, text="", parent=None):
         super().__init__(text, parent)
-        self.setStyleSheet("""
-            QPushButton {
-                background: #3b82f6; color: white; border: none;
-                border-radius: 12px; padding: 12px 24px;
-                font-size: 15px; font-weight: 600;
-            }
-            QPushButton:hover {
-                background: #2563eb;
-            }
-            QPushButton:pressed {
-                background: #1d4ed8;
-            }
-        """)
+        self.setProperty("role", "primary")
 
 class SubjectCard(QPushButton):
     def __init__(self, subject, theme, parent=None):
@@ -86,19 +120,8 @@ class SubjectCard(QPushButton):
         self.subject = subject
         self.theme = theme
         self.setFixedSize(260, 160)
-        style = f"""
-            QPushButton {{
-                background: {theme['accent']}; 
-                color: #0f172a; 
-                border-radius: 20px;
-                font-size: 22px; font-weight: bold;
-                qproperty-alignment: AlignCenter;
-            }}
-            QPushButton:hover {{
-                background: {QColor(theme['accent']).lighter(120).name()};
-            }}
-        """
-        self.setStyleSheet(style)
+        self.setProperty("role", "subject")
+        self.setProperty("subject", subject if subject in THEMES else "Fisika")
         self.setText(subject)
 
 class PowerUpButton(QPushButton):
@@ -107,107 +130,285 @@ class PowerUpButton(QPushButton):
         self.name = name
         self.cost_minutes = cost_minutes
         self.setFixedSize(90, 90)
-        style = f"""
-            QPushButton {{
-                background: #1e293b; color: #94a3b8;
-                border-radius: 45px; border: none;
-                font-size: 11px; font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background: #334155;
-            }}
-            QPushButton:disabled {{
-                color: #475569;
-            }}
-        """
-        self.setStyleSheet(style)
+        self.setProperty("role", "powerup")
         self.setText(f"{icon_text}\n-{cost_minutes} menit")
         self.setToolTip(f"{name} (Kurangi {cost_minutes} menit dari waktu ujian)")
 
-class ConfettiParticle(QLabel):
-    def __init__(self, parent, x, y, color, size, fall_x_offset):
+class ConfettiOverlay(QWidget):
+    """Satu widget transparan di atas layar hasil yang menggambar semua confetti.
+
+    Data partikel disimpan di list yang dialokasikan sekali per overlay, satu
+    QTimer memajukan waktu, dan paintEvent menggambar semua partikel dari
+    sprite "✦" yang sudah dirender (per warna dan ukuran). Dengan
+    DEGICHI_LOW_POWER=1, atau jika beberapa frame terlalu lama digambar,
+    jumlah partikel dan frame rate diturunkan untuk sisa sesi aplikasi.
+    """
+    COLORS = ("#ef4444", "#f97316", "#eab308", "#22c55e", "#3b82f6", "#8b5cf6", "#ec4899")
+    SIZES = (18, 22, 26, 30)
+    PARTICLES = 160
+    LOW_POWER_PARTICLES = 40
+    FRAME_MS = 16
+    LOW_POWER_FRAME_MS = 40
+    FALL_MS = (2500, 4000)
+    FADE_MS = 2000
+    SLOW_FRAME_MS = 8
+    SLOW_FRAMES = 3
+    low_power = LOW_POWER
+    _sprites = None
+
+    def __init__(self, parent, particles=None):
         super().__init__(parent)
-        self.setText("✦")
-        self.setFont(QFont("Arial", size))
-        self.setStyleSheet(f"color: {color}; background: transparent;")
-        self.setAttribute(Qt.WA_TranslucentBackground)
-        self.move(x, y)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setAttribute(Qt.WA_NoSystemBackground)
+        self.capacity = particles or self.PARTICLES
+        self.x0 = [0.0] * self.capacity
+        self.y0 = [0.0] * self.capacity
+        self.dx = [0.0] * self.capacity
+        self.dy = [0.0] * self.capacity
+        self.rate = [0.0] * self.capacity
+        self.sprite = [0] * self.capacity
+        self.count = 0
+        self.elapsed = 0.0
+        self.started = 0.0
+        self.slow_frames = 0
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.advance)
+        self.hide()
+
+    @classmethod
+    def sprites(cls):
+        if cls._sprites is None:
+            cls._sprites = []
+            for color in cls.COLORS:
+                for size in cls.SIZES:
+                    pixmap = QPixmap(size * 2, size * 2)
+                    pixmap.fill(Qt.transparent)
+                    painter = QPainter(pixmap)
+                    painter.setFont(QFont("Arial", size))
+                    painter.setPen(QColor(color))
+                    painter.drawText(pixmap.rect(), Qt.AlignCenter, "✦")
+                    painter.end()
+                    cls._sprites.append(pixmap)
+        return cls._sprites
+
+    def burst(self):
+        parent = self.parentWidget()
+        width, height = parent.width(), parent.height()
+        self.count = min(self.capacity, self.LOW_POWER_PARTICLES if self.low_power else self.PARTICLES)
+        sprites = len(self.sprites())
+        for i in range(self.count):
+            y = random.randint(-100, -20)
+            self.x0[i] = random.randint(0, width)
+            self.y0[i] = y
+            self.dx[i] = random.randint(-120, 120)
+            self.dy[i] = height + 100 - y
+            self.rate[i] = 1.0 / random.randint(*self.FALL_MS)
+            self.sprite[i] = random.randrange(sprites)
+        self.slow_frames = 0
+        self.elapsed = 0.0
+        self.started = time.monotonic()
+        self.setGeometry(parent.rect())
+        self.raise_()
         self.show()
-        self.anim = QPropertyAnimation(self, b"pos")
-        self.anim.setDuration(2500 + random.randint(0, 1500))
-        self.anim.setStartValue(QPoint(x, y))
-        self.anim.setEndValue(QPoint(x + fall_x_offset, parent.height() + 100))
-        self.anim.setEasingCurve(QEasingCurve.OutQuad)
-        self.opacity_effect = QGraphicsOpacityEffect(self)
-        self.setGraphicsEffect(self.opacity_effect)
-        self.fade_anim = QPropertyAnimation(self.opacity_effect, b"opacity")
-        self.fade_anim.setDuration(2000)
-        self.fade_anim.setStartValue(1.0)
-        self.fade_anim.setEndValue(0.0)
-        self.anim.start()
-        self.fade_anim.start()
-        QTimer.singleShot(4000, self.deleteLater)
+        self.timer.start(self.LOW_POWER_FRAME_MS if self.low_power else self.FRAME_MS)
+
+    def advance(self):
+        self.elapsed = (time.monotonic() - self.started) * 1000
+        if self.elapsed >= self.FADE_MS:
+            self.timer.stop()
+            self.hide()
+            return
+        self.update()
+
+    def paintEvent(self, event):
+        began = time.perf_counter()
+        t = self.elapsed
+        sprites = self.sprites()
+        x0, y0, dx, dy, rate, sprite = self.x0, self.y0, self.dx, self.dy, self.rate, self.sprite
+        painter = QPainter(self)
+        painter.setOpacity(max(0.0, 1.0 - t / self.FADE_MS))
+        for i in range(self.count):
+            p = t * rate[i]
+            if p > 1.0:
+                p = 1.0
+            eased = p * (2.0 - p)  # OutQuad
+            painter.drawPixmap(int(x0[i] + dx[i] * eased), int(y0[i] + dy[i] * eased), sprites[sprite[i]])
+        painter.end()
+        if not self.low_power and (time.perf_counter() - began) * 1000 > self.SLOW_FRAME_MS:
+            self.slow_frames += 1
+            if self.slow_frames >= self.SLOW_FRAMES:
+                self.degrade()
+
+    def degrade(self):
+        type(self).low_power = True
+        self.count = min(self.count, self.LOW_POWER_PARTICLES)
+        self.timer.setInterval(self.LOW_POWER_FRAME_MS)
+
+
+class PerfOverlay(QLabel):
+    """Overlay developer (F12): jarak antar frame event loop dan statistik span perf.
+
+    Selama tampil, timer 16 ms mencatat jarak antar tick sebagai span "frame";
+    jarak yang jauh di atas 16 ms berarti event loop sempat tersendat.
+    """
+    FRAME_MS = 16
+    REFRESH_MS = 500
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setProperty("role", "perf")
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setTextFormat(Qt.PlainText)
+        self.last_frame = None
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setTimerType(Qt.PreciseTimer)
+        self.frame_timer.timeout.connect(self.on_frame)
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def toggle(self):
+        if self.isVisible():
+            self.frame_timer.stop()
+            self.refresh_timer.stop()
+            self.hide()
+            return
+        self.last_frame = None
+        self.frame_timer.start(self.FRAME_MS)
+        self.refresh_timer.start(self.REFRESH_MS)
+        self.refresh()
+        self.show()
+
+    def on_frame(self):
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            perf.record("frame", (now - self.last_frame) * 1000)
+        self.last_frame = now
+
+    def refresh(self):
+        self.setText("\n".join(perf.format_stats()) or "Belum ada span tercatat.")
+        self.adjustSize()
+        self.move(8, 8)
+        self.raise_()
+
 
 def play_confetti(parent_widget):
-    colors_list = ["#ef4444", "#f97316", "#eab308", "#22c55e", "#3b82f6", "#8b5cf6", "#ec4899"]
-    width = parent_widget.width()
-    for _ in range(40):
-        x = random.randint(0, width)
-        y = random.randint(-100, -20)
-        color = random.choice(colors_list)
-        size = random.randint(18, 32)
-        fall_x = random.randint(-120, 120)
-        ConfettiParticle(parent_widget, x, y, color, size, fall_x)
+    overlay = parent_widget.findChild(ConfettiOverlay)
+    if overlay is None:
+        overlay = ConfettiOverlay(parent_widget)
+    overlay.burst()
 
-def apply_background(widget, image_path):
-    widget.setObjectName("background_container")
-    widget.setStyleSheet(f"""
-        #background_container {{
-            background-image: url('{image_path}');
-            background-repeat: no-repeat;
-            background-position: center;
-            background-size: cover;
-        }}
-    """)
+QUIZ_BACKGROUNDS = {
+    "Matematika": "asset/3.png",
+    "Biologi": "asset/5.png",
+    "Fisika": "asset/6.png",
+    "Bahasa Indonesia": "asset/7.png",
+    "Kimia": "asset/8.png",
+    "Bahasa Inggris": "asset/9.png",
+}
+
+@perf.span("export_pdf")
+def export_result_pdf(data):
+    # ReportLab (~0,1 detik impor) baru dimuat saat laporan pertama dicetak,
+    # di thread worker, supaya tidak memperlambat munculnya layar login.
+    from reports import write_result_pdf, report_filename, REPORT_DIR
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    return write_result_pdf(os.path.join(REPORT_DIR, report_filename(data)), data)
+
+
+def quiz_background(subject):
+    return QUIZ_BACKGROUNDS.get(subject, "asset/2.png")
+
+def result_background(subject):
+    if subject == "Matematika":
+        return "asset/4.png"
+    return quiz_background(subject)
+
+def scale_background(image, size):
+    if image.isNull() or size.isEmpty():
+        return image
+    return image.scaled(size, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+
+def decode_background(image_path, size):
+    # Aman dijalankan di thread pool: QImage tidak terikat ke thread GUI.
+    image = QImage(image_path)
+    return image, scale_background(image, size)
 
-def load_questions_from_txt(filepath):
-    if not os.path.exists(filepath):
-        print(f"❌ File tidak ditemukan: {filepath}")
-        return []
-    questions = []
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            content = f.read().strip()
-        blocks = content.split("[SOAL]")
-        for block in blocks:
-            if not block.strip():
+class BackgroundManager:
+    """Cache gambar latar: tiap file di asset/ di-decode sekali saja.
+
+    Hasil decode disimpan sebagai QImage, dan pixmap hasil skala disimpan per
+    ukuran layar sehingga skala ulang hanya terjadi saat jendela berubah
+    ukuran. Kedua cache dibatasi `max_items` entri.
+    """
+
+    def __init__(self, max_items=6):
+        self.max_items = max_items
+        self._images = OrderedDict()
+        self._pixmaps = OrderedDict()
+        self._loading = set()
+
+    def pixmap(self, image_path, size):
+        key = (image_path, size.width(), size.height())
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+            return pixmap
+        image = self._images.get(image_path)
+        if image is None:
+            image, scaled = decode_background(image_path, size)
+        else:
+            scaled = scale_background(image, size)
+        return self._store(key, image, scaled)
+
+    def preload(self, tasks, image_paths, size):
+        for image_path in image_paths:
+            key = (image_path, size.width(), size.height())
+            if key in self._pixmaps or key in self._loading:
                 continue
-            lines = [line.strip() for line in block.strip().split("\n") if line.strip()]
-            q = {}
-            options = []
-            for line in lines:
-                if line.startswith("text:"):
-                    q["text"] = line[5:].strip()
-                elif line.startswith("option_A:"):
-                    options.append(line[9:].strip())
-                elif line.startswith("option_B:"):
-                    options.append(line[9:].strip())
-                elif line.startswith("option_C:"):
-                    options.append(line[9:].strip())
-                elif line.startswith("option_D:"):
-                    options.append(line[9:].strip())
-                elif line.startswith("answer:"):
-                    ans = line[7:].strip().upper()
-                    q["answer"] = {"A":0, "B":1, "C":2, "D":3}.get(ans, 0)
-                elif line.startswith("clue:"):
-                    q["clue"] = line[6:].strip()
-            if "text" in q and len(options) == 4:
-                q["options"] = options
-                questions.append(q)
-    except Exception as e:
-        print(f"❌ Error membaca {filepath}: {e}")
-        return []
-    return questions
+            self._loading.add(key)
+            tasks.submit(decode_background, image_path, size,
+                         on_done=lambda result, k=key: self._on_preloaded(k, *result),
+                         on_error=lambda _, k=key: self._loading.discard(k))
+
+    def _on_preloaded(self, key, image, scaled):
+        self._loading.discard(key)
+        if key not in self._pixmaps:
+            self._store(key, image, scaled)
+
+    def _store(self, key, image, scaled):
+        self._images[key[0]] = image
+        self._images.move_to_end(key[0])
+        pixmap = QPixmap.fromImage(scaled)
+        self._pixmaps[key] = pixmap
+        for cache in (self._images, self._pixmaps):
+            while len(cache) > self.max_items:
+                cache.popitem(last=False)
+        return pixmap
+
+BACKGROUNDS = BackgroundManager()
+
+class BackgroundWidget(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.image_path = None
+
+    def set_background(self, image_path):
+        self.image_path = image_path
+        self.update()
+
+    def paintEvent(self, event):
+        if not self.image_path:
+            return super().paintEvent(event)
+        pixmap = BACKGROUNDS.pixmap(self.image_path, self.size())
+        if pixmap.isNull():
+            return
+        painter = QPainter(self)
+        painter.drawPixmap((self.width() - pixmap.width()) // 2,
+                           (self.height() - pixmap.height()) // 2, pixmap)
+
+def apply_background(widget, image_path):
+    widget.set_background(image_path)
 
 class QuizApp(QMainWindow):
     def __init__(self):
@@ -218,24 +419,40 @@ class QuizApp(QMainWindow):
         font.setPointSize(11)
         font.setFamily("Segoe UI, Tahoma, Geneva, Verdana, sans-serif")
         self.setFont(font)
+        self.setStyleSheet(APP_STYLESHEET)
         self.current_user = None
         self.current_subject = None
-        self.questions = []
-        self.current_question_index = 0
-        self.score = 0
-        self.xp_earned = 0
-        self.used_powerups = []
-        self.selected_answer = -1
-        self.time_left = 90 * 60 
+        self.session = None
         self.timer = QTimer()
+        self.timer.setTimerType(Qt.VeryCoarseTimer if LOW_POWER else Qt.CoarseTimer)
         self.timer.timeout.connect(self.update_timer)
-        self.answers = [-1] * 20
-        init_db()
+        self.quiz_view = None
+        self.rank_label = None
+        self.tasks = TaskRunner(self)
+        self.perf_overlay = PerfOverlay(self)
+        # Dengan --server host:port atau DEGICHI_SERVER, soal, waktu dan hasil
+        # ujian dikelola exam_server.py; tanpa itu semuanya lokal. exam_server
+        # (asyncio) hanya diimpor jika server dipakai, supaya start tetap cepat.
+        if os.environ.get("DEGICHI_SERVER") or any(arg.startswith("--server") for arg in sys.argv):
+            from exam_server import ExamClient, RemoteBackend, server_address
+            address = server_address()
+        else:
+            address = None
+        if address:
+            self.backend = RemoteBackend(ExamClient(*address))
+        else:
+            init_db()
+            bank_cache = BankCache(int(os.environ.get("DEGICHI_BANK_CACHE_MB", 64)) * 1024 * 1024)
+            self.backend = LocalBackend(bank_cache, AttemptRecorder(), CheckpointStore())
         self.show_login_screen()
 
     def keyPressEvent(self, event):
 
-        if not hasattr(self, 'questions') or not self.questions:
+        if event.key() == Qt.Key_F12:
+            self.perf_overlay.toggle()
+            return
+
+        if self.session is None or self.quiz_view is None:
             return super().keyPressEvent(event)
 
         key = event.key()
@@ -254,14 +471,14 @@ class QuizApp(QMainWindow):
                 self.on_option_selected()  # Simpan jawaban
 
         elif key == Qt.Key_Right or key == Qt.Key_N:
-            if self.selected_answer != -1:
+            if self.session.selected_answer != -1:
                 self.next_question()
             else:
                 QMessageBox.warning(self, "Perhatian", "Pilih jawaban dulu sebelum lanjut.")
 
         elif key == Qt.Key_Left or key == Qt.Key_P:
-            if self.current_question_index > 0:
-                self.go_to_question(self.current_question_index - 1)
+            if self.session.current_index > 0:
+                self.go_to_question(self.session.current_index - 1)
 
         elif key == Qt.Key_Escape:
             self.confirm_exit_quiz()
@@ -281,7 +498,7 @@ class QuizApp(QMainWindow):
 
     def show_login_screen(self):
         self.clear_screen()
-        self.stacked_widget = QWidget()
+        self.stacked_widget = BackgroundWidget()
         layout = QVBoxLayout(self.stacked_widget)
         layout.setAlignment(Qt.AlignCenter)
         layout.setSpacing(20)
@@ -327,10 +544,11 @@ class QuizApp(QMainWindow):
         layout.addWidget(form)
         apply_background(self.stacked_widget, "asset/1.png")
         self.setCentralWidget(self.stacked_widget)
+        BACKGROUNDS.preload(self.tasks, ["asset/2.png"], self.screen_size())
 
     def show_register_screen(self):
         self.clear_screen()
-        self.stacked_widget = QWidget()
+        self.stacked_widget = BackgroundWidget()
         layout = QVBoxLayout(self.stacked_widget)
         layout.setAlignment(Qt.AlignCenter)
         layout.setSpacing(20)
@@ -426,51 +644,90 @@ class QuizApp(QMainWindow):
         if password != confirm:
             QMessageBox.warning(self, "Gagal Daftar", "Password tidak cocok.")
             return
-        try:
-            conn = sqlite3.connect("quizquest.db")
-            c = conn.cursor()
-            c.execute("""
-                INSERT INTO users (username, password, xp, grade_class, religion) 
-                VALUES (?, ?, 0, ?, ?)
-            """, (username, password, grade_class, religion))
-            conn.commit()
-            conn.close()
-            QMessageBox.information(self, "Sukses", f"Akun {grade_class} ({religion}) berhasil dibuat!")
-            self.show_login_screen()
-        except sqlite3.IntegrityError:
+        self.tasks.submit(self.backend.register, username, password, grade_class, religion,
+                          on_done=lambda _: self.on_register_done(grade_class, religion),
+                          on_error=self.on_register_failed, key="register")
+
+    def on_register_done(self, grade_class, religion):
+        QMessageBox.information(self, "Sukses", f"Akun {grade_class} ({religion}) berhasil dibuat!")
+        self.show_login_screen()
+
+    def on_register_failed(self, error):
+        if isinstance(error, UsernameTaken):
             QMessageBox.warning(self, "Gagal Daftar", "Username sudah digunakan.")
+        else:
+            QMessageBox.critical(self, "Gagal Daftar", f"Database tidak dapat diakses:\n{error}")
 
     def handle_login(self):
         username = self.login_username.text().strip()
         password = self.login_password.text()
-        conn = sqlite3.connect("quizquest.db")
-        c = conn.cursor()
-        c.execute("SELECT id, username, xp, grade_class, religion FROM users WHERE username = ? AND password = ?", (username, password))
-        user = c.fetchone()
-        conn.close()
+        self.tasks.submit(self.backend.login, username, password,
+                          on_done=self.on_login_result, on_error=self.on_db_error, key="login")
+
+    def on_login_result(self, user):
         if user:
-            self.current_user = {
-                "id": user[0], 
-                "username": user[1], 
-                "xp": user[2],
-                "grade_class": user[3],
-                "religion": user[4]}
-            self.show_dashboard()
+            self.current_user = user
+            self.tasks.submit(self.backend.resumable, user, on_done=self.on_resumable,
+                              on_error=self.on_db_error, key="resumable")
         else:
             QMessageBox.warning(self, "Gagal Masuk", "Username atau password salah.")
 
+    def on_resumable(self, info):
+        if not info:
+            self.show_dashboard()
+            return
+        reply = QMessageBox.question(
+            self, "Lanjutkan Ujian",
+            f"Ujian {info['subject']} belum selesai ({info['answered']}/{info['total']} soal dijawab, "
+            f"sisa waktu {info['time_left'] // 60} menit).\nLanjutkan ujian ini?",
+            QMessageBox.Yes | QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            self.tasks.submit(self.backend.resume_quiz, self.current_user, on_done=self.on_quiz_resumed,
+                              on_error=self.on_db_error, key="start_quiz")
+        else:
+            self.tasks.submit(self.backend.discard_quiz, self.current_user, on_error=self.on_db_error)
+            self.show_dashboard()
+
+    def logout(self):
+        self.leave_quiz()
+        self.tasks.submit(self.backend.logout, self.current_user, on_error=self.on_db_error)
+        self.current_user = None
+        self.show_login_screen()
+
+    def on_quiz_resumed(self, session):
+        if session is None:
+            self.show_dashboard()
+            return
+        BACKGROUNDS.preload(self.tasks, [quiz_background(session.subject), result_background(session.subject)],
+                            self.screen_size())
+        self.begin_session(session)
+
+    def on_db_error(self, error):
+        if isinstance(error, OSError):
+            QMessageBox.critical(self, "Server Ujian", f"Server ujian tidak dapat dihubungi:\n{error}")
+            return
+        QMessageBox.critical(self, "Error Database", f"Database tidak dapat diakses:\n{error}")
+
+    @perf.span("screen:dashboard")
     def show_dashboard(self):
         self.clear_screen()
-        self.stacked_widget = QWidget()
+        self.stacked_widget = BackgroundWidget()
         layout = QVBoxLayout(self.stacked_widget)
         layout.setContentsMargins(40, 40, 40, 40)
         header = QHBoxLayout()
         if self.current_user:
-            level = calculate_level(self.current_user['xp'])
-            user_label = QLabel(f"Halo, {self.current_user['username']}! | XP: {self.current_user['xp']} | Lv.{level}")
+            level, level_xp, level_need = level_progress(self.current_user['xp'])
+            user_label = QLabel(f"Halo, {self.current_user['username']}! | XP: {self.current_user['xp']} | "
+                                f"Lv.{level} ({level_xp}/{level_need})")
             user_label.setStyleSheet("font-size: 16px; font-weight: bold;")
             header.addWidget(user_label)
         header.addStretch()
+        if self.current_user:
+            self.rank_label = QLabel("")
+            self.rank_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #fbbf24;")
+            header.addWidget(self.rank_label)
+            self.tasks.submit(self.backend.rank, self.current_user, on_done=self.on_rank_loaded,
+                              on_error=lambda e: print(f"❌ Peringkat gagal dimuat: {e}"), key="rank")
         layout.addLayout(header)
         title = QLabel("Pilih Mata Pelajaran")
         title.setStyleSheet("font-size: 36px; font-weight: bold; margin: 20px 0;")
@@ -517,12 +774,17 @@ class QuizApp(QMainWindow):
             }
             QPushButton:hover { background: #dc2626; }
         """)
-        btn_logout.clicked.connect(self.show_login_screen)
+        btn_logout.clicked.connect(self.logout)
         footer.addWidget(btn_logout)
         layout.addLayout(footer)
         apply_background(self.stacked_widget, "asset/2.png")
         self.setCentralWidget(self.stacked_widget)
 
+    def on_rank_loaded(self, rank):
+        if rank and self.rank_label is not None:
+            self.rank_label.setText(
+                f"🏆 Peringkat #{rank['rank']} dari {rank['total']} di kelas {self.current_user['grade_class']}")
+
     def show_help_dialog(self):
         help_text = (
             "<h3 style='color:#38bdf8;'>Petunjuk Penggunaan Kuis</h3>"
@@ -585,63 +847,56 @@ class QuizApp(QMainWindow):
         msg.exec_()
 
     def start_quiz(self, subject):
-        grade_part = self.current_user["grade_class"].split(".")[0]
-        subject_map = {
-            "Matematika": "matematika",
-            "Fisika": "fisika",
-            "Kimia": "kimia",
-            "Biologi": "biologi",
-            "Bahasa Indonesia": "bahasa_indonesia",
-            "Bahasa Inggris": "bahasa_inggris",
-            "PKN": "pkn",
-            "Sosiologi": "sosiologi",
-            "Ekonomi": "ekonomi",
-            "Geografi": "geografi",
-            "Sejarah": "sejarah",
-            "Matematika Lanjut": "matematika_lanjut",
-            "Olahraga": "olahraga",
-            "Agama": f"agama_{self.current_user['religion'].lower()}"
-        }
-        filename = subject_map.get(subject)
-        if not filename:
+        BACKGROUNDS.preload(self.tasks, [quiz_background(subject), result_background(subject)], self.screen_size())
+        self.tasks.submit(self.backend.start_quiz, self.current_user, subject,
+                          on_done=lambda result: self.on_quiz_started(subject, *result),
+                          on_error=self.on_db_error, key="start_quiz")
+
+    def on_quiz_started(self, subject, status, info, session):
+        if status == "unsupported":
             QMessageBox.critical(self, "Error", f"Mapel {subject} tidak didukung.")
             return
-        filepath = f"questions/{grade_part}/{filename}.txt"
-        if not os.path.exists(filepath):
+        if status == "missing":
             QMessageBox.critical(self, "File Tidak Ditemukan", 
-                f"Soal tidak ditemukan:\n{filepath}\n"
+                f"Soal tidak ditemukan:\n{info}\n"
                 f"Pastikan folder & file sudah dibuat.")
             return
-        all_questions = load_questions_from_txt(filepath)
-        if len(all_questions) < 20:
+        if status == "too_few":
+            grade_part = self.current_user["grade_class"].split(".")[0]
             QMessageBox.warning(self, "Soal Kurang", 
-                f"Hanya ada {len(all_questions)} soal untuk {subject} (kelas {grade_part}).\n"
-                "Dibutuhkan minimal 20.")
+                f"Hanya ada {info} soal untuk {subject} (kelas {grade_part}).\n"
+                f"Dibutuhkan minimal {QUESTIONS_PER_QUIZ}.")
+            return
+        self.begin_session(session)
+
+    def begin_session(self, session):
+        self.session = session
+        self.current_subject = session.subject
+        if session.finished:
+            self.show_result_screen()
             return
-        self.questions = random.sample(all_questions, 20)
-        self.current_subject = subject
-        self.current_question_index = 0
-        self.score = 0
-        self.xp_earned = 0
-        self.used_powerups = []
-        self.selected_answer = -1
-        self.time_left = 90 * 60
-        self.timer.start(1000)
-        self.answers = [-1] * 20
+        self.timer.start(TIMER_INTERVAL_MS)
         self.show_quiz_screen()
 
+    @perf.span("screen:quiz")
     def show_quiz_screen(self):
+        # Tampilan kuis dibangun sekali per kuis; navigasi antar soal hanya
+        # memperbarui teks, status pilihan dan tombol navigasi.
+        if self.quiz_view is None:
+            self.build_quiz_screen()
+        self.refresh_quiz_screen()
+
+    def build_quiz_screen(self):
         self.clear_screen()
         theme = THEMES[self.current_subject]
-        self.stacked_widget = QWidget()
+        self.stacked_widget = BackgroundWidget()
         main_layout = QVBoxLayout(self.stacked_widget)
         main_layout.setContentsMargins(30, 20, 30, 20)
         top_bar = QHBoxLayout()
-        self.timer_label = QLabel(self.format_time(self.time_left))
+        self.timer_label = QLabel(self.format_time(self.session.time_left))
         self.timer_label.setStyleSheet(f"font-size: 18px; font-weight: bold; color: {theme['accent']};")
         top_bar.addWidget(self.timer_label)
-        level = calculate_level(self.current_user['xp'] + self.xp_earned)
-        self.xp_label = QLabel(f"XP: {self.current_user['xp'] + self.xp_earned} | Lv.{level}")
+        self.xp_label = QLabel()
         self.xp_label.setStyleSheet("font-size: 16px;")
         top_bar.addWidget(self.xp_label)
         top_bar.addStretch()
@@ -652,45 +907,27 @@ class QuizApp(QMainWindow):
         main_layout.addLayout(top_bar)
         self.progress_bar = QLabel()
         self.progress_bar.setFixedHeight(8)
-        self.update_progress_bar()
         main_layout.addWidget(self.progress_bar)
-        q_num = QLabel(f"Soal {self.current_question_index + 1} dari 20")
-        q_num.setStyleSheet("font-size: 18px; font-weight: bold; margin: 15px 0;")
-        main_layout.addWidget(q_num)
-        self.question_label = QLabel(self.questions[self.current_question_index]["text"])
+        self.q_num_label = QLabel()
+        self.q_num_label.setStyleSheet("font-size: 18px; font-weight: bold; margin: 15px 0;")
+        main_layout.addWidget(self.q_num_label)
+        self.question_label = QLabel()
         self.question_label.setWordWrap(True)
         self.question_label.setStyleSheet("font-size: 20px; margin: 20px 0;")
         main_layout.addWidget(self.question_label)
-        self.option_group = QButtonGroup(self)
+        self.option_group = QButtonGroup(self.stacked_widget)
         self.option_buttons = []
         options_layout = QVBoxLayout()
         options_layout.setSpacing(12)
-        for i, opt in enumerate(self.questions[self.current_question_index]["options"]):
-            btn = QRadioButton(f"{chr(65+i)}. {opt}")
-            style = f"""
-                QRadioButton {{
-                    background: #334155; color: {theme['text']}; 
-                    border-radius: 10px; padding: 14px;
-                    font-size: 16px;
-                }}
-                QRadioButton::indicator {{
-                    width: 0; height: 0;
-                }}
-                QRadioButton:hover {{
-                    background: #475569;
-                }}
-            """
-            btn.setStyleSheet(style)
+        for i in range(4):
+            btn = QRadioButton()
+            btn.setProperty("role", "option")
+            btn.setProperty("theme", self.current_subject)
             self.option_group.addButton(btn, i)
             btn.clicked.connect(self.on_option_selected)
             options_layout.addWidget(btn)
             self.option_buttons.append(btn)
         main_layout.addLayout(options_layout)
-        saved_answer = self.answers[self.current_question_index]
-        if saved_answer != -1:
-            self.option_buttons[saved_answer].setChecked(True)
-            self.selected_answer = saved_answer
-            self.on_option_selected()
         powerup_layout = QHBoxLayout()
         powerup_layout.setSpacing(20)
         powerup_layout.setAlignment(Qt.AlignCenter)
@@ -717,62 +954,56 @@ class QuizApp(QMainWindow):
         nav_layout = QHBoxLayout(nav_widget)
         nav_layout.setSpacing(6)
         self.nav_buttons = []
-        for i in range(20):
+        for i in range(len(self.session.questions)):
             btn = QPushButton(str(i+1))
             btn.setFixedSize(36, 36)
-            if i == self.current_question_index:
-                btn.setStyleSheet("""
-                    QPushButton { 
-                        background: #60a5fa; color: white; 
-                        border-radius: 18px; font-size: 12px; 
-                        font-weight: bold;
-                    }
-                """)
-            elif self.answers[i] != -1:
-                btn.setStyleSheet("""
-                    QPushButton { 
-                        background: #3b82f6; color: white; 
-                        border-radius: 18px; font-size: 12px; }""")
-            else:
-                btn.setStyleSheet("""
-                    QPushButton { 
-                        background: #475569; color: #94a3b8; 
-                        border-radius: 18px; font-size: 12px; 
-                    }
-                    QPushButton:hover { background: #64748b; }
-                """)
+            btn.setProperty("role", "nav")
             btn.clicked.connect(lambda _, idx=i: self.go_to_question(idx))
             self.nav_buttons.append(btn)
             nav_layout.addWidget(btn)
         nav_scroll.setWidget(nav_widget)
         main_layout.addWidget(nav_scroll)
         self.next_button = AnimatedButton("Soal Berikutnya")
-        self.next_button.setEnabled(self.selected_answer != -1)
         self.next_button.clicked.connect(self.next_question)
-        if self.current_question_index == 19:
-            self.next_button.setText("Selesai")
         main_layout.addWidget(self.next_button, alignment=Qt.AlignCenter)
-        bg_map = {
-            "Matematika": "asset/3.png",
-            "Biologi": "asset/5.png",
-            "Fisika": "asset/6.png",
-            "Bahasa Indonesia": "asset/7.png",
-            "Kimia": "asset/8.png",
-            "Bahasa Inggris": "asset/9.png",
-        }
-        bg_path = bg_map.get(self.current_subject, "asset/2.png")
-        apply_background(self.stacked_widget, bg_path)
+        apply_background(self.stacked_widget, quiz_background(self.current_subject))
         self.setCentralWidget(self.stacked_widget)
+        self.quiz_view = self.stacked_widget
 
+    def refresh_quiz_screen(self):
+        session = self.session
+        index = session.current_index
+        question = session.question
+        self.timer_label.setText(self.format_time(session.time_left))
+        level = calculate_level(session.total_xp)
+        self.xp_label.setText(f"XP: {session.total_xp} | Lv.{level}")
+        self.update_progress_bar()
+        self.q_num_label.setText(f"Soal {index + 1} dari {len(session.questions)}")
+        self.question_label.setText(question["text"])
+        for i, (btn, opt) in enumerate(zip(self.option_buttons, question["options"])):
+            btn.setText(f"{chr(65+i)}. {opt}")
+            btn.setEnabled(True)
+            set_style_property(btn, "removed", "false")
+            set_style_property(btn, "revealed", "false")
+        self.update_option_styles()
+        for i, btn in enumerate(self.nav_buttons):
+            if i == index:
+                state = "current"
+            elif session.answers[i] != -1:
+                state = "answered"
+            else:
+                state = "empty"
+            set_style_property(btn, "state", state)
+        self.next_button.setEnabled(session.selected_answer != -1)
+        self.next_button.setText("Selesai" if session.is_last else "Soal Berikutnya")
+
+    @perf.span("screen:result")
     def show_result_screen(self):
-        if not hasattr(self, 'score'):
-            self.score = 0
-        if not hasattr(self, 'xp_earned'):
-            self.xp_earned = 0
+        session = self.session
         self.timer.stop()
         self.clear_screen()
         theme = THEMES[self.current_subject]
-        self.stacked_widget = QWidget()
+        self.stacked_widget = BackgroundWidget()
         layout = QVBoxLayout(self.stacked_widget)
         layout.setAlignment(Qt.AlignCenter)
         layout.setSpacing(25)
@@ -783,19 +1014,16 @@ class QuizApp(QMainWindow):
         subtitle = QLabel(self.current_subject)
         subtitle.setStyleSheet(f"font-size: 24px; color: {theme['accent']};")
         layout.addWidget(subtitle)
-        total_xp = self.current_user['xp'] + self.xp_earned
-        conn = sqlite3.connect("quizquest.db")
-        c = conn.cursor()
-        c.execute("UPDATE users SET xp = ? WHERE username = ?", (total_xp, self.current_user['username']))
-        conn.commit()
-        conn.close()
+        total_xp = session.total_xp
+        self.tasks.submit(self.backend.finish_quiz, session, on_error=self.on_db_error)
+        self.current_user['xp'] = total_xp
         level = calculate_level(total_xp)
         stats = [
-            ("Skor", f"{self.score} / 20"),
-            ("Waktu Tersisa", self.format_time(self.time_left)),
-            ("XP Diperoleh", f"+{self.xp_earned}"),
+            ("Skor", f"{session.score} / {len(session.questions)}"),
+            ("Waktu Tersisa", self.format_time(session.time_left)),
+            ("XP Diperoleh", f"+{session.xp_earned}"),
             ("Level Saat Ini", f"Lv. {level}"),
-            ("Power-up Digunakan", str(len(self.used_powerups)) if self.used_powerups else "Tidak ada")
+            ("Power-up Digunakan", str(len(session.used_powerups)) if session.used_powerups else "Tidak ada")
         ]
         for label, value in stats:
             row = QHBoxLayout()
@@ -807,7 +1035,7 @@ class QuizApp(QMainWindow):
             row.addWidget(v)
             row.addStretch()
             layout.addLayout(row)
-        score_percent = (self.score / 20) * 100
+        score_percent = session.result()["percentage"]
         if score_percent >= 90:
             message = "Luar Biasa! Kamu Hebat!"
             color = "gold"
@@ -835,126 +1063,43 @@ class QuizApp(QMainWindow):
         btn_back.clicked.connect(self.show_dashboard)
         layout.addWidget(btn_back)
         
-        if self.current_subject == "Matematika":
-            apply_background(self.stacked_widget, "asset/4.png")
-        else:
-            bg_map = {
-                "Biologi": "asset/5.png",
-                "Fisika": "asset/6.png",
-                "Bahasa Indonesia": "asset/7.png",
-                "Kimia": "asset/8.png",
-                "Bahasa Inggris": "asset/9.png",
-            }
-            bg_path = bg_map.get(self.current_subject, "asset/2.png")
-            apply_background(self.stacked_widget, bg_path)
+        apply_background(self.stacked_widget, result_background(self.current_subject))
         self.setCentralWidget(self.stacked_widget)
 
     def export_result_to_pdf(self):
-        if not self.current_user or not self.current_subject:
+        if not self.current_user or self.session is None:
             QMessageBox.warning(self, "Gagal", "Data ujian tidak ditemukan.")
             return
-        folder = "reports"
-        os.makedirs(folder, exist_ok=True)
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_subject = self.current_subject.replace(" ", "_").lower()
-        filename = f"hasil_{self.current_user['username']}_{safe_subject}_{timestamp}.pdf"
-        filepath = os.path.join(folder, filename)
-        c = canvas.Canvas(filepath, pagesize=A4)
-        width, height = A4
-        margin = 20 * mm
-        y = height - margin
-        c.setFont("Helvetica-Bold", 14)
-        c.drawCentredString(width / 2, y, "LAPORAN HASIL UJIAN")
-        y -= 16
-        c.setFont("Helvetica", 11)
-        c.drawCentredString(width / 2, y, "Aplikasi CBT DEGICHI")
-        y -= 10
-        c.line(margin, y, width - margin, y)
-        y -= 25
-        c.setFont("Helvetica-Bold", 11)
-        c.drawString(margin, y, "DATA PESERTA")
-        y -= 5
-        c.setLineWidth(0.5)
-        c.setStrokeColor(colors.grey)
-        c.rect(margin, y - 40, (width / 2) - margin * 1.2, 40, stroke=1, fill=0)
-        c.setFont("Helvetica", 10)
-        line_y = y - 10
-        c.drawString(margin + 5, line_y, f"Nama        : {self.current_user['username']}")
-        line_y -= 12
-        c.drawString(margin + 5, line_y, f"Kelas       : {self.current_user.get('grade_class', '-')}")
-        line_y -= 12
-        c.drawString(margin + 5, line_y, f"Agama       : {self.current_user.get('religion', '-')}")
-        box_x = (width / 2) + 5
-        box_width = (width / 2) - margin - 5
-        c.setFont("Helvetica-Bold", 11)
-        c.drawString(box_x, y, "DATA UJIAN")
-        y2 = y - 5
-        c.rect(box_x, y2 - 40, box_width, 40, stroke=1, fill=0)
-        c.setFont("Helvetica", 10)
-        line_y2 = y2 - 10
-        c.drawString(box_x + 5, line_y2, f"Mata Pelajaran : {self.current_subject}")
-        line_y2 -= 12
-        score_percent = (self.score / 20) * 100 if hasattr(self, "score") else 0
-        c.drawString(box_x + 5, line_y2, f"Skor           : {self.score} / 20 ({score_percent:.1f}%)")
-        line_y2 -= 12
-        total_seconds = 90 * 60
-        used_seconds = total_seconds - self.time_left if hasattr(self, "time_left") else 0
-        used_minutes = used_seconds // 60
-        c.drawString(box_x + 5, line_y2, f"Waktu Terpakai : {used_minutes} menit")
-        y = y2 - 60
-        c.setFont("Helvetica-Bold", 11)
-        c.drawString(margin, y, "REKAP NILAI")
-        y -= 5
-        c.rect(margin, y - 45, width - 2 * margin, 45, stroke=1, fill=0)
-        KKM = 75
-        nilai_angka = score_percent
-        status = "LULUS" if nilai_angka >= KKM else "TIDAK LULUS"
-        c.setFont("Helvetica", 10)
-        line_y = y - 12
-        c.drawString(margin + 5, line_y, f"Nilai Akhir : {nilai_angka:.1f}")
-        line_y -= 12
-        c.drawString(margin + 5, line_y, f"KKM         : {KKM}")
-        line_y -= 12
-        c.drawString(margin + 5, line_y, f"Status      : {status}")
-        y = line_y - 25
-        c.setFont("Helvetica-Bold", 11)
-        c.drawString(margin, y, "CATATAN")
-        y -= 5
-        c.rect(margin, y - 45, width - 2 * margin, 45, stroke=1, fill=0)
-        c.setFont("Helvetica", 10)
-        text = c.beginText()
-        text.setTextOrigin(margin + 5, y - 15)
-        text.setLeading(12)
-        if score_percent >= 90:
-            catatan = "Luar biasa. Pertahankan prestasi belajar Anda."
-        elif score_percent >= 80:
-            catatan = "Sangat baik. Tetap konsisten dalam belajar."
-        elif score_percent >= 70:
-            catatan = "Cukup baik. Masih bisa ditingkatkan."
-        elif score_percent >= 60:
-            catatan = "Hampir mencapai standar. Perbanyak latihan soal."
-        else:
-            catatan = "Belum memenuhi standar ketuntasan. Disarankan untuk belajar kembali materi terkait."
-        text.textLine(catatan)
-        c.drawText(text)
-        y = y - 80
-        today_str = datetime.datetime.now().strftime("%d %B %Y")
-        c.setFont("Helvetica", 10)
-        c.drawRightString(width - margin, y, f"Dicetak pada: {today_str}")
-        y -= 50
-        c.drawRightString(width - margin, y, "Guru Pengampu,")
-        y -= 40
-        c.setFont("Helvetica-Bold", 10)
-        c.drawRightString(width - margin, y, "( ................................... )")
-        c.showPage()
-        c.save()
+        data = {
+            "username": self.current_user['username'],
+            "grade_class": self.current_user.get('grade_class'),
+            "religion": self.current_user.get('religion'),
+            "subject": self.session.subject,
+            "score": self.session.score,
+            "total_questions": len(self.session.questions),
+            "time_used": self.session.time_used,
+        }
+        self.tasks.submit(export_result_pdf, data,
+                          on_done=self.on_pdf_written, on_error=self.on_pdf_failed, key="export_pdf")
+
+    def on_pdf_written(self, filepath):
         QMessageBox.information(
             self,
             "PDF Berhasil Dibuat",
             f"Laporan hasil ujian berhasil disimpan.\nLokasi:\n{os.path.abspath(filepath)}"
         )
 
+    def on_pdf_failed(self, error):
+        QMessageBox.critical(self, "Gagal", f"PDF gagal dibuat:\n{error}")
+
+    def screen_size(self):
+        if self.isVisible():
+            return self.size()
+        return QApplication.primaryScreen().size()
+
     def clear_screen(self):
+        self.quiz_view = None
+        self.rank_label = None
         if self.centralWidget():
             self.centralWidget().deleteLater()
 
@@ -963,19 +1108,28 @@ class QuizApp(QMainWindow):
         secs = seconds % 60
         return f"⏱️ {mins:02d}:{secs:02d}"
 
+    def time_up(self):
+        self.timer.stop()
+        QMessageBox.warning(self, "Waktu Habis!", "Waktu pengerjaan telah habis.")
+        self.show_result_screen()
+
+    def leave_quiz(self):
+        # Kuis yang ditinggal tetap tersimpan di checkpoint/server dan bisa
+        # dilanjutkan setelah login; di jendela ini timer-nya harus berhenti.
+        self.timer.stop()
+        self.session = None
+
     def update_timer(self):
-        if self.time_left <= 0:
-            self.time_left = 0
-            self.timer.stop()
-            QMessageBox.warning(self, "Waktu Habis!", "Waktu pengerjaan telah habis.")
-            self.show_result_screen()
+        if self.session is None or self.quiz_view is None:
+            return
+        if self.session.tick():
+            self.time_up()
         else:
-            self.time_left -= 1
-            self.timer_label.setText(self.format_time(self.time_left))
+            self.timer_label.setText(self.format_time(self.session.time_left))
 
     def update_progress_bar(self):
         theme = THEMES[self.current_subject]
-        percent = (self.current_question_index + 1) / 20
+        percent = (self.session.current_index + 1) / len(self.session.questions)
         width = int(self.width() * 0.9)
         bar_width = int(width * percent)
         html = f"""
@@ -986,94 +1140,81 @@ class QuizApp(QMainWindow):
         self.progress_bar.setText(html)
         self.progress_bar.setTextFormat(Qt.RichText)
 
+    def quiz_action(self, fn, *args, on_done):
+        """Jalankan satu aksi sesi kuis lalu `on_done(hasil)` di thread GUI.
+
+        Sesi lokal dipanggil langsung. Sesi server ujian butuh satu round trip
+        TCP per aksi, jadi dijalankan lewat TaskRunner; key yang sama menjaga
+        urutan aksi (klik saat aksi sebelumnya belum dibalas diabaikan).
+        """
+        session = self.session
+
+        def done(result):
+            if self.session is not session or self.quiz_view is None:
+                return  # kuis sudah ditinggal/selesai sebelum server membalas
+            if session.tick():
+                self.time_up()
+                return
+            on_done(result)
+        if not session.remote:
+            done(fn(*args))
+        elif self.tasks.submit(fn, *args, on_done=done, on_error=self.on_db_error, key="quiz_action") is None:
+            self.update_option_styles()
+
     def on_option_selected(self):
-        self.selected_answer = self.option_group.checkedId()
-        self.next_button.setEnabled(True)
-        if self.answers is not None:
-            self.answers[self.current_question_index] = self.selected_answer
+        self.quiz_action(self.session.select, self.option_group.checkedId(), on_done=self.on_answer_saved)
+
+    def on_answer_saved(self, _):
+        self.next_button.setEnabled(self.session.selected_answer != -1)
+        self.update_option_styles()
+
+    def update_option_styles(self):
+        self.option_group.setExclusive(False)
         for i, btn in enumerate(self.option_buttons):
-            if i == self.selected_answer:
-                btn.setStyleSheet(f"""
-                    QRadioButton {{
-                        background: #3b82f6; color: white;
-                        border-radius: 10px; padding: 14px;
-                        font-size: 16px; font-weight: bold;
-                    }}
-                    QRadioButton::indicator {{ width: 0; height: 0; }}
-                """)
-            else:
-                btn.setStyleSheet(f"""
-                    QRadioButton {{
-                        background: #334155; color: {THEMES[self.current_subject]['text']};
-                        border-radius: 10px; padding: 14px;
-                        font-size: 16px;
-                    }}
-                    QRadioButton::indicator {{ width: 0; height: 0; }}
-                """)
+            btn.setChecked(i == self.session.selected_answer)
+            set_style_property(btn, "selected", "true" if i == self.session.selected_answer else "false")
+        self.option_group.setExclusive(True)
 
     def next_question(self):
-        if self.selected_answer == -1:
+        self.quiz_action(self.session.next, on_done=self.on_moved)
+
+    def on_moved(self, moved):
+        if not moved:
             QMessageBox.warning(self, "Perhatian", "Pilih jawaban terlebih dahulu!")
             return
-        correct = self.selected_answer == self.questions[self.current_question_index]["answer"]
-        if correct:
-            self.score += 1
-            self.xp_earned += 100
-        self.current_question_index += 1
-        if self.current_question_index >= 20:
+        if self.session.finished:
             self.show_result_screen()
         else:
             self.show_quiz_screen()
 
     def go_to_question(self, index):
-        if self.selected_answer != -1:
-            self.answers[self.current_question_index] = self.selected_answer
-        self.current_question_index = index
-        self.show_quiz_screen()
+        self.quiz_action(self.session.go_to, index, on_done=lambda _: self.show_quiz_screen())
 
     def use_powerup(self, name):
-        if self.time_left <= 0:
-            return
-        cost_minutes = {"Clue": 5, "50:50": 10, "Reveal": 20}.get(name)
-        if cost_minutes is None:
+        self.quiz_action(self.session.use_powerup, name, on_done=lambda result: self.show_powerup(name, result))
+
+    def show_powerup(self, name, result):
+        if result is None:
             return
-        cost_seconds = cost_minutes * 60
-        if self.time_left < cost_seconds:
+        if not result["ok"]:
             QMessageBox.warning(self, "Waktu Tidak Cukup",
-                                f"Butuh minimal {cost_minutes} menit untuk {name}.\n"
-                                f"Sisa waktu: {self.time_left//60} menit.")
+                                f"Butuh minimal {result['cost_minutes']} menit untuk {name}.\n"
+                                f"Sisa waktu: {self.session.time_left//60} menit.")
             return
-        self.time_left -= cost_seconds
-        self.timer_label.setText(self.format_time(self.time_left))
-        if not hasattr(self, 'option_buttons') or len(self.option_buttons) != 4:
-            return
-        q = self.questions[self.current_question_index]
+        self.timer_label.setText(self.format_time(self.session.time_left))
         if name == "Clue":
-            clue = q.get("clue", "Tidak ada petunjuk tersedia.")
-            QMessageBox.information(self, "💡 Petunjuk", clue)
+            QMessageBox.information(self, "💡 Petunjuk", result["clue"])
         elif name == "50:50":
-            correct_idx = q["answer"]
-            wrong_indices = [i for i in range(4) if i != correct_idx]
-            to_remove = random.sample(wrong_indices, 2)
-            for i in to_remove:
-                if i < len(self.option_buttons):
-                    btn = self.option_buttons[i]
-                    btn.setText("(Dihilangkan)")
-                    btn.setEnabled(False)
-                    btn.setStyleSheet("color: #94a3b8;")
+            for i in result["removed"]:
+                btn = self.option_buttons[i]
+                btn.setText("(Dihilangkan)")
+                btn.setEnabled(False)
+                set_style_property(btn, "removed", "true")
         elif name == "Reveal":
-            correct_idx = q["answer"]
             for i, btn in enumerate(self.option_buttons):
-                if i == correct_idx:
+                if i == result["correct"]:
                     btn.setText(btn.text().rstrip(" ✅") + " ✅")
-                    btn.setStyleSheet("""
-                        QRadioButton {
-                            background: #10b981; color: white;
-                            border-radius: 10px; padding: 14px;
-                            font-size: 16px; font-weight: bold;
-                        }
-                        QRadioButton::indicator { width: 0; height: 0; }
-                    """)
+                    set_style_property(btn, "revealed", "true")
                 else:
                     btn.setEnabled(False)
 
@@ -1083,9 +1224,11 @@ class QuizApp(QMainWindow):
             "Apakah Anda yakin ingin keluar? Waktu tetap berjalan.",
             QMessageBox.Yes | QMessageBox.No)
         if reply == QMessageBox.Yes:
+            self.leave_quiz()
             self.show_dashboard()
 
 if __name__ == "__main__":
+    perf.install()
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
     dark_palette = QPalette()
@@ -1106,4 +1249,8 @@ if __name__ == "__main__":
     app.setStyleSheet("QToolTip { color: #ffffff; background-color: #2a2a2a; border: 1px solid white; }")
     window = QuizApp()
     window.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    exit_code = app.exec_()
+    window.tasks.wait()
+    window.backend.close()
+    get_db().close()
+    sys.exit(exit_code)
\ No newline at end of file
@@ -0,0 +1,710 @@
+import sys
+import os
+import time
+import mmap
+import random
+import struct
+import hashlib
+import shutil
+import threading
+from collections import OrderedDict, namedtuple
+import dedup
+import perf
+
+# Bank soal dikompilasi ke file indeks biner (.qbi) agar saat kuis dimulai
+# aplikasi cukup memetakan file ke memori dan men-decode soal yang terpilih saja.
+#
+# Format .qbi:
+#   header   : magic, jumlah soal, mtime_ns sumber, ukuran sumber, sha1 sumber
+#   offsets  : (jumlah + 1) x uint32, posisi tiap record relatif ke awal data
+#   records  : flags (bit 0-1 jawaban, bit 2 ada clue), 6 x uint32 panjang
+#              (text, A, B, C, D, clue), lalu byte UTF-8 keenam string tersebut
+INDEX_DIR = os.path.join("cache", "questions")
+# Naikkan versi magic setiap kali hasil parser berubah, agar .qbi lama dibuat
+# ulang (dan SCHEMA_VERSION di database.py, agar bank diimpor ulang ke SQLite).
+INDEX_MAGIC = b"QBI2"
+BANK_CACHE_BYTES = 64 * 1024 * 1024
+_HEADER = struct.Struct("<4sIQQ20s")
+_OFFSET = struct.Struct("<I")
+_RECORD = struct.Struct("<B6I")
+_HAS_CLUE = 0x04
+
+
+# Format bank soal (.txt): tiap soal diawali baris [SOAL], lalu baris
+# "kunci: nilai" untuk text, option_A..option_D, answer (A-D) dan clue
+# (opsional). Parser membaca baris demi baris dan menghasilkan soal satu per
+# satu; blok yang tidak valid tidak dipakai dan dicatat di ValidationReport.
+_OPTION_KEYS = {"option_A": 0, "option_B": 1, "option_C": 2, "option_D": 3}
+_ANSWER_LETTERS = {"A": 0, "B": 1, "C": 2, "D": 3}
+_FIELD_KEYS = {"text", "answer", "clue"} | set(_OPTION_KEYS)
+
+ValidationIssue = namedtuple("ValidationIssue", "file line severity problem")
+
+
+class ValidationReport:
+    def __init__(self):
+        self.issues = []
+        self.files = 0
+        self.questions = 0
+        self.rejected = 0
+
+    def add(self, file, line, severity, problem):
+        self.issues.append(ValidationIssue(file, line, severity, problem))
+
+    @property
+    def errors(self):
+        return [i for i in self.issues if i.severity == "error"]
+
+    @property
+    def warnings(self):
+        return [i for i in self.issues if i.severity == "warning"]
+
+    def format(self):
+        return "\n".join(f"{i.file}:{i.line}: [{i.severity}] {i.problem}" for i in self.issues)
+
+
+def _finish_block(filepath, start_line, fields, invalid, report):
+    def reject(line, problem):
+        if report is not None:
+            report.add(filepath, line, "error", problem)
+        return None
+
+    if invalid:
+        return reject(start_line, "soal dilewati karena ada kunci ganda")
+    if "text" not in fields or not fields["text"][0]:
+        return reject(fields.get("text", ("", start_line))[1], "text soal kosong atau tidak ada")
+    options = [None] * 4
+    for key, index in _OPTION_KEYS.items():
+        if key not in fields or not fields[key][0]:
+            return reject(fields.get(key, ("", start_line))[1], f"{key} kosong atau tidak ada")
+        options[index] = fields[key][0]
+    if "answer" not in fields:
+        return reject(start_line, "answer tidak ada")
+    letter, answer_line = fields["answer"]
+    if letter.upper() not in _ANSWER_LETTERS:
+        return reject(answer_line, f"answer '{letter}' tidak valid (harus A, B, C atau D)")
+    if report is not None and len(set(options)) < 4:
+        report.add(filepath, start_line, "warning", "ada pilihan jawaban yang sama")
+    q = {"text": fields["text"][0], "options": options, "answer": _ANSWER_LETTERS[letter.upper()]}
+    if fields.get("clue", ("",))[0]:
+        q["clue"] = fields["clue"][0]
+    return q
+
+
+def iter_questions(filepath, report=None):
+    """Hasilkan soal dari file bank satu per satu dengan memori konstan.
+
+    Blok yang tidak lengkap, kunci ganda, atau answer selain A-D tidak
+    dihasilkan; masalahnya dicatat ke `report` (ValidationReport) beserta
+    nomor barisnya.
+    """
+    if report is not None:
+        report.files += 1
+
+    def finish():
+        q = _finish_block(filepath, start_line, fields, invalid, report)
+        if report is not None:
+            if q is None:
+                report.rejected += 1
+            else:
+                report.questions += 1
+        return q
+
+    start_line = None
+    fields = {}
+    invalid = False
+    with open(filepath, "r", encoding="utf-8") as f:
+        for lineno, raw in enumerate(f, 1):
+            line = raw.strip()
+            if line.startswith("[SOAL]"):
+                if start_line is not None:
+                    q = finish()
+                    if q is not None:
+                        yield q
+                start_line, fields, invalid = lineno, {}, False
+                line = line[6:].strip()
+            if not line:
+                continue
+            if start_line is None:
+                if report is not None:
+                    report.add(filepath, lineno, "warning", "teks sebelum [SOAL] pertama diabaikan")
+                continue
+            key, sep, value = line.partition(":")
+            key = key.strip()
+            if not sep or key not in _FIELD_KEYS:
+                if report is not None:
+                    report.add(filepath, lineno, "warning", f"baris tidak dikenal diabaikan: {line[:40]}")
+                continue
+            if key in fields:
+                invalid = True
+                if report is not None:
+                    report.add(filepath, lineno, "error", f"{key} muncul dua kali (pertama di baris {fields[key][1]})")
+                continue
+            fields[key] = (value.strip(), lineno)
+    if start_line is not None:
+        q = finish()
+        if q is not None:
+            yield q
+
+
+def load_questions_from_txt(filepath, report=None):
+    if not os.path.exists(filepath):
+        print(f"❌ File tidak ditemukan: {filepath}")
+        return []
+    own_report = report is None
+    report = report or ValidationReport()
+    try:
+        questions = list(iter_questions(filepath, report))
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"❌ Error membaca {filepath}: {e}")
+        return []
+    if own_report and report.rejected:
+        print(f"❌ {report.rejected} soal di {filepath} tidak valid dan dilewati "
+              f"(cek dengan: python question_bank.py lint)")
+    return questions
+
+
+def index_path_for(filepath):
+    grade = os.path.basename(os.path.dirname(os.path.abspath(filepath)))
+    name = os.path.splitext(os.path.basename(filepath))[0]
+    return os.path.join(INDEX_DIR, grade, name + ".qbi")
+
+
+def _file_sha1(filepath):
+    h = hashlib.sha1()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.digest()
+
+
+def _pack_record(q):
+    fields = [q["text"]] + list(q["options"]) + [q.get("clue", "")]
+    encoded = [s.encode("utf-8") for s in fields]
+    flags = q.get("answer", 0) & 0x03
+    if "clue" in q:
+        flags |= _HAS_CLUE
+    return _RECORD.pack(flags, *[len(b) for b in encoded]) + b"".join(encoded)
+
+
+def compile_bank(filepath, index_path=None):
+    index_path = index_path or index_path_for(filepath)
+    st = os.stat(filepath)
+    digest = _file_sha1(filepath)
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    tmp_path = index_path + ".tmp"
+    # Record ditulis ke file sementara sambil soal dibaca, jadi yang disimpan
+    # di memori hanya daftar offset.
+    report = ValidationReport()
+    offsets = [0]
+    with open(tmp_path + ".data", "w+b") as data:
+        for q in iter_questions(filepath, report):
+            rec = _pack_record(q)
+            data.write(rec)
+            offsets.append(offsets[-1] + len(rec))
+        data.seek(0)
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(INDEX_MAGIC, len(offsets) - 1, st.st_mtime_ns, st.st_size, digest))
+            f.write(b"".join(_OFFSET.pack(o) for o in offsets))
+            shutil.copyfileobj(data, f)
+    os.remove(tmp_path + ".data")
+    os.replace(tmp_path, index_path)
+    if report.rejected:
+        print(f"❌ {report.rejected} soal di {filepath} tidak valid dan dilewati "
+              f"(cek dengan: python question_bank.py lint)")
+    return index_path
+
+
+def _read_header(index_path):
+    try:
+        with open(index_path, "rb") as f:
+            raw = f.read(_HEADER.size)
+    except OSError:
+        return None
+    if len(raw) != _HEADER.size:
+        return None
+    header = _HEADER.unpack(raw)
+    if header[0] != INDEX_MAGIC:
+        return None
+    return header
+
+
+def ensure_index(filepath):
+    """Pastikan indeks .qbi untuk `filepath` ada dan sesuai sumbernya.
+
+    Indeks dibangun ulang hanya jika isi file sumber berubah; jika hanya
+    mtime yang berubah (misal file disalin ulang), header cukup diperbarui.
+    """
+    index_path = index_path_for(filepath)
+    st = os.stat(filepath)
+    header = _read_header(index_path)
+    if header is not None:
+        _, count, mtime_ns, size, digest = header
+        if mtime_ns == st.st_mtime_ns and size == st.st_size:
+            return index_path
+        if size == st.st_size and digest == _file_sha1(filepath):
+            with open(index_path, "r+b") as f:
+                f.write(_HEADER.pack(INDEX_MAGIC, count, st.st_mtime_ns, st.st_size, digest))
+            return index_path
+    return compile_bank(filepath, index_path)
+
+
+class BankIndex:
+    def __init__(self, index_path):
+        self.path = index_path
+        self._file = open(index_path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        magic, self.count, self.source_mtime_ns, self.source_size, self.source_sha1 = \
+            _HEADER.unpack_from(self._map, 0)
+        if magic != INDEX_MAGIC:
+            self.close()
+            raise ValueError(f"Bukan file indeks soal: {index_path}")
+        self._offsets_at = _HEADER.size
+        self._data_at = _HEADER.size + (self.count + 1) * _OFFSET.size
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        start = self._data_at + _OFFSET.unpack_from(self._map, self._offsets_at + i * _OFFSET.size)[0]
+        flags, *lengths = _RECORD.unpack_from(self._map, start)
+        pos = start + _RECORD.size
+        fields = []
+        for n in lengths:
+            fields.append(self._map[pos:pos + n].decode("utf-8"))
+            pos += n
+        q = {"text": fields[0], "options": fields[1:5], "answer": flags & 0x03}
+        if flags & _HAS_CLUE:
+            q["clue"] = fields[5]
+        return q
+
+    def sample(self, k):
+        return [self.record(i) for i in random.sample(range(self.count), k)]
+
+    def records(self):
+        return [self.record(i) for i in range(self.count)]
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+def open_bank(filepath):
+    return BankIndex(ensure_index(filepath))
+
+
+class BankCache:
+    """Cache LRU indeks bank soal selama proses aplikasi berjalan.
+
+    Entri dikunci dengan (kelas, file mapel) dan dibuang jika mtime atau ukuran
+    file sumbernya berubah. Biaya memori tiap entri dihitung dari ukuran file
+    indeks yang dipetakan; entri terlama dibuang saat melebihi `max_bytes`.
+    """
+
+    def __init__(self, max_bytes=BANK_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, grade, filepath):
+        with self._lock:
+            return self._get(grade, filepath)
+
+    def _get(self, grade, filepath):
+        key = (str(grade), os.path.basename(filepath))
+        st = os.stat(filepath)
+        entry = self._entries.get(key)
+        if entry is not None:
+            bank, mtime_ns, size, cost = entry
+            if mtime_ns == st.st_mtime_ns and size == st.st_size:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return bank
+            self.invalidations += 1
+            self._drop(key)
+        self.misses += 1
+        bank = open_bank(filepath)
+        cost = os.path.getsize(bank.path)
+        self._entries[key] = (bank, st.st_mtime_ns, st.st_size, cost)
+        self.current_bytes += cost
+        while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+        return bank
+
+    def _drop(self, key):
+        bank, _, _, cost = self._entries.pop(key)
+        self.current_bytes -= cost
+        bank.close()
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+
+
+def iter_bank_files(root="questions"):
+    for grade in sorted(os.listdir(root)):
+        grade_dir = os.path.join(root, grade)
+        if not os.path.isdir(grade_dir):
+            continue
+        for name in sorted(os.listdir(grade_dir)):
+            if name.endswith(".txt"):
+                yield grade, os.path.join(grade_dir, name)
+
+
+def compile_all(root="questions"):
+    total = 0
+    for _, filepath in iter_bank_files(root):
+        ensure_index(filepath)
+        total += 1
+    return total
+
+
+# Bank soal juga disimpan di tabel `questions` pada quizquest.db. Kolom `seq`
+# (0..n-1 per kelas + mapel) membuat pengambilan soal acak cukup dengan
+# lookup indeks (grade, subject, seq) tanpa memuat seluruh bank. `qhash` dan
+# `dup_group` (lihat dedup.py) dipakai agar satu kuis tidak berisi soal kembar.
+#
+# Impor ulang memperbarui baris lama di tempat (dicocokkan lewat qhash), jadi
+# id soal yang tidak berubah tetap sama dan attempt_answers.question_id tetap
+# menunjuk ke soal yang benar. Hanya soal yang dihapus/diubah yang dapat id baru.
+_INSERT_QUESTION = """
+    INSERT INTO questions (subject, grade, seq, question, option_a, option_b,
+                           option_c, option_d, answer, clue, qhash, dup_group)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+_UPDATE_QUESTION = """
+    UPDATE questions SET subject = ?, grade = ?, seq = ?, question = ?, option_a = ?, option_b = ?,
+                         option_c = ?, option_d = ?, answer = ?, clue = ?, qhash = ?, dup_group = ?
+    WHERE id = ?"""
+
+
+def subject_key(filepath):
+    return os.path.splitext(os.path.basename(filepath))[0]
+
+
+@perf.span("import_bank")
+def _import_bank(conn, grade, filepath, records, st):
+    subject = subject_key(filepath)
+    qhashes, groups = dedup.find_groups(records)
+    existing = {}
+    for question_id, qhash in conn.execute(
+            "SELECT id, qhash FROM questions WHERE grade = ? AND subject = ? ORDER BY seq", (grade, subject)):
+        existing.setdefault(qhash, []).append(question_id)
+    updates, inserts = [], []
+    for seq, q in enumerate(records):
+        row = (subject, grade, seq, q["text"], *q["options"], q["answer"], q.get("clue"), qhashes[seq], groups[seq])
+        ids = existing.get(qhashes[seq])
+        if ids:
+            updates.append(row + (ids.pop(0),))
+        else:
+            inserts.append(row)
+    conn.executemany("DELETE FROM questions WHERE id = ?", [(i,) for ids in existing.values() for i in ids])
+    conn.executemany(_UPDATE_QUESTION, updates)
+    conn.executemany(_INSERT_QUESTION, inserts)
+    conn.execute("""
+        INSERT OR REPLACE INTO question_sources (grade, subject, mtime_ns, size, question_count, sha1)
+        VALUES (?, ?, ?, ?, ?, ?)""",
+        (grade, subject, st.st_mtime_ns, st.st_size, len(records), _file_sha1(filepath).hex()))
+    rank_difficulty(conn, grade, subject)
+    return len(records)
+
+
+def _source_is_current(conn, grade, filepath, st):
+    """Jumlah soal jika bank di database masih sesuai file sumbernya, selain itu None.
+
+    Seperti ensure_index: jika hanya mtime yang berubah (bank disalin ke PC
+    lain), isinya dicek dengan sha1 dan cukup mtime-nya yang diperbarui.
+    """
+    subject = subject_key(filepath)
+    row = conn.execute(
+        "SELECT mtime_ns, size, question_count, sha1 FROM question_sources WHERE grade = ? AND subject = ?",
+        (grade, subject)).fetchone()
+    if not row or row[1] != st.st_size:
+        return None
+    if row[0] == st.st_mtime_ns:
+        return row[2]
+    if row[3] != _file_sha1(filepath).hex():
+        return None
+    with conn:
+        conn.execute("UPDATE question_sources SET mtime_ns = ? WHERE grade = ? AND subject = ?",
+                     (st.st_mtime_ns, grade, subject))
+        conn.execute("UPDATE seen_questions SET bank_version = ? WHERE grade = ? AND subject = ? AND bank_version = ?",
+                     (st.st_mtime_ns, grade, subject, row[0]))
+    return row[2]
+
+
+def sync_bank(conn, grade, filepath, bank_cache=None):
+    """Impor ulang satu bank ke tabel `questions` jika file sumbernya berubah.
+
+    Mengembalikan jumlah soal bank tersebut di database.
+    """
+    grade = str(grade)
+    st = os.stat(filepath)
+    count = _source_is_current(conn, grade, filepath, st)
+    if count is not None:
+        subject = subject_key(filepath)
+        fresh = conn.execute(
+            "SELECT answers_since_rank FROM question_sources WHERE grade = ? AND subject = ?",
+            (grade, subject)).fetchone()[0]
+        if fresh >= RERANK_AFTER_ANSWERS:
+            with conn:
+                rank_difficulty(conn, grade, subject)
+        return count
+    with perf.span("parse_bank"):
+        if bank_cache is not None:
+            records = bank_cache.get(grade, filepath).records()
+        else:
+            with open_bank(filepath) as bank:
+                records = bank.records()
+    with conn:
+        return _import_bank(conn, grade, filepath, records, st)
+
+
+def import_question_banks(conn, root="questions", force=False):
+    total = 0
+    with conn:
+        for grade, filepath in iter_bank_files(root):
+            st = os.stat(filepath)
+            if not force and _source_is_current(conn, grade, filepath, st) is not None:
+                continue
+            with open_bank(filepath) as bank:
+                total += _import_bank(conn, grade, filepath, bank.records(), st)
+    return total
+
+
+# Tingkat kesulitan soal diambil dari question_stats (tingkat benar, dihaluskan
+# dengan prior supaya soal yang belum pernah dijawab dianggap sedang) lalu
+# disimpan sebagai difficulty_rank 0..n-1 dari yang paling mudah. Bucket
+# kesulitan adalah kuantil rank, jadi batasnya cukup dihitung dari jumlah soal
+# dan memilih k soal tetap k lookup indeks, berapa pun besar banknya.
+DIFFICULTY_BUCKETS = 5
+PRIOR_ANSWERS = 4
+PRIOR_CORRECT_RATE = 0.6
+RERANK_AFTER_ANSWERS = 50
+SELECTION_MODES = ("random", "balanced", "adaptive")
+
+
+def rank_difficulty(conn, grade, subject):
+    """Hitung ulang difficulty_rank satu bank dari question_stats."""
+    rows = conn.execute("""
+        SELECT q.id, q.qhash, COALESCE(s.attempts, 0), COALESCE(s.correct, 0)
+        FROM questions q LEFT JOIN question_stats s ON s.qhash = q.qhash
+        WHERE q.grade = ? AND q.subject = ?""", (grade, subject)).fetchall()
+
+    def easiest_first(row):
+        _, qhash, attempts, correct = row
+        rate = (correct + PRIOR_CORRECT_RATE * PRIOR_ANSWERS) / (attempts + PRIOR_ANSWERS)
+        return -rate, qhash or ""
+
+    rows.sort(key=easiest_first)
+    conn.executemany("UPDATE questions SET difficulty_rank = ? WHERE id = ?",
+                     [(rank, row[0]) for rank, row in enumerate(rows)])
+    conn.execute("UPDATE question_sources SET answers_since_rank = 0 WHERE grade = ? AND subject = ?",
+                 (grade, subject))
+
+
+def difficulty_plan(k, count, mode="balanced", skill=None):
+    """Bagi `k` soal ke bucket kesulitan; mengembalikan list (rank awal, rank akhir, jumlah).
+
+    "balanced" mengambil jumlah yang sama dari tiap bucket. "adaptive"
+    memusatkan soal di bucket yang sesuai `skill` (rata-rata benar 0-1 siswa
+    di mapel itu) ditambah bucket di sebelahnya; tanpa riwayat (skill None)
+    hasilnya sama dengan "balanced".
+    """
+    buckets = max(1, min(DIFFICULTY_BUCKETS, count))
+    weights = [1] * buckets
+    if mode == "adaptive" and skill is not None:
+        target = min(buckets - 1, int(skill * buckets))
+        weights = [2 if b == target else 1 if abs(b - target) == 1 else 0 for b in range(buckets)]
+    shares = [k * w / sum(weights) for w in weights]
+    counts = [int(share) for share in shares]
+    for b in sorted(range(buckets), key=lambda b: counts[b] - shares[b])[:k - sum(counts)]:
+        counts[b] += 1
+    return [(-(-b * count // buckets), -(-(b + 1) * count // buckets), n)
+            for b, n in enumerate(counts) if n]
+
+
+class _Sampler:
+    """Ambil soal acak per rentang posisi (seq atau difficulty_rank) tanpa soal kembar.
+
+    Jika `seen` (database.SeenSet) diberikan, soal yang sudah pernah muncul
+    untuk siswa itu dilewati dulu dan baru dipakai lewat fill_seen.
+    """
+
+    def __init__(self, conn, grade, subject, count, column, seen=None):
+        self.conn = conn
+        self.count = count
+        self.grade = grade
+        self.subject = subject
+        self.column = column
+        self.seen = seen
+        self.tried = set()
+        self.groups = set()
+        self.picked = []
+        self.spare = []
+        self.seen_spare = []
+
+    def _fetch(self, positions):
+        rows = self.conn.execute(f"""
+            SELECT id, {self.column}, seq, question, option_a, option_b, option_c, option_d,
+                   answer, clue, qhash, dup_group
+            FROM questions WHERE grade = ? AND subject = ? AND {self.column} IN ({",".join("?" * len(positions))})""",
+            (self.grade, self.subject, *positions)).fetchall()
+        found = {}
+        for qid, pos, seq, text, a, b, c, d, answer, clue, qhash, group in rows:
+            q = {"id": qid, "text": text, "options": [a, b, c, d], "answer": answer, "qhash": qhash}
+            if clue is not None:
+                q["clue"] = clue
+            found[pos] = (seq, group or qhash, q)
+        return found
+
+    def _take(self, group, q):
+        if group is not None and group in self.groups:
+            self.spare.append(q)
+            return
+        self.groups.add(group)
+        self.picked.append(q)
+
+    def draw(self, lo, hi, want, allow_seen=False):
+        """Tambah `want` soal dari posisi [lo, hi); berhenti lebih awal jika rentang habis."""
+        goal = len(self.picked) + want
+        avoid = self.seen if self.seen is not None and not allow_seen else None
+        # Untuk posisi seq, soal yang sudah pernah muncul dilewati tanpa query.
+        skip = avoid if self.column == "seq" else None
+        if avoid is not None and skip is None and avoid.count() * 2 > self.count:
+            # Sebagian besar bank sudah pernah muncul: tebakan acak akan sering
+            # meleset, jadi ambil daftar rank yang belum muncul dari indeks.
+            order = [p for p, seq in self.conn.execute("""
+                SELECT difficulty_rank, seq FROM questions
+                WHERE grade = ? AND subject = ? AND difficulty_rank >= ? AND difficulty_rank < ?""",
+                (self.grade, self.subject, lo, hi)) if seq not in avoid and p not in self.tried]
+            random.shuffle(order)
+            free = len(order)
+        else:
+            tried_here = [p for p in self.tried if lo <= p < hi]
+            free = hi - lo - len(tried_here)
+            if skip is not None:
+                free -= skip.count(lo, hi) - sum(1 for p in tried_here if p in skip)
+            order = None
+            if hi - lo <= 4 * want or free <= 4 * want:
+                order = [p for p in random.sample(range(lo, hi), hi - lo)
+                         if p not in self.tried and not (skip is not None and p in skip)]
+        while len(self.picked) < goal and free > 0:
+            need = goal - len(self.picked)
+            if order is not None:
+                positions, order = order[:need], order[need:]
+            else:
+                positions = []
+                while len(positions) < min(need, free):
+                    p = random.randrange(lo, hi)
+                    if p not in self.tried and p not in positions and not (skip is not None and p in skip):
+                        positions.append(p)
+            free -= len(positions)
+            self.tried.update(positions)
+            found = self._fetch(positions)
+            for p in positions:
+                if p not in found:
+                    continue
+                seq, group, q = found[p]
+                if avoid is not None and seq in avoid:
+                    self.seen_spare.append((group, q))
+                    continue
+                self._take(group, q)
+
+    def fill_seen(self, want):
+        """Tambah `want` soal dari soal yang sudah pernah muncul."""
+        goal = len(self.picked) + want
+        while self.seen_spare and len(self.picked) < goal:
+            self._take(*self.seen_spare.pop(random.randrange(len(self.seen_spare))))
+
+
+def sample_questions(conn, grade, subject, k, count, plan=None, seen=None):
+    """Ambil `k` soal acak tanpa dua soal dari kelompok kembar yang sama.
+
+    Tanpa `plan` soal diambil dari seluruh bank; dengan `plan` (lihat
+    difficulty_plan) jumlah soal per rentang difficulty_rank mengikuti plan,
+    dan kekurangan di satu bucket diambil dari bucket lain. Soal di `seen`
+    baru dipakai jika soal yang belum pernah muncul habis. Jika bank
+    kehabisan soal unik, sisanya diisi soal kembar agar kuis tetap berisi
+    `k` soal.
+    """
+    grade = str(grade)
+    sampler = _Sampler(conn, grade, subject, count, "seq" if plan is None else "difficulty_rank", seen)
+    for lo, hi, n in plan or [(0, count, k)]:
+        sampler.draw(lo, hi, n)
+    if len(sampler.picked) < k:
+        sampler.draw(0, count, k - len(sampler.picked))
+    if len(sampler.picked) < k and seen is not None:
+        sampler.fill_seen(k - len(sampler.picked))
+        sampler.draw(0, count, k - len(sampler.picked), allow_seen=True)
+    picked = sampler.picked
+    if len(picked) < k:
+        print(f"❌ Bank {grade}/{subject} hanya punya {len(picked)} soal unik, {k - len(picked)} soal kembar dipakai")
+        picked += sampler.spare[:k - len(picked)]
+    random.shuffle(picked)
+    return picked
+
+
+def lint(paths):
+    """Periksa file bank soal (atau semua .txt di folder); kode keluar 1 jika ada error."""
+    report = ValidationReport()
+    started = time.perf_counter()
+    for path in paths:
+        if os.path.isdir(path):
+            for _, filepath in iter_bank_files(path):
+                for _ in iter_questions(filepath, report):
+                    pass
+        else:
+            for _ in iter_questions(path, report):
+                pass
+    if report.issues:
+        print(report.format())
+    print(f"{'❌' if report.errors else '✅'} {report.files} file, {report.questions} soal valid, "
+          f"{report.rejected} ditolak, {len(report.errors)} error, {len(report.warnings)} peringatan "
+          f"({time.perf_counter() - started:.2f} detik)")
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "compile"
+    root = sys.argv[2] if len(sys.argv) > 2 else "questions"
+    if command == "lint":
+        sys.exit(lint(sys.argv[2:] or ["questions"]))
+    if command == "import":
+        from database import get_db, init_db
+        init_db()
+        print(f"✅ {import_question_banks(get_db().connection(), root, force=True)} soal diimpor ke quizquest.db")
+        get_db().close()
+    else:
+        print(f"✅ {compile_all(root)} bank soal terindeks di {INDEX_DIR}")
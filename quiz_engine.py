@@ -0,0 +1,361 @@
+import os
+import math
+import time
+import random
+import sqlite3
+from database import (get_db, create_user, find_user, add_user_xp, leaderboard_rank, recent_accuracy,
+                      load_seen, XP_PER_CORRECT)
+from question_bank import load_questions_from_txt, sync_bank, sample_questions, difficulty_plan, SELECTION_MODES
+import checkpoint
+import perf
+
+# Inti kuis tanpa Qt: pemilihan soal, jawaban, skor, XP, power-up dan waktu.
+# QuizApp hanya menampilkan state QuizSession, sehingga logika ini bisa
+# dijalankan dan diuji beban tanpa layar.
+# Sisa waktu dihitung dari deadline pada jam monotonic, bukan dikurangi per
+# tick QTimer; tick yang terlambat (dialog modal, UI sibuk) tidak menambah
+# waktu ujian, dan power-up cukup memajukan deadline.
+QUESTIONS_PER_QUIZ = 20
+QUIZ_DURATION = 90 * 60
+POWERUP_COSTS = {"Clue": 5, "50:50": 10, "Reveal": 20}
+NO_CLUE = "Tidak ada petunjuk tersedia."
+# Cara memilih soal: "random", "balanced" (rata per tingkat kesulitan) atau
+# "adaptive" (menyesuaikan rata-rata benar siswa di mapel itu).
+SELECTION_MODE = os.environ.get("DEGICHI_SELECTION", "adaptive")
+
+SUBJECT_FILES = {
+    "Matematika": "matematika",
+    "Fisika": "fisika",
+    "Kimia": "kimia",
+    "Biologi": "biologi",
+    "Bahasa Indonesia": "bahasa_indonesia",
+    "Bahasa Inggris": "bahasa_inggris",
+    "PKN": "pkn",
+    "Sosiologi": "sosiologi",
+    "Ekonomi": "ekonomi",
+    "Geografi": "geografi",
+    "Sejarah": "sejarah",
+    "Matematika Lanjut": "matematika_lanjut",
+    "Olahraga": "olahraga",
+}
+
+
+def calculate_level(xp):
+    """Level untuk total `xp` tanpa perulangan.
+
+    Naik dari level L ke L+1 butuh 100*L XP, jadi level L tercapai pada
+    50*L*(L-1) XP; L terbesar yang memenuhi adalah (1 + isqrt(1 + 4m)) // 2
+    dengan m = xp // 50.
+    """
+    m = max(0, xp) // 50
+    return (1 + math.isqrt(1 + 4 * m)) // 2
+
+
+def level_progress(xp):
+    """Kembalikan (level, XP di level ini, XP yang dibutuhkan untuk naik)."""
+    level = calculate_level(xp)
+    return level, max(0, xp) - 50 * level * (level - 1), 100 * level
+
+
+def bank_for(user, subject, root="questions"):
+    """Kembalikan (kelas, nama file, path) bank soal untuk user dan mapel.
+
+    Mengembalikan None jika mapel tidak didukung.
+    """
+    grade_part = user["grade_class"].split(".")[0]
+    if subject == "Agama":
+        filename = f"agama_{user['religion'].lower()}"
+    else:
+        filename = SUBJECT_FILES.get(subject)
+    if not filename:
+        return None
+    return grade_part, filename, f"{root}/{grade_part}/{filename}.txt"
+
+
+@perf.span("draw_questions")
+def draw_questions(grade_part, filename, filepath, bank_cache, k=QUESTIONS_PER_QUIZ, db=None,
+                   mode="random", skill=None, username=None):
+    """Ambil `k` soal sesuai `mode`; mengembalikan (jumlah soal di bank, soal terpilih).
+
+    Jika `username` diberikan, soal yang belum pernah muncul untuknya
+    didahulukan. Indeks file dan file .txt (saat database bermasalah) selalu
+    memilih acak.
+    """
+    try:
+        db = db or get_db()
+        conn = db.connection()
+        total = sync_bank(conn, grade_part, filepath, bank_cache)
+        plan = difficulty_plan(k, total, mode, skill) if mode != "random" else None
+        seen = load_seen(username, grade_part, filename, db) if username else None
+        sampled = sample_questions(conn, grade_part, filename, k, total, plan, seen) if total >= k else []
+    except sqlite3.Error as e:
+        print(f"❌ Bank soal di database tidak tersedia ({e}), memakai indeks file")
+        bank = bank_cache.get(grade_part, filepath)
+        total = len(bank)
+        sampled = bank.sample(k) if total >= k else []
+    except (OSError, ValueError) as e:
+        print(f"❌ Indeks soal gagal dibuka ({e}), membaca {filepath} langsung")
+        all_questions = load_questions_from_txt(filepath)
+        total = len(all_questions)
+        sampled = random.sample(all_questions, k) if total >= k else []
+    return total, sampled
+
+
+class QuizSession:
+    remote = False
+
+    def __init__(self, user, subject, questions, duration=QUIZ_DURATION, rng=None, clock=time.monotonic):
+        self.user = user
+        self.start_xp = user["xp"]
+        self.subject = subject
+        self.questions = questions
+        self.duration = duration
+        self.rng = rng or random
+        self.clock = clock
+        self.deadline = clock() + duration
+        self.stopped_at = None
+        self.current_index = 0
+        self.score = 0
+        self.xp_earned = 0
+        self.used_powerups = []
+        self.selected_answer = -1
+        self.answers = [-1] * len(questions)
+        self.time_spent = [0.0] * len(questions)
+        self._shown_at = clock()
+        self.checkpoint = None
+
+    @property
+    def question(self):
+        return self.questions[self.current_index]
+
+    @property
+    def time_left(self):
+        """Sisa waktu dalam detik penuh (dibulatkan ke atas)."""
+        now = self.clock() if self.stopped_at is None else self.stopped_at
+        return max(0, math.ceil(self.deadline - now))
+
+    @property
+    def finished(self):
+        return self.current_index >= len(self.questions) or self.time_left <= 0
+
+    @property
+    def is_last(self):
+        return self.current_index == len(self.questions) - 1
+
+    @property
+    def time_used(self):
+        return self.duration - self.time_left
+
+    @property
+    def total_xp(self):
+        return self.start_xp + self.xp_earned
+
+    def _account_time(self):
+        """Tambahkan lama soal sekarang ditampilkan ke time_spent-nya."""
+        now = self.clock()
+        if self.current_index < len(self.questions):
+            self.time_spent[self.current_index] += now - self._shown_at
+        self._shown_at = now
+
+    def _log(self, record):
+        if self.checkpoint is not None:
+            record["tl"] = self.time_left
+            self.checkpoint(record)
+
+    def _closed(self):
+        """True jika kuis sudah selesai; waktu yang habis menghentikan jam di deadline."""
+        if self.stopped_at is None and self.current_index < len(self.questions) and self.clock() >= self.deadline:
+            self.stopped_at = self.deadline
+        return self.finished
+
+    def select(self, option):
+        if self._closed():
+            return
+        self.selected_answer = option
+        self.answers[self.current_index] = option
+        self._log({"e": "select", "o": option})
+
+    def go_to(self, index):
+        if self._closed():
+            return
+        if self.selected_answer != -1:
+            self.answers[self.current_index] = self.selected_answer
+        self._account_time()
+        self.current_index = index
+        self.selected_answer = self.answers[index]
+        self._log({"e": "go_to", "i": index})
+
+    def next(self):
+        """Nilai jawaban soal sekarang lalu maju satu soal.
+
+        Mengembalikan False jika belum ada jawaban yang dipilih. Setelah
+        waktu habis tidak ada yang berubah (seperti RemoteQuizSession).
+        """
+        if self._closed():
+            return True
+        if self.selected_answer == -1:
+            return False
+        if self.selected_answer == self.question["answer"]:
+            self.score += 1
+            self.xp_earned += XP_PER_CORRECT
+        self._account_time()
+        self.current_index += 1
+        if self.current_index < len(self.questions):
+            self.selected_answer = self.answers[self.current_index]
+        else:
+            self.stopped_at = self.clock()
+        self._log({"e": "next"})
+        return True
+
+    def tick(self):
+        """Mengembalikan True jika waktu habis; tidak mengubah state."""
+        return self.time_left <= 0
+
+    def use_powerup(self, name):
+        """Pakai power-up pada soal sekarang.
+
+        Mengembalikan dict dengan `ok`; jika waktu tidak cukup `ok` bernilai
+        False dan `cost_minutes` berisi kebutuhan waktunya. Jika berhasil,
+        dict berisi `clue`, `removed` (indeks opsi yang dihilangkan) atau
+        `correct` sesuai jenis power-up.
+        """
+        cost_minutes = POWERUP_COSTS.get(name)
+        if cost_minutes is None or self._closed():
+            return None
+        cost_seconds = cost_minutes * 60
+        if self.time_left < cost_seconds:
+            return {"ok": False, "name": name, "cost_minutes": cost_minutes}
+        self.deadline -= cost_seconds
+        self.used_powerups.append(name)
+        self._log({"e": "powerup", "name": name})
+        q = self.question
+        result = {"ok": True, "name": name, "cost_minutes": cost_minutes}
+        if name == "Clue":
+            result["clue"] = q.get("clue", NO_CLUE)
+        elif name == "50:50":
+            wrong_indices = [i for i in range(len(q["options"])) if i != q["answer"]]
+            result["removed"] = self.rng.sample(wrong_indices, 2)
+        elif name == "Reveal":
+            result["correct"] = q["answer"]
+        return result
+
+    def answer_log(self):
+        return [(q.get("id"), self.answers[i], self.answers[i] == q["answer"], round(self.time_spent[i], 1))
+                for i, q in enumerate(self.questions)]
+
+    def result(self):
+        total = len(self.questions)
+        return {
+            "username": self.user["username"],
+            "subject": self.subject,
+            "score": self.score,
+            "total_questions": total,
+            "percentage": (self.score / total) * 100 if total else 0.0,
+            "time_left": self.time_left,
+            "time_used": self.time_used,
+            "xp_earned": self.xp_earned,
+            "total_xp": self.total_xp,
+            "used_powerups": list(self.used_powerups),
+        }
+
+
+class UsernameTaken(Exception):
+    pass
+
+
+class LocalBackend:
+    """Backend kuis yang memakai quizquest.db dan folder questions/ lokal.
+
+    Antarmukanya sama dengan exam_server.RemoteBackend, sehingga QuizApp
+    tidak perlu tahu apakah kuis dijalankan lokal atau di server ujian.
+    Semua method boleh dipanggil dari thread pool.
+    """
+
+    def __init__(self, bank_cache, attempts, checkpoints=None, selection=SELECTION_MODE):
+        if selection not in SELECTION_MODES:
+            print(f"❌ Mode pemilihan soal '{selection}' tidak dikenal, memakai random")
+            selection = "random"
+        self.bank_cache = bank_cache
+        self.attempts = attempts
+        self.checkpoints = checkpoints
+        self.selection = selection
+
+    def login(self, username, password):
+        return find_user(username, password)
+
+    def register(self, username, password, grade_class, religion):
+        try:
+            create_user(username, password, grade_class, religion)
+        except sqlite3.IntegrityError:
+            raise UsernameTaken(username)
+
+    @perf.span("start_quiz")
+    def start_quiz(self, user, subject):
+        """Mulai kuis; mengembalikan (status, info, session).
+
+        status: "ok" (info = jumlah soal bank), "unsupported", "missing"
+        (info = path file soal) atau "too_few" (info = jumlah soal bank).
+        """
+        bank = bank_for(user, subject)
+        if not bank:
+            return "unsupported", subject, None
+        grade_part, filename, filepath = bank
+        if not os.path.exists(filepath):
+            return "missing", filepath, None
+        skill = None
+        if self.selection == "adaptive":
+            try:
+                skill = recent_accuracy(user["username"], subject)
+            except sqlite3.Error as e:
+                print(f"❌ Riwayat nilai tidak bisa dibaca ({e}), soal dipilih rata per kesulitan")
+        total, questions = draw_questions(grade_part, filename, filepath, self.bank_cache,
+                                          mode=self.selection, skill=skill, username=user["username"])
+        if total < QUESTIONS_PER_QUIZ:
+            return "too_few", total, None
+        session = QuizSession(user, subject, questions)
+        if self.checkpoints is not None:
+            self.checkpoints.begin(session)
+        return "ok", total, session
+
+    def rank(self, user):
+        """Peringkat XP `user` di kelasnya: {"rank", "total", "xp"} atau None."""
+        return leaderboard_rank(user["username"], user["grade_class"])
+
+    def resumable(self, user):
+        """Ringkasan kuis yang belum selesai milik `user`, atau None."""
+        session = self._restore(user)
+        return checkpoint.progress(session) if session else None
+
+    def resume_quiz(self, user):
+        session = self._restore(user)
+        if session is not None:
+            self.checkpoints.attach(session)
+        return session
+
+    def discard_quiz(self, user):
+        if self.checkpoints is not None:
+            self.checkpoints.discard(user["username"])
+
+    def logout(self, user):
+        # Login lokal tidak menyimpan token apa pun.
+        pass
+
+    def _restore(self, user):
+        if self.checkpoints is None:
+            return None
+        return checkpoint.restore_session(user, self.checkpoints.load(user["username"]), QuizSession)
+
+    @perf.span("finish_quiz")
+    def finish_quiz(self, session):
+        total = add_user_xp(session.user["username"], session.xp_earned)
+        if total is not None:
+            session.start_xp = total - session.xp_earned
+        self.attempts.record(session.user["username"], session.subject, session.score,
+                             len(session.questions), session.time_used, session.answer_log())
+        self.discard_quiz(session.user)
+        return session.result()
+
+    def close(self):
+        self.attempts.close()
+        if self.checkpoints is not None:
+            self.checkpoints.close()
@@ -0,0 +1,238 @@
+import os
+import sys
+import time
+import argparse
+import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from reportlab.pdfgen import canvas
+from reportlab.pdfbase import pdfmetrics
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.lib import colors
+from database import KKM
+
+# Mesin laporan PDF hasil ujian. Satu halaman laporan dibagi menjadi bagian
+# statis (judul, kotak, tanda tangan) dan isian per siswa. Semua posisi
+# dihitung sekali saat modul dimuat; pada mode gabung (satu PDF banyak
+# halaman) bagian statis disimpan sebagai form XObject dan dipakai ulang.
+REPORT_DIR = "reports"
+FONTS = ("Helvetica", "Helvetica-Bold")
+TEMPLATE_FORM = "hasil_ujian_template"
+
+WIDTH, HEIGHT = A4
+MARGIN = 20 * mm
+BOX_X = (WIDTH / 2) + 5
+BOX_WIDTH = (WIDTH / 2) - MARGIN - 5
+Y_TITLE = HEIGHT - MARGIN
+Y_SUBTITLE = Y_TITLE - 16
+Y_RULE = Y_SUBTITLE - 10
+Y_PESERTA = Y_RULE - 25
+Y_PESERTA_BOX = Y_PESERTA - 5
+Y_UJIAN_BOX = Y_PESERTA_BOX - 5
+Y_REKAP = Y_UJIAN_BOX - 60
+Y_REKAP_BOX = Y_REKAP - 5
+Y_CATATAN = Y_REKAP_BOX - 36 - 25
+Y_CATATAN_BOX = Y_CATATAN - 5
+Y_PRINTED = Y_CATATAN_BOX - 80
+Y_TEACHER = Y_PRINTED - 50
+Y_SIGNATURE = Y_TEACHER - 40
+
+
+def catatan_for(score_percent):
+    if score_percent >= 90:
+        return "Luar biasa. Pertahankan prestasi belajar Anda."
+    elif score_percent >= 80:
+        return "Sangat baik. Tetap konsisten dalam belajar."
+    elif score_percent >= 70:
+        return "Cukup baik. Masih bisa ditingkatkan."
+    elif score_percent >= 60:
+        return "Hampir mencapai standar. Perbanyak latihan soal."
+    return "Belum memenuhi standar ketuntasan. Disarankan untuk belajar kembali materi terkait."
+
+
+def draw_template(c):
+    c.setFont("Helvetica-Bold", 14)
+    c.drawCentredString(WIDTH / 2, Y_TITLE, "LAPORAN HASIL UJIAN")
+    c.setFont("Helvetica", 11)
+    c.drawCentredString(WIDTH / 2, Y_SUBTITLE, "Aplikasi CBT DEGICHI")
+    c.line(MARGIN, Y_RULE, WIDTH - MARGIN, Y_RULE)
+    c.setFont("Helvetica-Bold", 11)
+    c.drawString(MARGIN, Y_PESERTA, "DATA PESERTA")
+    c.drawString(BOX_X, Y_PESERTA_BOX, "DATA UJIAN")
+    c.drawString(MARGIN, Y_REKAP, "REKAP NILAI")
+    c.drawString(MARGIN, Y_CATATAN, "CATATAN")
+    c.setLineWidth(0.5)
+    c.setStrokeColor(colors.grey)
+    c.rect(MARGIN, Y_PESERTA_BOX - 40, (WIDTH / 2) - MARGIN * 1.2, 40, stroke=1, fill=0)
+    c.rect(BOX_X, Y_UJIAN_BOX - 40, BOX_WIDTH, 40, stroke=1, fill=0)
+    c.rect(MARGIN, Y_REKAP_BOX - 45, WIDTH - 2 * MARGIN, 45, stroke=1, fill=0)
+    c.rect(MARGIN, Y_CATATAN_BOX - 45, WIDTH - 2 * MARGIN, 45, stroke=1, fill=0)
+    c.setFont("Helvetica", 10)
+    c.drawRightString(WIDTH - MARGIN, Y_TEACHER, "Guru Pengampu,")
+    c.setFont("Helvetica-Bold", 10)
+    c.drawRightString(WIDTH - MARGIN, Y_SIGNATURE, "( ................................... )")
+
+
+def draw_result_values(c, data, printed_on=None):
+    total = data.get("total_questions", 20)
+    score = data["score"]
+    score_percent = (score / total) * 100 if total else 0
+    status = "LULUS" if score_percent >= KKM else "TIDAK LULUS"
+    c.setFont("Helvetica", 10)
+    c.drawString(MARGIN + 5, Y_PESERTA_BOX - 10, f"Nama        : {data['username']}")
+    c.drawString(MARGIN + 5, Y_PESERTA_BOX - 22, f"Kelas       : {data.get('grade_class') or '-'}")
+    c.drawString(MARGIN + 5, Y_PESERTA_BOX - 34, f"Agama       : {data.get('religion') or '-'}")
+    c.drawString(BOX_X + 5, Y_UJIAN_BOX - 10, f"Mata Pelajaran : {data['subject']}")
+    c.drawString(BOX_X + 5, Y_UJIAN_BOX - 22, f"Skor           : {score} / {total} ({score_percent:.1f}%)")
+    c.drawString(BOX_X + 5, Y_UJIAN_BOX - 34, f"Waktu Terpakai : {data['time_used'] // 60} menit")
+    c.drawString(MARGIN + 5, Y_REKAP_BOX - 12, f"Nilai Akhir : {score_percent:.1f}")
+    c.drawString(MARGIN + 5, Y_REKAP_BOX - 24, f"KKM         : {KKM}")
+    c.drawString(MARGIN + 5, Y_REKAP_BOX - 36, f"Status      : {status}")
+    text = c.beginText()
+    text.setTextOrigin(MARGIN + 5, Y_CATATAN_BOX - 15)
+    text.setLeading(12)
+    text.textLine(catatan_for(score_percent))
+    c.drawText(text)
+    printed_on = printed_on or datetime.datetime.now().strftime("%d %B %Y")
+    c.drawRightString(WIDTH - MARGIN, Y_PRINTED, f"Dicetak pada: {printed_on}")
+
+
+def write_result_pdf(filepath, data):
+    """Tulis laporan satu hasil ujian.
+
+    `data` berisi username, grade_class, religion, subject, score,
+    total_questions dan time_used (detik).
+    """
+    c = canvas.Canvas(filepath, pagesize=A4)
+    draw_template(c)
+    draw_result_values(c, data)
+    c.showPage()
+    c.save()
+    return filepath
+
+
+def report_filename(data):
+    stamp = data.get("attempt_date")
+    if stamp:
+        # attempt_date disimpan dalam UTC; nama file memakai waktu lokal seperti ekspor dari GUI.
+        when = datetime.datetime.fromisoformat(str(stamp))
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=datetime.timezone.utc)
+        stamp = when.astimezone().strftime("%Y%m%d_%H%M%S")
+    else:
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    safe_subject = data["subject"].replace(" ", "_").lower()
+    return f"hasil_{data['username']}_{safe_subject}_{stamp}.pdf"
+
+
+def fetch_attempts(db, grade_class=None, date_from=None, date_to=None, subject=None):
+    sql = """
+        SELECT a.id, a.username, u.grade_class, u.religion, a.subject, a.score,
+               a.total_questions, a.time_used, a.attempt_date
+        FROM quiz_attempts a LEFT JOIN users u ON u.username = a.username
+        WHERE 1 = 1"""
+    params = []
+    if grade_class:
+        sql += " AND u.grade_class = ?"
+        params.append(grade_class)
+    if subject:
+        sql += " AND a.subject = ?"
+        params.append(subject)
+    # --dari/--sampai adalah tanggal lokal, attempt_date disimpan dalam UTC.
+    if date_from:
+        sql += " AND date(a.attempt_date, 'localtime') >= ?"
+        params.append(str(date_from))
+    if date_to:
+        sql += " AND date(a.attempt_date, 'localtime') <= ?"
+        params.append(str(date_to))
+    sql += " ORDER BY u.grade_class, a.username, a.attempt_date"
+    keys = ("id", "username", "grade_class", "religion", "subject", "score",
+            "total_questions", "time_used", "attempt_date")
+    return [dict(zip(keys, row)) for row in db.execute(sql, params)]
+
+
+def _init_worker():
+    # Metrik font dimuat sekali per proses dan dipakai semua laporan di proses itu.
+    for name in FONTS:
+        pdfmetrics.getFont(name)
+
+
+def _render_chunk(items, out_dir):
+    return [write_result_pdf(os.path.join(out_dir, report_filename(d)), d) for d in items]
+
+
+def _render_merged(attempts, filepath, progress):
+    c = canvas.Canvas(filepath, pagesize=A4)
+    c.beginForm(TEMPLATE_FORM)
+    draw_template(c)
+    c.endForm()
+    printed_on = datetime.datetime.now().strftime("%d %B %Y")
+    for i, data in enumerate(attempts, 1):
+        c.doForm(TEMPLATE_FORM)
+        draw_result_values(c, data, printed_on)
+        c.showPage()
+        if progress:
+            progress(i, len(attempts))
+    c.save()
+    return [filepath]
+
+
+def export_reports(attempts, out_dir=REPORT_DIR, merge=False, workers=None, chunk_size=25, progress=None):
+    """Buat laporan untuk banyak hasil ujian sekaligus.
+
+    Tanpa `merge`, laporan dibagi per chunk ke proses-proses terpisah dan
+    `progress(selesai, total)` dipanggil tiap chunk selesai. Dengan `merge`,
+    semua laporan ditulis sebagai halaman-halaman satu file PDF.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    started = time.perf_counter()
+    total = len(attempts)
+    if merge:
+        name = f"hasil_gabungan_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        files = _render_merged(attempts, os.path.join(out_dir, name), progress)
+    else:
+        files = []
+        chunks = [attempts[i:i + chunk_size] for i in range(0, total, chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(_render_chunk, chunk, out_dir) for chunk in chunks]
+            for future in as_completed(futures):
+                files.extend(future.result())
+                if progress:
+                    progress(len(files), total)
+    elapsed = time.perf_counter() - started
+    return {
+        "reports": total,
+        "files": files,
+        "seconds": elapsed,
+        "reports_per_second": total / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main(argv=None):
+    from database import get_db, init_db
+    parser = argparse.ArgumentParser(description="Cetak laporan hasil ujian satu kelas sekaligus.")
+    parser.add_argument("--kelas", help="filter grade_class, misal 11.5")
+    parser.add_argument("--mapel", help="filter mata pelajaran, misal Matematika")
+    parser.add_argument("--dari", help="tanggal awal (YYYY-MM-DD)")
+    parser.add_argument("--sampai", help="tanggal akhir (YYYY-MM-DD)")
+    parser.add_argument("--gabung", action="store_true", help="gabungkan semua laporan ke satu PDF")
+    parser.add_argument("--proses", type=int, default=None, help="jumlah proses render")
+    parser.add_argument("--output", default=REPORT_DIR)
+    args = parser.parse_args(argv)
+    init_db()
+    attempts = fetch_attempts(get_db(), args.kelas, args.dari, args.sampai, args.mapel)
+    if not attempts:
+        print("❌ Tidak ada hasil ujian yang cocok dengan filter.")
+        return 1
+
+    def progress(done, total):
+        print(f"\r{done}/{total} laporan", end="", flush=True)
+
+    summary = export_reports(attempts, args.output, args.gabung, args.proses, progress=progress)
+    print(f"\n✅ {summary['reports']} laporan dalam {summary['seconds']:.2f} detik "
+          f"({summary['reports_per_second']:.1f} laporan/detik)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import queue
+import threading
+import traceback
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot, Qt
+from PyQt5.QtWidgets import QApplication
+
+# Pekerjaan I/O (database, file soal, PDF) dijalankan di thread pool agar
+# event loop Qt, termasuk QTimer ujian dan animasi, tetap berjalan. Hasilnya
+# dikirim kembali ke thread GUI lewat signal (queued connection).
+#
+# Pool-nya thread Python biasa yang hidup selama aplikasi berjalan, bukan
+# QThreadPool: state threading.local (koneksi SQLite per thread di
+# database.py) hilang setiap kali QRunnable selesai, sehingga tiap tugas
+# membuka koneksi baru. Dengan thread tetap, paling banyak max_threads koneksi.
+
+
+class _TaskSignals(QObject):
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, object)
+
+
+class TaskRunner(QObject):
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None, max_threads=4):
+        super().__init__(parent)
+        self.max_threads = max_threads
+        self._queue = queue.Queue()
+        self._threads = []
+        self._unfinished = 0
+        self._done = threading.Condition()
+        self.signals = _TaskSignals(self)
+        self.signals.finished.connect(self._on_finished)
+        self.signals.failed.connect(self._on_failed)
+        self._next_id = 0
+        self._pending = {}
+        self._keys = {}
+
+    def is_busy(self, key=None):
+        if key is None:
+            return bool(self._pending)
+        return key in self._keys
+
+    def submit(self, fn, *args, on_done=None, on_error=None, key=None, **kwargs):
+        """Jalankan `fn(*args, **kwargs)` di thread pool.
+
+        `on_done(result)` / `on_error(exc)` dipanggil di thread GUI. Jika `key`
+        diisi dan tugas dengan key yang sama masih berjalan (misal tombol diklik
+        dua kali), tugas baru diabaikan dan fungsi ini mengembalikan None.
+        """
+        if key is not None and key in self._keys:
+            return None
+        self._next_id += 1
+        task_id = self._next_id
+        self._pending[task_id] = (on_done, on_error, key)
+        if key is not None:
+            self._keys[key] = task_id
+        if len(self._pending) == 1:
+            QApplication.setOverrideCursor(Qt.BusyCursor)
+            self.busy_changed.emit(True)
+        with self._done:
+            self._unfinished += 1
+            if self._unfinished > len(self._threads) and len(self._threads) < self.max_threads:
+                thread = threading.Thread(target=self._work, name=f"task-{len(self._threads)}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+        self._queue.put((task_id, fn, args, kwargs))
+        return task_id
+
+    def _work(self):
+        while True:
+            task_id, fn, args, kwargs = self._queue.get()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                e.traceback_text = traceback.format_exc()
+                self.signals.failed.emit(task_id, e)
+            else:
+                self.signals.finished.emit(task_id, result)
+            with self._done:
+                self._unfinished -= 1
+                self._done.notify_all()
+
+    def _complete(self, task_id):
+        on_done, on_error, key = self._pending.pop(task_id)
+        if key is not None:
+            self._keys.pop(key, None)
+        if not self._pending:
+            QApplication.restoreOverrideCursor()
+            self.busy_changed.emit(False)
+        return on_done, on_error
+
+    @pyqtSlot(int, object)
+    def _on_finished(self, task_id, result):
+        on_done, _ = self._complete(task_id)
+        if on_done is not None:
+            on_done(result)
+
+    @pyqtSlot(int, object)
+    def _on_failed(self, task_id, error):
+        _, on_error = self._complete(task_id)
+        if on_error is not None:
+            on_error(error)
+        else:
+            print(f"❌ Tugas latar belakang gagal: {error}\n{getattr(error, 'traceback_text', '')}")
+
+    def wait(self, msecs=-1):
+        """Tunggu semua tugas selesai; False jika `msecs` habis lebih dulu."""
+        with self._done:
+            return self._done.wait_for(lambda: not self._unfinished, None if msecs < 0 else msecs / 1000)